@@ -0,0 +1,409 @@
+"""
+SpeakNotes synthesis benchmarks.
+
+Runs the real code paths (synthesize_to_file, say_to_file, the bulk export
+split-and-loop, append_history) against a deterministic stub engine and/or the
+real installed engine, and prints the results as JSON.
+
+    python3 benchmarks/bench_synthesis.py                      # stub engine
+    python3 benchmarks/bench_synthesis.py --engine real        # installed engine
+    python3 benchmarks/bench_synthesis.py --output bench.json
+    python3 benchmarks/bench_synthesis.py --baseline bench.json  # exit 1 on regression
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+
+# Stub engine latency model: fixed cost per call + cost per character.
+STUB_FIXED_SECONDS = 0.02
+STUB_SECONDS_PER_CHAR = 0.00005
+STUB_BYTES_PER_CHAR = 64
+
+TEXT_LENGTHS = (50, 200, 1000, 4000)
+HISTORY_SIZES = (0, 1000, 10000)
+NOISE_FLOOR_MS = 1.0
+
+STUB_SAY = f"""#!{sys.executable}
+# Deterministic stand-in for macOS 'say' used by the SpeakNotes benchmarks.
+import sys, time
+args = sys.argv[1:]
+out = None
+text_parts = []
+i = 0
+while i < len(args):
+    if args[i] in ("-o", "-v", "-r"):
+        if args[i] == "-o":
+            out = args[i + 1]
+        i += 2
+        continue
+    text_parts.append(args[i])
+    i += 1
+text = " ".join(text_parts)
+time.sleep({STUB_FIXED_SECONDS} + {STUB_SECONDS_PER_CHAR} * len(text))
+if out:
+    with open(out, "wb") as f:
+        f.write(b"\\0" * ({STUB_BYTES_PER_CHAR} * len(text)))
+"""
+
+STUB_PYTTSX3 = f"""
+# Deterministic stand-in for pyttsx3 used by the SpeakNotes benchmarks.
+import time
+
+time.sleep({STUB_FIXED_SECONDS})  # driver load cost
+
+
+class _Voice:
+    def __init__(self, vid, name):
+        self.id = vid
+        self.name = name
+
+
+class _Engine:
+    def __init__(self):
+        self._props = {{"rate": 200, "volume": 1.0, "voice": "stub-0"}}
+        self._queue = []
+
+    def getProperty(self, name):
+        if name == "voices":
+            return [_Voice("stub-0", "Stub Voice 0"), _Voice("stub-1", "Stub Voice 1")]
+        return self._props[name]
+
+    def setProperty(self, name, value):
+        self._props[name] = value
+
+    def say(self, text):
+        self._queue.append((text, None))
+
+    def save_to_file(self, text, path):
+        self._queue.append((text, path))
+
+    def runAndWait(self):
+        for text, path in self._queue:
+            time.sleep({STUB_SECONDS_PER_CHAR} * len(text))
+            if path:
+                with open(path, "wb") as f:
+                    f.write(b"\\0" * ({STUB_BYTES_PER_CHAR} * len(text)))
+        self._queue = []
+
+    def stop(self):
+        pass
+
+
+def init():
+    time.sleep({STUB_FIXED_SECONDS})
+    return _Engine()
+"""
+
+
+# ---- Helpers ----
+
+def make_text(n_chars: int) -> str:
+    """
+    Deterministic prose of exactly n_chars characters.
+    """
+    sentence = "The quick brown fox reads its notes aloud. "
+    return (sentence * (n_chars // len(sentence) + 1))[:n_chars]
+
+
+def percentile(values: list[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    k = (len(ordered) - 1) * pct / 100
+    lo, hi = int(k), min(int(k) + 1, len(ordered) - 1)
+    return ordered[lo] + (ordered[hi] - ordered[lo]) * (k - lo)
+
+
+def summarize(latencies: list[float]) -> dict[str, float]:
+    return {
+        "calls": len(latencies),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+        "mean_ms": round(statistics.fmean(latencies) * 1000, 3) if latencies else 0.0,
+    }
+
+
+def fit_overhead(samples: list[tuple[int, float]]) -> dict[str, float]:
+    """
+    Least-squares fit of latency = fixed + chars / throughput.
+    """
+    xs = [float(c) for c, _ in samples]
+    ys = [t for _, t in samples]
+    mean_x, mean_y = statistics.fmean(xs), statistics.fmean(ys)
+    var_x = sum((x - mean_x) ** 2 for x in xs)
+    slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / var_x if var_x else 0.0
+    fixed = mean_y - slope * mean_x
+    return {
+        "fixed_overhead_ms": round(fixed * 1000, 3),
+        "chars_per_sec": round(1 / slope, 1) if slope > 0 else None,
+    }
+
+
+def time_calls(fn: Callable[[str, Path], None], out_dir: Path, repeats: int) -> dict[str, Any]:
+    samples: list[tuple[int, float]] = []
+    by_length: dict[str, Any] = {}
+    for n_chars in TEXT_LENGTHS:
+        text = make_text(n_chars)
+        latencies = []
+        for i in range(repeats):
+            out_path = out_dir / f"len{n_chars}-{i}.aiff"
+            started = time.perf_counter()
+            fn(text, out_path)
+            latencies.append(time.perf_counter() - started)
+            samples.append((n_chars, latencies[-1]))
+        by_length[str(n_chars)] = summarize(latencies)
+
+    total_chars = sum(c for c, _ in samples)
+    total_time = sum(t for _, t in samples)
+    return {
+        "by_length": by_length,
+        "overall_chars_per_sec": round(total_chars / total_time, 1) if total_time else None,
+        **fit_overhead(samples),
+    }
+
+
+# ---- Benchmarks ----
+
+def bench_say_to_file(out_dir: Path, repeats: int) -> dict[str, Any] | None:
+    if not shutil.which("say"):
+        return None
+    from speaknotes.macos_say import say_to_file
+    return time_calls(lambda text, path: say_to_file(text=text, output_path=path), out_dir, repeats)
+
+
+def bench_synthesize_to_file(out_dir: Path, repeats: int) -> dict[str, Any] | None:
+    try:
+        from speaknotes.engine_worker import EngineWorker
+        from speaknotes.tts import synthesize_to_file
+    except ImportError:
+        return None
+
+    import contextlib
+    import io
+
+    results: dict[str, Any] = {}
+    with contextlib.redirect_stdout(io.StringIO()):
+        results["per_call_engine"] = time_calls(
+            lambda text, path: synthesize_to_file(text=text, output_path=path), out_dir, repeats
+        )
+        worker = EngineWorker()
+        try:
+            worker.start()
+            results["engine_worker"] = time_calls(
+                lambda text, path: synthesize_to_file(text=text, output_path=path, worker=worker), out_dir, repeats
+            )
+        finally:
+            worker.stop()
+    return results
+
+
+def bench_bulk_export(out_dir: Path, n_paragraphs: int) -> dict[str, Any] | None:
+    """
+    The bulk export pipeline: split_into_paragraphs + export_parts through say_to_file.
+    """
+    if not shutil.which("say"):
+        return None
+    from speaknotes.bulk import export_parts
+    from speaknotes.macos_say import say_to_file
+    from speaknotes.text_utils import split_into_paragraphs
+
+    document = "\n\n".join(make_text(300 + (i % 5) * 100) for i in range(n_paragraphs))
+    results: dict[str, Any] = {"paragraphs": n_paragraphs, "chars": len(document)}
+
+    for workers in (1, 4):
+        started = time.perf_counter()
+        parts = split_into_paragraphs(document)
+        split_seconds = time.perf_counter() - started
+        out_paths = [out_dir / f"bulk-w{workers}-part-{i:03d}.aiff" for i in range(1, len(parts) + 1)]
+        export_parts(parts, out_paths, lambda text, path: say_to_file(text=text, output_path=path), workers=workers)
+        elapsed = time.perf_counter() - started
+        results[f"workers_{workers}"] = {
+            "seconds": round(elapsed, 3),
+            "split_ms": round(split_seconds * 1000, 3),
+            "parts_per_sec": round(len(parts) / elapsed, 2),
+            "chars_per_sec": round(len(document) / elapsed, 1),
+        }
+    return results
+
+
+def bench_history(work_dir: Path, backend: str, appends_per_size: int) -> dict[str, Any]:
+    """
+    Cost of one append_history call as the history grows.
+    """
+    from types import SimpleNamespace
+    from speaknotes import history_utils
+
+    previous_cwd = Path.cwd()
+    bench_dir = work_dir / f"history-{backend}"
+    bench_dir.mkdir()
+    os.chdir(bench_dir)
+    try:
+        history_utils.set_history_backend(backend)
+        settings = SimpleNamespace(rate=185, volume=1.0, voice_id=None)
+        entry = history_utils.create_entry(Path("outputs/bench.aiff"), settings, "export", make_text(80))
+        results: dict[str, Any] = {}
+        current = 0
+        for size in HISTORY_SIZES:
+            if size > current:
+                history_utils.append_history_many([dict(entry) for _ in range(size - current)])
+                current = size
+            latencies = []
+            for _ in range(appends_per_size):
+                started = time.perf_counter()
+                history_utils.append_history(dict(entry))
+                latencies.append(time.perf_counter() - started)
+            current += appends_per_size
+            started = time.perf_counter()
+            history_utils.load_history()
+            load_seconds = time.perf_counter() - started
+            results[str(size)] = {**summarize(latencies), "load_history_ms": round(load_seconds * 1000, 3)}
+        return results
+    finally:
+        os.chdir(previous_cwd)
+        history_utils.set_history_backend("jsonl")
+
+
+# ---- Runner ----
+
+def install_stub_engine(stub_dir: Path) -> None:
+    """
+    Puts the stub 'say' on PATH and the stub pyttsx3 first on sys.path (also for spawned workers).
+    """
+    say = stub_dir / "say"
+    say.write_text(STUB_SAY, encoding="utf-8")
+    say.chmod(0o755)
+    (stub_dir / "pyttsx3.py").write_text(STUB_PYTTSX3, encoding="utf-8")
+
+    os.environ["PATH"] = f"{stub_dir}{os.pathsep}{os.environ.get('PATH', '')}"
+    os.environ["PYTHONPATH"] = f"{stub_dir}{os.pathsep}{os.environ.get('PYTHONPATH', '')}"
+    sys.path.insert(0, str(stub_dir))
+
+
+def run_suite(engine: str, repeats: int, paragraphs: int, history_appends: int) -> dict[str, Any]:
+    with tempfile.TemporaryDirectory(prefix="speaknotes-bench-") as tmp:
+        work_dir = Path(tmp)
+        if engine == "stub":
+            stub_dir = work_dir / "stub"
+            stub_dir.mkdir()
+            install_stub_engine(stub_dir)
+
+        out_dir = work_dir / "outputs"
+        out_dir.mkdir()
+        return {
+            "engine": engine,
+            "say_to_file": bench_say_to_file(out_dir, repeats),
+            "synthesize_to_file": bench_synthesize_to_file(out_dir, repeats),
+            "bulk_export": bench_bulk_export(out_dir, paragraphs),
+            "append_history": {
+                "jsonl": bench_history(work_dir, "jsonl", history_appends),
+                "sqlite": bench_history(work_dir, "sqlite", history_appends),
+            },
+        }
+
+
+def flatten(data: Any, prefix: str = "") -> dict[str, float]:
+    flat: dict[str, float] = {}
+    if isinstance(data, dict):
+        for key, value in data.items():
+            flat.update(flatten(value, f"{prefix}.{key}" if prefix else str(key)))
+    elif isinstance(data, (int, float)) and not isinstance(data, bool):
+        flat[prefix] = float(data)
+    return flat
+
+
+def find_regressions(current: dict[str, Any], baseline: dict[str, Any], threshold: float) -> list[dict[str, Any]]:
+    """
+    Compares latency metrics (*_ms, seconds: lower is better) and throughput
+    metrics (*_per_sec: higher is better) against a baseline run.
+    """
+    now, before = flatten(current.get("suites")), flatten(baseline.get("suites"))
+    regressions = []
+    for key, old in before.items():
+        new = now.get(key)
+        if new is None or old <= 0:
+            continue
+        if key.endswith("_ms") and old < NOISE_FLOOR_MS:
+            continue  # sub-millisecond timings are dominated by noise
+        if key.endswith("_ms") or key.endswith("seconds"):
+            change = (new - old) / old
+        elif key.endswith("_per_sec"):
+            change = (old - new) / old
+        else:
+            continue
+        if change > threshold:
+            regressions.append({"metric": key, "baseline": old, "current": new, "worse_by": round(change, 3)})
+    return regressions
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="SpeakNotes synthesis benchmarks")
+    parser.add_argument("--engine", choices=("stub", "real", "both"), default="stub")
+    parser.add_argument("--repeats", type=int, default=5, help="Calls per text length.")
+    parser.add_argument("--paragraphs", type=int, default=40, help="Paragraphs in the bulk export document.")
+    parser.add_argument("--history-appends", type=int, default=50, help="Timed appends per history size.")
+    parser.add_argument("--output", type=Path, help="Write the JSON results to this file.")
+    parser.add_argument("--baseline", type=Path, help="Earlier results to compare against.")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed slowdown vs. baseline (0.2 = 20%%).")
+    parser.add_argument("--_suite", choices=("stub", "real"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args._suite:
+        # Child process: one engine per process so the stub never shadows the real engine.
+        suite = run_suite(args._suite, args.repeats, args.paragraphs, args.history_appends)
+        print(json.dumps(suite))
+        return 0
+
+    engines = ("stub", "real") if args.engine == "both" else (args.engine,)
+    suites = {}
+    for engine in engines:
+        cmd = [
+            sys.executable, str(Path(__file__).resolve()), "--_suite", engine,
+            "--repeats", str(args.repeats), "--paragraphs", str(args.paragraphs),
+            "--history-appends", str(args.history_appends),
+        ]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        if proc.returncode != 0:
+            print(proc.stderr, file=sys.stderr)
+            raise SystemExit(f"{engine} benchmark suite failed")
+        suites[engine] = json.loads(proc.stdout.strip().splitlines()[-1])
+
+    results: dict[str, Any] = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "stub_model": {
+            "fixed_seconds": STUB_FIXED_SECONDS,
+            "seconds_per_char": STUB_SECONDS_PER_CHAR,
+        },
+        "suites": suites,
+    }
+
+    exit_code = 0
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        results["regressions"] = find_regressions(results, baseline, args.threshold)
+        exit_code = 1 if results["regressions"] else 0
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output, encoding="utf-8")
+    print(output)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,10 @@
 from __future__ import annotations
 
+import time
+
+_PROCESS_STARTED = time.perf_counter()
+
+import argparse
 import tkinter as tk
 import subprocess
 import sys
@@ -8,18 +13,234 @@ import threading
 from tkinter import filedialog, messagebox, ttk
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING, Callable
 
 from speaknotes.presets import PRESETS
-from speaknotes.tts import TTSSettings, list_voices, speak_now, synthesize_to_file
-from speaknotes.history_utils import append_history, create_entry, load_history
+from speaknotes.tts import TTSSettings, synthesize_to_file
+from speaknotes.history_utils import (
+    append_history,
+    create_entry,
+    delete_history_entries,
+    history_version,
+    load_history,
+    query_history,
+)
 from speaknotes.config_utils import load_config, save_config
-from speaknotes.text_utils import split_into_paragraphs
-from speaknotes.macos_say import say_to_file, say_now
+from speaknotes.io_utils import iter_text_file, read_text_head
+from speaknotes.cancel import CancelToken, JobCancelled, run_process
+from speaknotes.jobs import Job, JobQueue
+from speaknotes.manifest import BulkManifest, file_hash, text_hash
+from speaknotes.text_utils import iter_chunks
+from speaknotes.trace import Trace, stage
+from speaknotes.macos_say import say_to_file
+from speaknotes.render_cache import RenderCache
+from speaknotes.startup import StartupTimer
+from speaknotes.voice_cache import read_voice_cache, refresh_voices_async
+
+# Heavier modules (worker pools, engine process, streaming) are imported on first use.
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from speaknotes.encode import Encoder
+    from speaknotes.engine_worker import EngineWorker
+    from speaknotes.streaming import StreamingPreview
 
 APP_ROOT = Path(__file__).resolve().parent
 APP_CWD = Path.cwd()
 APP_VERSION = "v1.0"
+HISTORY_PAGE_SIZE = 200     # rows the history table takes from its result snapshot at a time
+HISTORY_CACHED_PAGES = 4    # pages kept while scrolling (the visible rows plus a buffer)
+HISTORY_POLL_MS = 1000      # how often an open history window checks for new or removed entries
+HISTORY_SEARCH_DEBOUNCE_MS = 200  # pause in typing before the history search runs
+# Files above this size are not loaded into the text box; bulk export streams them from disk.
+LARGE_FILE_BYTES = 1_000_000
+LARGE_FILE_EXCERPT_CHARS = 20_000
+CLOSE_GRACE_SECONDS = 10    # how long closing the app waits for cancelled jobs to clean up
+
+
+class VirtualTreeview:
+    """
+    A Treeview that shows a window onto a result set of any size.
+
+    Only as many items as fit on screen exist in the widget; scrolling rewrites
+    their values in place from pages fetched on demand with fetch(offset, limit),
+    so opening and scrolling cost the same for 100 rows or 100k. Row order and
+    total come from the caller (count()). Both run on the Tk thread, so they
+    should be cheap, e.g. slices of a result set built on a worker.
+    """
 
+    def __init__(
+        self,
+        parent: tk.Misc,
+        columns: tuple[str, ...],
+        fetch: Callable[[int, int], list[tuple]],
+        count: Callable[[], int],
+        height: int = 14,
+        page_size: int = HISTORY_PAGE_SIZE,
+        cached_pages: int = HISTORY_CACHED_PAGES,
+    ) -> None:
+        self.fetch = fetch
+        self.count = count
+        self.page_size = page_size
+        self.cached_pages = cached_pages
+        self.total = 0
+        self.first = 0                       # index of the row shown in the top slot
+        self.selected: int | None = None     # absolute index of the selected row
+        self._pages: dict[int, list[tuple]] = {}  # page number -> rows, oldest fetch first
+        self._slots: list[str] = []
+        self._shown: dict[str, tuple] = {}   # slot -> values it displays; absent while detached
+
+        self.frame = tk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", height=height, selectmode="browse")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.tree.bind("<Configure>", lambda _e: self._resize())
+        self.tree.bind("<<TreeviewSelect>>", self._on_select)
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda _e: self.scroll(-3))
+        self.tree.bind("<Button-5>", lambda _e: self.scroll(3))
+        for key, step in (("<Up>", -1), ("<Down>", 1), ("<Prior>", "-page"), ("<Next>", "page")):
+            self.tree.bind(key, lambda _e, step=step: self._move_selection(step))
+        self.tree.bind("<Home>", lambda _e: self._select_index(0))
+        self.tree.bind("<End>", lambda _e: self._select_index(self.total - 1))
+
+    # ---- Data ----
+
+    def reset(self, total: int | None = None) -> None:
+        """
+        Drops fetched rows, recounts (unless total is already known) and shows
+        the top of the result set.
+        """
+        self._pages.clear()
+        self.total = self.count() if total is None else total
+        self.first = 0
+        self.selected = None
+        self._render()
+
+    def refresh(self, total: int | None = None) -> None:
+        """
+        Refetches and recounts (unless total is already known), keeping the
+        scroll position where possible. Only cells that changed are rewritten.
+        """
+        selected_row = self.row(self.selected) if self.selected is not None else None
+        self._pages.clear()
+        self.total = self.count() if total is None else total
+        if self.selected is not None and (self.selected >= self.total or self.row(self.selected) != selected_row):
+            self.selected = None  # rows shifted under the selection; don't highlight a different entry
+        self._render()
+
+    def row(self, index: int) -> tuple | None:
+        page_no, pos = divmod(index, self.page_size)
+        page = self._pages.get(page_no)
+        if page is None:
+            page = self.fetch(page_no * self.page_size, self.page_size)
+            self._pages[page_no] = page
+            while len(self._pages) > self.cached_pages:
+                self._pages.pop(next(iter(self._pages)))
+        return page[pos] if pos < len(page) else None
+
+    # ---- Layout ----
+
+    def visible_rows(self) -> int:
+        rowheight = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        height = self.tree.winfo_height()
+        if height <= 1:  # not mapped yet
+            return int(self.tree.cget("height"))
+        return max(1, (height - rowheight) // rowheight)  # minus the heading row
+
+    def _resize(self) -> None:
+        wanted = self.visible_rows()
+        while len(self._slots) < wanted:
+            self._slots.append(self.tree.insert("", "end", values=()))
+        while len(self._slots) > wanted:
+            iid = self._slots.pop()
+            self._shown.pop(iid, None)
+            self.tree.delete(iid)
+        self._render()
+
+    def _render(self) -> None:
+        visible = len(self._slots)
+        self.first = max(0, min(self.first, self.total - visible))
+        selected_slot = None
+        for slot, iid in enumerate(self._slots):
+            index = self.first + slot
+            values = self.row(index) if index < self.total else None
+            shown = self._shown.get(iid)
+            if values is None:
+                if shown is not None:
+                    self.tree.detach(iid)
+                    del self._shown[iid]
+                continue
+            # Touch the widget only for slots whose row changed (Tk redraws are the slow part).
+            if shown is None:
+                self.tree.move(iid, "", slot)
+            if shown != values:
+                self.tree.item(iid, values=values)
+                self._shown[iid] = values
+            if index == self.selected:
+                selected_slot = iid
+        # Keep the highlight on the same row, not the same slot, while scrolling.
+        if selected_slot:
+            self.tree.selection_set(selected_slot)
+        else:
+            self.tree.selection_set(())
+        if self.total:
+            self.scrollbar.set(self.first / self.total, min(1.0, (self.first + visible) / self.total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ---- Scrolling ----
+
+    def scroll(self, rows: int) -> str:
+        self.first += rows
+        self._render()
+        return "break"
+
+    def _on_scrollbar(self, action: str, amount: str, unit: str = "units") -> None:
+        visible = len(self._slots)
+        if action == "moveto":
+            self.first = int(float(amount) * self.total)
+        elif unit == "pages":
+            self.first += int(amount) * max(1, visible - 1)
+        else:
+            self.first += int(amount)
+        self._render()
+
+    def _on_wheel(self, event: tk.Event) -> str:
+        # Windows reports multiples of 120; macOS reports small deltas.
+        delta = event.delta // 120 if abs(event.delta) >= 120 else event.delta
+        return self.scroll(-3 * delta if delta else 0)
+
+    # ---- Selection ----
+
+    def _on_select(self, _event: tk.Event) -> None:
+        selection = self.tree.selection()
+        if selection and selection[0] in self._slots:
+            self.selected = self.first + self._slots.index(selection[0])
+
+    def _select_index(self, index: int) -> str:
+        if self.total == 0:
+            return "break"
+        index = max(0, min(index, self.total - 1))
+        self.selected = index
+        visible = len(self._slots)
+        if index < self.first:
+            self.first = index
+        elif index >= self.first + visible:
+            self.first = index - visible + 1
+        self._render()
+        slot = self._slots[index - self.first]
+        self.tree.focus(slot)
+        self.tree.see(slot)
+        return "break"
+
+    def _move_selection(self, step: int | str) -> str:
+        page = max(1, len(self._slots) - 1)
+        delta = {"page": page, "-page": -page}.get(step, step)  # type: ignore[arg-type]
+        start = self.selected if self.selected is not None else self.first - 1
+        return self._select_index(start + delta)
 
 
 class SpeakNotesApp:
@@ -33,9 +254,19 @@ class SpeakNotesApp:
         self.root.geometry("720x520")
 
         # ---- Data we keep in the app (state) ----
-        self.voice_items = list_voices()  # list of (voice_id, voice_name)
+        # Show the cached voice list right away; enumerate in the background if it is stale.
+        cached_voices, voices_fresh = read_voice_cache()
+        self.voice_items = cached_voices or []  # list of (voice_id, voice_name)
         self.voice_name_to_id = {name: vid for vid, name in self.voice_items}
         self.last_export_path: Path | None = None
+        self.active_preview: StreamingPreview | None = None
+        self.active_playback: CancelToken | None = None  # history playback the Stop button can end
+        self.render_cache = RenderCache()
+        self._encoder: Encoder | None = None
+        # Output names only have one-second resolution; names handed out this session are kept unique.
+        self._claimed_outputs: set[Path] = set()
+        self._claimed_outputs_lock = threading.Lock()
+        self._job_clock_id: str | None = None
 
         # ---- UI Variables (Tkinter StringVars) ----
         config = load_config()
@@ -45,9 +276,21 @@ class SpeakNotesApp:
         self.mode_var = tk.StringVar(value=config.get("mode", "export"))
         self.rate_var = tk.IntVar(value=int(config.get("rate", 175)))
         self.volume_var = tk.DoubleVar(value=float(config.get("volume", 1.0)))
+        self.workers_var = tk.IntVar(value=int(config.get("bulk_workers", 2)))
+        self.combine_var = tk.BooleanVar(value=bool(config.get("bulk_combine", False)))
+        self.gap_var = tk.DoubleVar(value=float(config.get("bulk_gap_seconds", 0.5)))
+        self.format_var = tk.StringVar(value=config.get("output_format", "aiff"))
+        # Jobs run on a few worker threads so the UI stays free; previews jump the queue.
+        self.job_queue = JobQueue(max_workers=int(config.get("max_jobs", 2)), on_change=self._on_job_changed)
+        # Optional hard limit for export jobs; single engine calls are always limited (see cancel.timeout_for_text).
+        self.job_timeout: float | None = config.get("job_timeout_seconds")
+        self.history_timings = bool(config.get("history_timings", False))  # store per-stage timings in history entries
+        self.profile_jobs = False  # set by --profile
+        # Bulk chunk bounds (characters): short paragraphs merge, long ones split at sentences.
+        self.bulk_min_chars = int(config.get("bulk_min_chars", 40))
+        self.bulk_max_chars = int(config.get("bulk_max_chars", 2000))
      
         self.status_var = tk.StringVar(value="Ready.")
-        self.history_search_var = tk.StringVar(value="")
 
         # Flag to prevent preset/slider feedback loops
         self._is_applying_preset = False
@@ -65,13 +308,22 @@ class SpeakNotesApp:
         self.mode_var.trace_add("write", lambda *_: self.save_current_config())
         self.rate_var.trace_add("write", lambda *_: (self.on_slider_changed(), self.save_current_config()))
         self.volume_var.trace_add("write", lambda *_: (self.on_slider_changed(), self.save_current_config()))
+        self.workers_var.trace_add("write", lambda *_: self.save_current_config())
+        self.combine_var.trace_add("write", lambda *_: self.save_current_config())
+        self.gap_var.trace_add("write", lambda *_: self.save_current_config())
+        self.format_var.trace_add("write", lambda *_: self.save_current_config())
 
         # Track where the current text came from
         self.text_source = "manual"      
         self.text_source_path = ""       
+        self.large_source_path: Path | None = None  # set when only an excerpt is shown
+
+        # Restore the draft after the first frame so a big draft can't delay the window.
+        self.root.after_idle(self.load_draft)
+        self.root.after(3000, self._schedule_draft_autosave)
 
-        self.load_draft()
-        self._schedule_draft_autosave()
+        if cached_voices is None or not voices_fresh:
+            self.refresh_voices()
         self.root.protocol("WM_DELETE_WINDOW", self._on_close)
 
         
@@ -87,11 +339,16 @@ class SpeakNotesApp:
         tk.Label(top_frame, text="Voice").pack(side="left", padx=(16, 0))
 
         voice_options = ["Default (system)"] + [name for _, name in self.voice_items]
-        voice_menu = tk.OptionMenu(top_frame, self.voice_var, *voice_options)
-        voice_menu.pack(side="left", padx=8)
+        self.voice_menu = tk.OptionMenu(top_frame, self.voice_var, *voice_options)
+        self.voice_menu.pack(side="left", padx=8)
         tk.Label(top_frame, text="Mode").pack(side="left", padx=(16, 0))
         mode_menu = tk.OptionMenu(top_frame, self.mode_var, "preview", "export", "both")
         mode_menu.pack(side="left", padx=8)
+        tk.Label(top_frame, text="Format").pack(side="left", padx=(16, 0))
+        # Compressed formats are added once we know which encoders are installed.
+        self.format_menu = tk.OptionMenu(top_frame, self.format_var, *dict.fromkeys(["aiff", "wav", self.format_var.get()]))
+        self.format_menu.pack(side="left", padx=8)
+        self.root.after_idle(self._load_output_formats)
 
 
         # Text box + scrollbar
@@ -145,6 +402,10 @@ class SpeakNotesApp:
         tk.Button(btn_frame, text="Open Outputs", command=self.open_outputs_folder).pack(side="left", padx=8)
        
         tk.Button(btn_frame, text="Bulk Export", command=self.bulk_export).pack(side="left", padx=8)
+        tk.Label(btn_frame, text="Workers").pack(side="left")
+        tk.Spinbox(btn_frame, from_=1, to=16, width=3, textvariable=self.workers_var).pack(side="left", padx=(4, 0))
+        tk.Checkbutton(btn_frame, text="Combine, gap (s)", variable=self.combine_var).pack(side="left", padx=(8, 0))
+        tk.Spinbox(btn_frame, from_=0.0, to=10.0, increment=0.25, width=4, textvariable=self.gap_var).pack(side="left", padx=(2, 0))
         
         self.run_btn = tk.Button(
             btn_frame,
@@ -154,6 +415,37 @@ class SpeakNotesApp:
             font=("TkDefaultFont", 10, "bold")
         )
         self.run_btn.pack(side="right", padx=6, pady=2)
+        self.skip_btn = tk.Button(btn_frame, text="Skip", command=self.skip_preview, state="disabled")
+        self.skip_btn.pack(side="right", padx=2, pady=2)
+        self.stop_btn = tk.Button(btn_frame, text="Stop", command=self.stop_preview, state="disabled")
+        self.stop_btn.pack(side="right", padx=2, pady=2)
+
+        # Job queue panel
+        queue_frame = tk.LabelFrame(self.root, text="Jobs")
+        queue_frame.pack(fill="x", padx=12, pady=(0, 8))
+
+        self.queue_tree = ttk.Treeview(
+            queue_frame,
+            columns=("id", "kind", "status", "waited", "ran", "text"),
+            show="headings",
+            height=4,
+        )
+        for col, title, width in (
+            ("id", "#", 40),
+            ("kind", "Job", 70),
+            ("status", "Status", 80),
+            ("waited", "Waited", 70),
+            ("ran", "Ran", 70),
+            ("text", "Text", 300),
+        ):
+            self.queue_tree.heading(col, text=title)
+            self.queue_tree.column(col, width=width, anchor="w", stretch=(col == "text"))
+        self.queue_tree.pack(side="left", fill="x", expand=True, padx=(6, 0), pady=6)
+
+        queue_btns = tk.Frame(queue_frame)
+        queue_btns.pack(side="right", padx=6, pady=6)
+        tk.Button(queue_btns, text="Cancel", command=self.cancel_selected_job).pack(fill="x")
+        tk.Button(queue_btns, text="Clear done", command=self.clear_finished_jobs).pack(fill="x", pady=(4, 0))
 
         # Status line
         status_frame = tk.Frame(self.root)
@@ -179,6 +471,111 @@ class SpeakNotesApp:
         
 
 
+    @property
+    def engine_worker(self) -> EngineWorker:
+        """
+        The warm pyttsx3 engine shared by all jobs (its process starts on first request).
+        """
+        from speaknotes.engine_worker import get_engine_worker
+        return get_engine_worker()
+
+    @property
+    def encoder(self) -> Encoder:
+        """
+        Background pool that converts finished renders to the chosen output format.
+        """
+        if self._encoder is None:
+            from speaknotes.encode import Encoder
+            self._encoder = Encoder(max_workers=2)
+        return self._encoder
+
+    def _load_output_formats(self) -> None:
+        """
+        Fills the Format menu with the formats that have an encoder on this machine.
+        """
+        from speaknotes.encode import available_formats
+
+        formats = available_formats()
+        menu = self.format_menu["menu"]
+        menu.delete(0, "end")
+        for fmt in formats:
+            menu.add_command(label=fmt, command=tk._setit(self.format_var, fmt))
+        if self.format_var.get() not in formats:
+            self.format_var.set("aiff")
+
+    def _record_export(self, path: Path, settings: TTSSettings, mode: str, text: str, source: str, source_path: str, trace: Trace | None) -> None:
+        entry = create_entry(path, settings, mode, text, source, source_path)
+        if trace is not None and self.history_timings:
+            entry["timings"] = trace.as_dict()  # everything up to (not including) this history write
+        with stage(trace, "history"):
+            append_history(entry)
+
+    def _deliver_export(
+        self,
+        out_path: Path,
+        settings: TTSSettings,
+        mode: str,
+        text: str,
+        fmt: str,
+        source: str,
+        source_path: str,
+        trace: Trace | None = None,
+    ) -> str:
+        """
+        Records a finished render in history, first converting it to fmt in the
+        background if needed. source/source_path are captured when the job is
+        queued, since another file may be loaded before it runs. Returns the
+        status line to show now; with a trace, the stage breakdown is appended to it.
+        """
+        if fmt == "aiff":
+            self.last_export_path = out_path
+            self._record_export(out_path, settings, mode, text, source, source_path, trace)
+            return f"Saved: {out_path}" + (f" ({trace.summary()})" if trace else "")
+
+        encode_started = time.perf_counter()
+
+        def on_done(final_path: Path | None, error: BaseException | None) -> None:
+            if error is not None:
+                message = f"Could not encode {out_path.name} to .{fmt}:\n{error}"
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
+                self.set_status_async("Encoding failed.")
+                return
+            if trace is not None:
+                trace.add("encode", time.perf_counter() - encode_started)
+            self.last_export_path = final_path
+            self._record_export(final_path, settings, mode, text, source, source_path, trace)
+            self.set_status_async(f"Saved: {final_path}" + (f" ({trace.summary()})" if trace else ""))
+
+        self.encoder.submit(out_path, fmt, on_done)
+        return f"Rendered {out_path.name}, encoding to .{fmt}..."
+
+    def refresh_voices(self) -> None:
+        """
+        Re-enumerates voices in the background and updates the Voice menu when done.
+        """
+        def on_done(voices: list[tuple[str, str]]) -> None:
+            self.root.after(0, lambda: self._set_voice_items(voices))
+
+        def on_error(error: Exception) -> None:
+            self.set_status_async(f"Could not list voices: {error}")
+
+        refresh_voices_async(on_done, worker=self.engine_worker, on_error=on_error)
+
+    def _set_voice_items(self, voices: list[tuple[str, str]]) -> None:
+        """
+        Replaces the Voice menu entries, keeping the current selection when it still exists.
+        """
+        self.voice_items = voices
+        self.voice_name_to_id = {name: vid for vid, name in voices}
+
+        menu = self.voice_menu["menu"]
+        menu.delete(0, "end")
+        for name in ["Default (system)"] + [name for _, name in voices]:
+            menu.add_command(label=name, command=tk._setit(self.voice_var, name))
+
+        if self.voice_var.get() not in self.voice_name_to_id:
+            self.voice_var.set("Default (system)")
+
     def set_status(self, message: str) -> None:
         """
         Updates the status line and flushes UI redraw tasks.
@@ -210,6 +607,7 @@ class SpeakNotesApp:
         # If the user types anything, we consider it manual input.
         self.text_source = "manual"
         self.text_source_path = ""
+        self.large_source_path = None
 
 
     def get_settings(self) -> TTSSettings:
@@ -264,65 +662,137 @@ class SpeakNotesApp:
         safe = "".join(ch for ch in user_text.lower() if ch.isalnum() or ch in (" ", "-", "_")).strip()
         safe = safe.replace(" ", "-")[:40] or "note"
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        return (APP_ROOT / "outputs") / f"{timestamp}-{safe}.aiff"
+        return self._claim_output_path((APP_ROOT / "outputs") / f"{timestamp}-{safe}.aiff")
     
-    def make_output_path_part(self, user_text: str, part_index: int, total_parts: int) -> Path:
+    def make_output_path_part(self, user_text: str, part_index: int, total_parts: int | None) -> Path:
         """
         Creates a timestamped filename for a chunked export (part-XXX).
+        total_parts is None when streaming a file whose part count isn't known yet.
         """
         safe = "".join(ch for ch in user_text.lower() if ch.isalnum() or ch in (" ", "-", "_")).strip()
         safe = safe.replace(" ", "-")[:30] or "note"
         timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
-        part = f"part-{part_index:03d}-of-{total_parts:03d}"
-        return (APP_ROOT / "outputs") / f"{timestamp}-{part}-{safe}.aiff"
+        part = f"part-{part_index:03d}-of-{total_parts:03d}" if total_parts else f"part-{part_index:04d}"
+        return self._claim_output_path((APP_ROOT / "outputs") / f"{timestamp}-{part}-{safe}.aiff")
 
+    def _claim_output_path(self, path: Path) -> Path:
+        """
+        Returns path, or path with a -2, -3, ... suffix if an existing file or another
+        job queued this session already has that name (e.g. the same text run twice
+        within a second). Safe to call from worker threads.
+        """
+        with self._claimed_outputs_lock:
+            candidate, n = path, 1
+            while candidate in self._claimed_outputs or candidate.exists():
+                n += 1
+                candidate = path.with_name(f"{path.stem}-{n}{path.suffix}")
+            self._claimed_outputs.add(candidate)
+            return candidate
     
-    def _set_controls_enabled(self, enabled: bool) -> None:
+    def _preview_finished(self) -> None:
         """
-        Enables or disables main action buttons to prevent concurrent runs.
+        Forgets the finished preview and disables Stop/Skip again.
+        """
+        self.active_preview = None
+        self._set_preview_controls_enabled(False)
+
+    def _set_preview_controls_enabled(self, enabled: bool) -> None:
+        """
+        Enables the Stop/Skip buttons only while a preview is playing.
         """
         state = "normal" if enabled else "disabled"
-        for btn in (self.run_btn,):
+        for btn in (self.stop_btn, self.skip_btn):
             btn.config(state=state)
 
 
-    def _run_job(self, status_start: str, job_fn, status_done: str | None = None) -> None:
+    # ---- Job queue ----
+
+    def _on_job_changed(self, job: Job) -> None:
         """
-        Runs a blocking job on the Tkinter main thread (macOS-safe) and keeps UI state consistent.
-        The job is scheduled with 'after' so the start status is visible before work begins.
+        Queue callback (worker threads): refreshes the job's row on the Tk main loop.
         """
-        self._set_controls_enabled(False)
-        self.set_status(status_start)
-    
-        def run_job() -> None:
+        self.root.after(0, lambda: self._show_job(job))
+
+    def _show_job(self, job: Job) -> None:
+        """
+        Inserts or updates the job's row in the queue panel and keeps the timing clock running.
+        """
+        ran = job.ran()
+        values = (job.id, job.kind, job.status, f"{job.waited():.1f}s", "" if ran is None else f"{ran:.1f}s", job.label)
+        iid = str(job.id)
+        if self.queue_tree.exists(iid):
+            self.queue_tree.item(iid, values=values)
+        else:
+            self.queue_tree.insert("", "end", iid=iid, values=values)
+
+        if not job.finished and self._job_clock_id is None:
+            self._job_clock_id = self.root.after(1000, self._tick_job_clock)
+
+    def _tick_job_clock(self) -> None:
+        """
+        Updates the Waited/Ran columns of unfinished jobs once a second.
+        """
+        self._job_clock_id = None
+        for job in self.job_queue.jobs():
+            if not job.finished:
+                self._show_job(job)
+
+    def cancel_selected_job(self) -> None:
+        """
+        Cancels the selected job; a running one has its engine or player killed.
+        """
+        for iid in self.queue_tree.selection():
+            if self.job_queue.cancel(int(iid)):
+                self.set_status(f"Cancelling job #{iid}...")
+            else:
+                self.set_status(f"Job #{iid} has already finished.")
+
+    def clear_finished_jobs(self) -> None:
+        """
+        Removes finished, failed and cancelled jobs from the panel.
+        """
+        for job in self.job_queue.clear_finished():
+            if self.queue_tree.exists(str(job.id)):
+                self.queue_tree.delete(str(job.id))
+
+    def _enqueue(self, kind: str, text: str, fn, group: str | None = None, timeout: float | None = None) -> None:
+        """
+        Adds a job to the queue; it runs on a queue worker thread when its turn comes
+        and receives the job's CancelToken. An export job returns the path of the
+        file it produces (the profile report is written next to it).
+        """
+        label = text[:40].replace("\n", " ")
+        if self.profile_jobs:
+            fn = self._profiled(kind, fn)
+        job = self.job_queue.submit(kind, label, fn, group=group, timeout=timeout)
+        self.set_status(f"Queued {kind} job #{job.id}.")
+
+    def _profiled(self, kind: str, fn):
+        """
+        Wraps a job so it runs under the profiler; the report goes next to the
+        file the job returns, or into outputs/ if it returns none (or fails).
+        """
+        from speaknotes.profiling import Profiler, ProfilerBusy, report_path_for
+
+        def run(token: CancelToken) -> Path | None:
+            profiler = Profiler()
             try:
-                job_fn()
-                if status_done:
-                    self.set_status(status_done)
-            except Exception as e:
-                messagebox.showerror("Error", str(e))
-                self.set_status("Error.")
+                profiler.start()
+            except ProfilerBusy:
+                return fn(token)  # another job holds the profiler; run this one plainly
+            output = None
+            try:
+                output = fn(token)
+                return output
             finally:
-                self._set_controls_enabled(True)
-        
-        self.root.after(0, run_job)
+                profiler.stop()
+                if output is None:
+                    output = APP_ROOT / "outputs" / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{kind}"
+                report = profiler.write_report(report_path_for(output), title=f"{kind} job")
+                print(f"[SpeakNotes] Profile report: {report}", file=sys.stderr)
+
+        return run
 
-    
-    def filter_history(self, tree: ttk.Treeview) -> None:
-        search = self.history_search_var.get().strip().lower()
-    
-        for item in tree.get_children():
-            values = tree.item(item, "values")
-            row_text = " ".join(values).lower()
-            file_text = tree.item(item, "text").lower()
-    
-            if not search or search in row_text or search in file_text:
-                tree.item(item, open=True)
-                tree.detach(item)
-                tree.reattach(item, "", "end")
-            else:
-                tree.detach(item)
-    
     
 
     # ---- Actions ----
@@ -339,7 +809,11 @@ class SpeakNotesApp:
             return
 
         try:
-            content = Path(file_path).read_text(encoding="utf-8")
+            if Path(file_path).stat().st_size > LARGE_FILE_BYTES:
+                # Show only the beginning; the full text is streamed from disk when exporting.
+                content, truncated = read_text_head(Path(file_path), LARGE_FILE_EXCERPT_CHARS)
+            else:
+                content, truncated = Path(file_path).read_text(encoding="utf-8"), False
         except Exception as e:
             messagebox.showerror("Error", f"Could not read file:\n{e}")
             return
@@ -349,8 +823,12 @@ class SpeakNotesApp:
 
         self.text_source = "txt"
         self.text_source_path = str(Path(file_path))
+        self.large_source_path = Path(file_path) if truncated else None
 
-        self.status_var.set(f"Loaded: {Path(file_path).name}")
+        if truncated:
+            self.status_var.set(f"Loaded: {Path(file_path).name} (large file: showing the beginning, Bulk export reads all of it)")
+        else:
+            self.status_var.set(f"Loaded: {Path(file_path).name}")
 
     def preview(self) -> None:
         user_text = self.get_user_text()
@@ -358,74 +836,145 @@ class SpeakNotesApp:
             messagebox.showwarning("Missing text", "Please enter or load text first.")
             return
     
-        if sys.platform != "darwin":
-            settings = self.get_settings()
-            self._run_job("Previewing speech...", lambda: speak_now(text=user_text, settings=settings))
-            return
-    
+        settings = self.get_settings()
         voice_name = self.voice_var.get()
         rate_wpm = int(self.rate_var.get())
     
-        self._set_controls_enabled(False)
-        self.set_status("Starting preview...")
-    
-        def worker() -> None:
+        def worker(token: CancelToken) -> None:
             try:
-                say_now(text=user_text, voice_name=voice_name, rate_wpm=rate_wpm)
-                self.set_status_async("Preview finished.")
+                stream = self._start_streaming_preview(user_text, settings, voice_name, rate_wpm)
+                token.on_cancel(stream.stop)
+                stream.wait()
+                metrics = stream.metrics()
+                token.check()
+                if stream.stopped:
+                    self.set_status_async("Preview stopped.")
+                else:
+                    self.set_status_async(f"Preview finished (first audio after {metrics['time_to_first_audio']}s).")
+            except JobCancelled:
+                self.set_status_async("Preview stopped.")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
+                message = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
                 self.set_status_async("Error.")
+                raise
             finally:
-                self.root.after(0, lambda: self._set_controls_enabled(True))
-    
-        threading.Thread(target=worker, daemon=True).start()
+                self.root.after(0, self._preview_finished)
+    
+        self._enqueue("preview", user_text, worker, group="audio")
+
+    def _render_to_file(
+        self,
+        text: str,
+        out_path: Path,
+        settings: TTSSettings,
+        voice_name: str,
+        rate_wpm: int,
+        token: CancelToken | None = None,
+        trace: Trace | None = None,
+    ) -> None:
+        """
+        Renders text to out_path with macOS 'say', or the pyttsx3 engine worker elsewhere.
+        Both backends run out of process, so this is safe to call from worker threads,
+        and a cancelled token kills the render and removes the partial file.
+        """
+        if sys.platform == "darwin":
+            say_to_file(text=text, output_path=out_path, voice_name=voice_name, rate_wpm=rate_wpm, cache=self.render_cache, token=token, trace=trace)
+        else:
+            synthesize_to_file(
+                text=text,
+                output_path=out_path,
+                settings=settings,
+                cache=self.render_cache,
+                worker=self.engine_worker,
+                token=token,
+                trace=trace,
+            )
 
+    def _start_streaming_preview(self, user_text: str, settings: TTSSettings, voice_name: str, rate_wpm: int) -> StreamingPreview:
+        """
+        Starts a sentence-by-sentence preview and wires it to the Stop/Skip buttons.
+        """
+        from speaknotes.streaming import StreamingPreview
+
+        def on_event(kind: str, info: dict) -> None:
+            if kind == "first_audio":
+                self.set_status_async(f"Playing (first audio after {info['time_to_first_audio']}s)...")
+            elif kind == "chunk":
+                self.set_status_async(f"Playing sentence {info['index']}/{info['total']}...")
+
+        stream = StreamingPreview(
+            user_text,
+            voice_name=voice_name,
+            rate_wpm=rate_wpm,
+            settings=settings,
+            worker=self.engine_worker,
+            on_event=on_event,
+        )
+        self.active_preview = stream
+        self.root.after(0, lambda: self._set_preview_controls_enabled(True))
+        return stream.start()
+
+    def stop_preview(self) -> None:
+        """
+        Stops the running preview immediately.
+        """
+        if self.active_preview is not None:
+            self.active_preview.stop()
+        if self.active_playback is not None:
+            self.active_playback.cancel("Stopped")
+
+    def skip_preview(self) -> None:
+        """
+        Skips the sentence currently being spoken.
+        """
+        if self.active_preview is not None:
+            self.active_preview.skip()
 
     def export(self) -> None:
         user_text = self.get_user_text()
         if not user_text:
             messagebox.showwarning("Missing text", "Please enter or load text first.")
             return
-    
-        settings = self.get_settings()
-        out_path = self.make_output_path(user_text)
-    
-        # Non-macOS fallback uses pyttsx3 on main thread
-        if sys.platform != "darwin":
-            def job() -> None:
-                synthesize_to_file(text=user_text, output_path=out_path, settings=settings)
-                self.last_export_path = out_path
-                append_history(create_entry(out_path, settings, "export", user_text, self.text_source, self.text_source_path))
-    
-            self._run_job("Starting export...", job, f"Saved: {out_path}")
+
+        if self.large_source_path is not None:
+            messagebox.showinfo("Export", "This file is too large for a single export. Use Bulk export instead.")
             return
     
-        voice_name = self.voice_var.get()
-        rate_wpm = int(self.rate_var.get())
-    
-        self._set_controls_enabled(False)
-        self.set_status("Starting export...")
+        trace = Trace()
+        with trace.stage("prep"):
+            settings = self.get_settings()
+            out_path = self.make_output_path(user_text)
+            fmt = self.format_var.get()
+            voice_name = self.voice_var.get()
+            rate_wpm = int(self.rate_var.get())
+            source, source_path = self.text_source, self.text_source_path
     
-        def worker() -> None:
+        def worker(token: CancelToken) -> Path:
+            from speaknotes.encode import encoded_path
+
             try:
                 self.set_status_async("Exporting audio file...")
-                say_to_file(text=user_text, output_path=out_path, voice_name=voice_name, rate_wpm=rate_wpm)
+                self._render_to_file(user_text, out_path, settings, voice_name, rate_wpm, token, trace)
 
                 if not out_path.exists():
                     raise RuntimeError(f"Export failed, file was not created: {out_path}")
-                
-                self.last_export_path = out_path
-                append_history(create_entry(out_path, settings, "export", user_text, self.text_source, self.text_source_path))
-
-                self.set_status_async(f"Saved: {out_path}")
+                token.check()
+
+                self.set_status_async(self._deliver_export(out_path, settings, "export", user_text, fmt, source, source_path, trace))
+                return encoded_path(out_path, fmt)  # the encode itself finishes in the background
+            except JobCancelled as e:
+                out_path.unlink(missing_ok=True)
+                self.set_status_async(f"Export cancelled ({e}).")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
+                message = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
                 self.set_status_async("Error.")
-            finally:
-                self.root.after(0, lambda: self._set_controls_enabled(True))
+                raise
     
-        threading.Thread(target=worker, daemon=True).start()
+        self._enqueue("export", user_text, worker, timeout=self.job_timeout)
 
     def bulk_export(self) -> None:
         user_text = self.get_user_text()
@@ -437,100 +986,266 @@ class SpeakNotesApp:
             messagebox.showwarning("Bulk export", "Bulk export is designed for .txt input. Load a .txt file first.")
             return
     
-        parts = split_into_paragraphs(user_text)
-        if len(parts) < 2:
-            messagebox.showinfo("Bulk export", "Only one paragraph found. Use Export instead.")
-            return
+        trace = Trace()
+        large_source = self.large_source_path
+        if large_source is None:
+            with trace.stage("prep"):
+                parts = list(iter_chunks(user_text, min_chars=self.bulk_min_chars, max_chars=self.bulk_max_chars))
+            if len(parts) < 2:
+                messagebox.showinfo("Bulk export", "The text fits in a single part. Use Export instead.")
+                return
     
         if sys.platform != "darwin":
             messagebox.showinfo("Bulk export", "Bulk export is currently implemented for macOS only.")
             return
     
+        from speaknotes.bulk import BulkExportError, export_parts, export_stream
+
         settings = self.get_settings()
         voice_name = self.voice_var.get()
         rate_wpm = int(self.rate_var.get())
-    
-        self._set_controls_enabled(False)
-        self.set_status("Starting bulk export...")
-    
-        def worker() -> None:
-            try:
-                total = len(parts)
-                for i, chunk in enumerate(parts, start=1):
-                    self.set_status_async(f"Exporting {i}/{total}...")
-    
-                    out_path = self.make_output_path_part(chunk, i, total)
-                    say_to_file(text=chunk, output_path=out_path, voice_name=voice_name, rate_wpm=rate_wpm)
-                    
-                    if not out_path.exists():
-                        raise RuntimeError(f"Export failed, file was not created: {out_path}")
-                    
-                    self.last_export_path = out_path
-                    append_history(create_entry(out_path, settings, "export", chunk, self.text_source, self.text_source_path))
+        workers = self._get_workers()
+        combine = bool(self.combine_var.get())
+        gap_seconds = self._get_gap_seconds()
+        fmt = self.format_var.get()
+        source, source_path = self.text_source, self.text_source_path
+        encoding: list[tuple[Future, int, str, Path, int | None]] = []  # (encode job, part, chunk, rendered file, duplicate_of)
+        encoding_lock = threading.Lock()  # encodes finish on pool threads; keep their history writes ordered
+        deduplicated: list[int] = []
+
+        # Same source and settings as an interrupted export: offer to pick up where it stopped.
+        manifest = BulkManifest.open(
+            file_hash(large_source) if large_source else text_hash(user_text),
+            {
+                "rate": rate_wpm,
+                "volume": settings.volume,
+                "voice": voice_name,
+                "format": fmt,
+                "min_chars": self.bulk_min_chars,
+                "max_chars": self.bulk_max_chars,
+                "combine": combine,
+            },
+            source_path=str(large_source or source_path or ""),
+        )
+        resume = False
+        if manifest.completed_count():
+            answer = messagebox.askyesnocancel(
+                "Resume bulk export",
+                f"{manifest.completed_count()} part(s) of this text were already exported with these settings.\n\n"
+                "Yes: resume and only render the missing parts.\nNo: start over.",
+            )
+            if answer is None:
+                return
+            resume = answer
+            if not resume:
+                manifest.discard()
+
+        def on_progress(done: int, total: int, part_index: int) -> None:
+            progress = f"{done}/{total}" if total else f"{done}"
+            self.set_status_async(f"Exported part {part_index} ({progress} done)...")
+
+        def bulk_entry(path: Path, text: str, duplicate_of: int | None = None) -> dict:
+            entry = create_entry(path, settings, "export", text, source, source_path)
+            if duplicate_of is not None:
+                entry["duplicate_of"] = duplicate_of  # audio reused from this part instead of re-synthesized
+            if self.history_timings:
+                entry["timings"] = trace.as_dict()  # the whole bulk job so far (stages accumulate across parts)
+            return entry
+
+        def on_part_done(part_index: int, chunk: str, out_path: Path, duplicate_of: int | None) -> None:
+            # Called in part order. Each part goes into the manifest as soon as its file is final,
+            # so a crash or close mid-export only loses the parts still in flight.
+            if duplicate_of is not None:
+                deduplicated.append(part_index)
+            if fmt == "aiff":
+                self.last_export_path = out_path
+                with trace.stage("history"):
+                    append_history(bulk_entry(out_path, chunk, duplicate_of))
+                manifest.record(part_index, chunk, out_path)
+                return
+            if combine:
+                manifest.record(part_index, chunk, out_path)  # a resumed run stitches the PCM part, not the encoded copy
+            # Encode while the next parts render; the PCM part is kept if it still has to be combined.
+            future = self.encoder.submit(out_path, fmt, remove_source=not combine)
+            with encoding_lock:
+                encoding.append((future, part_index, chunk, out_path, duplicate_of))
+            future.add_done_callback(lambda _f: record_encoded())
+
+        def record_encoded(wait: bool = False) -> None:
+            # History stays in part order even though encodes finish in any order: record the
+            # finished head of the queue now (everything, waiting for it, with wait=True).
+            error: BaseException | None = None
+            with encoding_lock:
+                while encoding:
+                    future, part_index, chunk, out_path, duplicate_of = encoding[0]
+                    if not wait and (not future.done() or future.exception() is not None):
+                        return  # a failed encode is raised by the final wait=True call
+                    encoding.pop(0)
+                    try:
+                        final_path = future.result()
+                    except Exception as e:
+                        error = error or e  # still record the parts after it
+                        continue
+                    self.last_export_path = final_path
+                    with trace.stage("history"):
+                        append_history(bulk_entry(final_path, chunk, duplicate_of))
+                    if not combine:
+                        manifest.record(part_index, chunk, final_path)
+            if error is not None:
+                raise error
 
-    
-                self.set_status_async(f"Bulk export finished: {total} files")
+        def worker(token: CancelToken) -> Path | None:
+            from speaknotes.encode import encoded_path
+
+            def render(chunk: str, out_path: Path) -> None:
+                say_to_file(text=chunk, output_path=out_path, voice_name=voice_name, rate_wpm=rate_wpm, cache=self.render_cache, token=token, trace=trace)
+
+            skip_part = manifest.completed if resume else None
+            try:
+                cache_before = self.render_cache.stats()
+                if large_source is None:
+                    total = len(parts)
+                    out_paths = [self.make_output_path_part(chunk, i, total) for i, chunk in enumerate(parts, start=1)]
+
+                    self.set_status_async(f"Exporting {total} parts with {workers} worker(s)...")
+                    written = export_parts(
+                        parts,
+                        out_paths,
+                        render,
+                        workers=workers,
+                        on_progress=on_progress,
+                        on_part_done=on_part_done,
+                        token=token,
+                        skip_part=skip_part,
+                    )
+                else:
+                    # Stream the file through the chunker; only a few parts are in memory at once.
+                    chunks = iter_chunks(iter_text_file(large_source), min_chars=self.bulk_min_chars, max_chars=self.bulk_max_chars)
+                    self.set_status_async(f"Exporting {large_source.name} with {workers} worker(s)...")
+                    written = export_stream(
+                        chunks,
+                        lambda i, chunk: self.make_output_path_part(chunk, i, None),
+                        render,
+                        workers=workers,
+                        on_progress=on_progress,
+                        on_part_done=on_part_done,
+                        token=token,
+                        skip_part=skip_part,
+                    )
+                    total = len(written)
+
+                cached = self.render_cache.stats()
+                hits = cached["hits"] - cache_before["hits"]
+                reused = f"{hits} reused from cache, {len(deduplicated)} repeated parts copied"
+
+                if combine and len(written) > 1:
+                    from speaknotes.stitch import stitch_parts
+
+                    self.set_status_async(f"Combining {total} parts into one file...")
+                    base = self.make_output_path(user_text)
+                    combined_path = base.with_name(f"{base.stem}-combined{base.suffix}")
+                    token.check()
+                    with trace.stage("combine"):
+                        stitch_parts(written, combined_path, gap_seconds=gap_seconds)
+                    if fmt != "aiff":
+                        self.set_status_async(f"Encoding {total} parts to .{fmt}...")
+                        record_encoded(wait=True)
+                        for part_path in written:
+                            part_path.unlink(missing_ok=True)
+                        combined_path = self.encoder.submit(combined_path, fmt).result()
+                    self.last_export_path = combined_path
+                    with trace.stage("history"):
+                        append_history(bulk_entry(combined_path, user_text))
+                    manifest.discard()
+                    self.set_status_async(f"Bulk export finished: {total} parts + {combined_path.name} ({reused}; {trace.summary()})")
+                    return combined_path
+                else:
+                    if encoding:
+                        self.set_status_async(f"Encoding the last parts to .{fmt}...")
+                    record_encoded(wait=True)
+                    manifest.discard()
+                    self.set_status_async(f"Bulk export finished: {total} files ({reused}; {trace.summary()})")
+                    return encoded_path(written[0], fmt) if written else None  # the report goes beside part 1
+            except JobCancelled as e:
+                try:
+                    record_encoded(wait=True)  # finished parts stay on disk, so they stay in history too
+                except Exception:
+                    pass
+                self.set_status_async(f"Bulk export cancelled ({e}); finished parts were kept and can be resumed.")
+                raise
+            except BulkExportError as e:
+                try:
+                    record_encoded(wait=True)  # parts finished before the failure still belong in history
+                except Exception:
+                    pass
+                message = f"Bulk export stopped at part {e.part_index}:\n{e.cause}"
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
+                self.set_status_async(f"Error in part {e.part_index}.")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
+                message = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
                 self.set_status_async("Error.")
-            finally:
-                self.root.after(0, lambda: self._set_controls_enabled(True))
+                raise
     
-        threading.Thread(target=worker, daemon=True).start()
+        self._enqueue("bulk", large_source.name if large_source else user_text, worker, timeout=self.job_timeout)
 
     def both(self) -> None:
         user_text = self.get_user_text()
         if not user_text:
             messagebox.showwarning("Missing text", "Please enter or load text first.")
             return
-    
-        settings = self.get_settings()
-    
-        # Non-macOS fallback uses pyttsx3 on main thread
-        if sys.platform != "darwin":
-            def job() -> None:
-                speak_now(text=user_text, settings=settings)
-                out_path = self.make_output_path(user_text)
-                synthesize_to_file(text=user_text, output_path=out_path, settings=settings)
-                self.last_export_path = out_path
-                append_history(create_entry(out_path, settings, "both", user_text, self.text_source, self.text_source_path))
-    
-            self._run_job("Starting both...", job, "Preview + export finished.")
+
+        if self.large_source_path is not None:
+            messagebox.showinfo("Preview + Export", "This file is too large for a single export. Use Bulk export instead.")
             return
     
-        voice_name = self.voice_var.get()
-        rate_wpm = int(self.rate_var.get())
-    
-        self._set_controls_enabled(False)
-        self.set_status("Starting both...")
+        trace = Trace()
+        with trace.stage("prep"):
+            settings = self.get_settings()
+            voice_name = self.voice_var.get()
+            rate_wpm = int(self.rate_var.get())
+            fmt = self.format_var.get()
+            source, source_path = self.text_source, self.text_source_path
     
-        def worker() -> None:
+        def worker(token: CancelToken) -> Path:
+            from speaknotes.encode import encoded_path
+
             try:
                 self.set_status_async("Previewing speech...")
-                say_now(text=user_text, voice_name=voice_name, rate_wpm=rate_wpm)
+                with trace.stage("preview"):
+                    stream = self._start_streaming_preview(user_text, settings, voice_name, rate_wpm)
+                    token.on_cancel(stream.stop)
+                    stream.wait()
+                token.check()
     
                 self.set_status_async("Exporting audio file...")
                 out_path = self.make_output_path(user_text)
-                say_to_file(text=user_text, output_path=out_path, voice_name=voice_name, rate_wpm=rate_wpm)
+                self._render_to_file(user_text, out_path, settings, voice_name, rate_wpm, token, trace)
                 
                 if not out_path.exists():
                     raise RuntimeError(f"Export failed, file was not created: {out_path}")
+                token.check()
                 
-                self.last_export_path = out_path
-                append_history(create_entry(out_path, settings, "both", user_text, self.text_source, self.text_source_path))
-
-                self.set_status_async(f"Preview + saved: {out_path}")
+                status = self._deliver_export(out_path, settings, "both", user_text, fmt, source, source_path, trace)
+                self.set_status_async(f"Preview + {status[:1].lower()}{status[1:]}")
+                return encoded_path(out_path, fmt)
+            except JobCancelled as e:
+                self.set_status_async(f"Preview + export cancelled ({e}).")
+                raise
             except Exception as e:
-                self.root.after(0, lambda: messagebox.showerror("Error", str(e)))
+                message = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", message))
                 self.set_status_async("Error.")
+                raise
             finally:
-                self.root.after(0, lambda: self._set_controls_enabled(True))
+                self.root.after(0, self._preview_finished)
     
-        threading.Thread(target=worker, daemon=True).start()
+        self._enqueue("both", user_text, worker, group="audio", timeout=self.job_timeout)
 
     def open_history_window(self) -> None:
         """
-        Opens a separate window that displays history.json entries in a table (Treeview).
+        Opens a separate window that displays history entries in a table (Treeview).
         """
         history_win = tk.Toplevel(self.root)
         history_win.title("SpeakNotes — History")
@@ -553,10 +1268,18 @@ class SpeakNotesApp:
         controls = tk.Frame(history_win)
         controls.pack(fill="x", padx=10, pady=(0, 10))
     
-        # Treeview (table)
+        # Treeview (table): only the visible rows exist. It pages from the snapshot the search
+        # worker built last, so scrolling never queries the backend on the Tk thread.
         columns = ("date", "mode", "source","source_file", "file", "voice", "rate", "volume", "text_preview")
-        tree = ttk.Treeview(history_win, columns=columns, show="headings", height=14)
-        tree.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        snapshot: dict[str, list[tuple]] = {"rows": []}
+        table = VirtualTreeview(
+            history_win,
+            columns,
+            fetch=lambda offset, limit: snapshot["rows"][offset:offset + limit],
+            count=lambda: len(snapshot["rows"]),
+        )
+        table.frame.pack(fill="both", expand=True, padx=10, pady=(0, 10))
+        tree = table.tree
     
         # Define column headings
         tree.heading("date", text="Date")
@@ -580,50 +1303,55 @@ class SpeakNotesApp:
         tree.column("volume", width=70, anchor="center")
         tree.column("text_preview", width=260, anchor="w")
 
-        # Populate initial data
-        self._populate_history(tree)
+        # Live updates: the Tk thread only stats the history file; reading and matching happen
+        # on the search worker, which reads just the new log lines, and only changed rows are redrawn.
+        seen = {"version": history_version()}
+        # Matching runs on a worker thread; only the newest request's result is applied.
+        search_state = {"generation": 0, "pending": None}
+
+        def load_results(reset: bool) -> None:
+            search = search_var.get().strip()
+            seen["version"] = history_version()
+            search_state["generation"] += 1
+            generation = search_state["generation"]
+
+            def work() -> None:
+                # Stat before reading: if the log changes meanwhile, the next poll refreshes again.
+                version = history_version()
+                rows = [self._history_row(e) for e in query_history(search=search)]
+                self.root.after(0, lambda: show_results(generation, version, rows, reset))
+
+            threading.Thread(target=work, name="speaknotes-history-search", daemon=True).start()
+
+        def show_results(generation: int, version, rows: list[tuple], reset: bool) -> None:
+            if generation != search_state["generation"] or not history_win.winfo_exists():
+                return  # superseded by newer input, or the window was closed
+            # Count and rows come from the same snapshot, so paging can't shift or repeat rows.
+            snapshot["rows"] = rows
+            seen["version"] = version
+            if reset:
+                table.reset(len(rows))
+            else:
+                table.refresh(len(rows))
+            results_var.set(f"Results: {table.total}")
 
+        def apply_filter() -> None:
+            load_results(reset=True)
 
-    # IMPORTANT: capture all row IDs AFTER population
-        all_rows = list(tree.get_children())
+        def refresh_table() -> None:
+            load_results(reset=False)
 
-        def update_results_count() -> None:
-            visible = len(tree.get_children())
-            total = len(all_rows)
-            results_var.set(f"Results: {visible}/{total}")
+        def on_search_input() -> None:
+            if search_state["pending"] is not None:
+                history_win.after_cancel(search_state["pending"])
+            search_state["pending"] = history_win.after(HISTORY_SEARCH_DEBOUNCE_MS, apply_filter)
 
-        
-        def apply_filter() -> None:
-            query = search_var.get().strip().lower()
-        
-            # If query is empty, restore everything
-            if not query:
-                for item_id in all_rows:
-                    if not tree.exists(item_id):
-                        continue
-                    tree.reattach(item_id, "", "end")
-                    update_results_count()
+        def poll_history() -> None:
+            if not history_win.winfo_exists():
                 return
-        
-            for item_id in all_rows:
-                if not tree.exists(item_id):
-                    continue
-        
-                values = tree.item(item_id, "values")
-                row_blob = " ".join(str(v) for v in values).lower()
-        
-                if query in row_blob:
-                    tree.reattach(item_id, "", "end")
-                else:
-                    tree.detach(item_id)
-
-            update_results_count()
-
-        def refresh_table() -> None:
-            nonlocal all_rows
-            self._populate_history(tree)
-            all_rows = list(tree.get_children())
-            apply_filter()
+            if history_version() != seen["version"]:
+                refresh_table()
+            history_win.after(HISTORY_POLL_MS, poll_history)
 
         tk.Button(controls, text="Refresh", command=refresh_table).pack(side="left", padx=6)
         tk.Button(controls, text="Copy Path", command=lambda: self._copy_selected_history_path(tree)).pack(side="left", padx=8)
@@ -651,46 +1379,34 @@ class SpeakNotesApp:
         tree.bind("<Control-Button-1>", show_context_menu)
         
         # Now that everything is initialized, connect the trace
-        search_var.trace_add("write", lambda *_: apply_filter())
+        search_var.trace_add("write", lambda *_: on_search_input())
 
         tree.bind("<Double-1>", lambda _event: self._open_selected_history(tree))
         tree.bind("<Return>", lambda _event: self._open_selected_history(tree))
 
 
-        # Initial count display
-        update_results_count()
+        # Populate the first page
+        apply_filter()
+        history_win.after(HISTORY_POLL_MS, poll_history)
         
 
-    def _populate_history(self, tree: ttk.Treeview) -> None:
+    @staticmethod
+    def _history_row(entry: dict) -> tuple:
         """
-        Loads history entries from history.json and fills the Treeview.
+        Returns the history table values for one entry.
         """
-        # Clear existing rows
-        for item_id in tree.get_children():
-            tree.delete(item_id)
-    
-        entries = load_history()
-        if not isinstance(entries, list):
-            return
-    
-        # Insert newest first (optional but practical)
-        for entry in reversed(entries):
-            date = entry.get("date", "")
-            mode = entry.get("mode", "")
-            source = entry.get("source", "")
-            file_path = entry.get("file", "")
-            source_path = entry.get("source_path", "")
-            source_file = Path(source_path).name if source_path else ""
-            voice = entry.get("voice", "")
-            rate = entry.get("rate", "")
-            volume = entry.get("volume", "")
-            text_preview = entry.get("text_preview", "")
-    
-            tree.insert(
-                "",
-                "end",
-                values=(date, mode, source, source_file, file_path, voice, rate, volume, text_preview),
-            )
+        source_path = entry.get("source_path", "")
+        return (
+            entry.get("date", ""),
+            entry.get("mode", ""),
+            entry.get("source", ""),
+            Path(source_path).name if source_path else "",
+            entry.get("file", ""),
+            entry.get("voice", ""),
+            entry.get("rate", ""),
+            entry.get("volume", ""),
+            entry.get("text_preview", ""),
+        )
     
     
     def _play_selected_history(self, tree: ttk.Treeview) -> None:
@@ -701,13 +1417,21 @@ class SpeakNotesApp:
          if not audio_path:
              return
         
-         import subprocess
-         import sys
-        
-         if sys.platform == "darwin":
-             subprocess.run(["afplay", str(audio_path)])
-         else:
+         if sys.platform != "darwin":
              messagebox.showinfo("Unsupported", "Auto-play is currently implemented only for macOS.")
+             return
+
+         def worker(token: CancelToken) -> None:
+             # Played as a queued audio job so the window stays responsive and Stop can end it.
+             self.active_playback = token
+             self.root.after(0, lambda: self._set_preview_controls_enabled(True))
+             try:
+                 run_process(["afplay", str(audio_path)], token=token)
+             finally:
+                 self.active_playback = None
+                 self.root.after(0, self._preview_finished)
+
+         self._enqueue("preview", audio_path.name, worker, group="audio")
         
     def _resolve_history_path(self, raw_path: str) -> Path:
         """
@@ -756,14 +1480,16 @@ class SpeakNotesApp:
                 "Do you want to remove this entry from history?"
             )
             if remove:
-                removed = self._remove_history_entry_by_file(file_path)
-                if removed > 0:
-                    self.set_status("Removed broken history entry.")
-                else:
-                    messagebox.showwarning(
-                        "Not removed",
-                        "No matching entry was removed from history.json."
-                    )
+                def on_removed(removed: int) -> None:
+                    if removed > 0:
+                        self.set_status("Removed broken history entry.")
+                    else:
+                        messagebox.showwarning(
+                            "Not removed",
+                            "No matching entry was removed from history."
+                        )
+
+                self._remove_history_entries_async([file_path], on_removed)
             return None
         
         return audio_path
@@ -821,14 +1547,10 @@ class SpeakNotesApp:
         Removes history entries matching a given file path (relative or absolute).
         Returns the number of removed entries.
         """
-        import json
-    
-        history_path = APP_ROOT / "history.json"
-        if not history_path.exists():
+        data = load_history()
+        if not data:
             return 0
     
-        data = json.loads(history_path.read_text(encoding="utf-8"))
-    
         target_raw = str(file_path).strip()
     
         p = Path(target_raw)
@@ -838,23 +1560,43 @@ class SpeakNotesApp:
             q = Path(path_str.strip())
             return str((APP_ROOT / q).resolve()) if not q.is_absolute() else str(q.resolve())
     
-        before = len(data)
-        cleaned = []
+        matching_files: set[str] = set()
+        removed = 0
         for entry in data:
             raw = str(entry.get("file", "")).strip()
             if not raw:
-                cleaned.append(entry)
                 continue
     
             raw_abs = to_abs(raw)
     
-            should_remove = (raw == target_raw) or (raw == target_abs) or (raw_abs == target_abs)
-            if not should_remove:
-                cleaned.append(entry)
+            if (raw == target_raw) or (raw == target_abs) or (raw_abs == target_abs):
+                matching_files.add(str(entry.get("file", "")))
+                removed += 1
     
-        history_path.write_text(json.dumps(cleaned, indent=2), encoding="utf-8")
-        return before - len(cleaned)
+        delete_history_entries(sorted(matching_files))
+        return removed
     
+    def _remove_history_entries_async(self, file_paths: list[str], on_done: Callable[[int], None]) -> None:
+        """
+        Removes the history entries of the first path in file_paths that has any, on a
+        worker thread (it reads and may rewrite the whole log), then calls
+        on_done(removed) on the Tk thread.
+        """
+        def work() -> None:
+            try:
+                removed = 0
+                for path in file_paths:
+                    removed = self._remove_history_entry_by_file(path)
+                    if removed:
+                        break
+            except Exception as e:
+                message = str(e)
+                self.root.after(0, lambda: messagebox.showerror("Error", f"Could not update history:\n{message}"))
+                return
+            self.root.after(0, lambda: on_done(removed))
+
+        threading.Thread(target=work, name="speaknotes-history-delete", daemon=True).start()
+
     def _delete_selected_history_entry(self, tree: ttk.Treeview, refresh_fn) -> None:
         """
         Removes the selected history entry. Optionally deletes the audio file from disk.
@@ -899,14 +1641,14 @@ class SpeakNotesApp:
                 messagebox.showerror("Error", f"Could not delete the file:\n{e}")
                 return
     
-        # Always remove from history
-        removed = self._remove_history_entry_by_file(file_path)
-        if removed == 0 and audio_path.exists():
-            # Try again using absolute path as fallback
-            removed = self._remove_history_entry_by_file(str(audio_path))
-    
-        refresh_fn()
-        self.set_status("Deleted history entry." if removed else "No matching history entry removed.")
+        # Always remove from history (trying the absolute path as a fallback)
+        candidates = [file_path, str(audio_path)] if audio_path.exists() else [file_path]
+
+        def on_removed(removed: int) -> None:
+            refresh_fn()
+            self.set_status("Deleted history entry." if removed else "No matching history entry removed.")
+
+        self._remove_history_entries_async(candidates, on_removed)
     
 
     def open_outputs_folder(self) -> None:
@@ -935,6 +1677,24 @@ class SpeakNotesApp:
             self.export()
     
 
+    def _get_gap_seconds(self) -> float:
+        """
+        Returns the silence gap between combined parts, tolerating a half-typed Spinbox value.
+        """
+        try:
+            return max(0.0, float(self.gap_var.get()))
+        except (tk.TclError, ValueError):
+            return 0.0
+
+    def _get_workers(self) -> int:
+        """
+        Returns the bulk export worker count, tolerating a half-typed Spinbox value.
+        """
+        try:
+            return max(1, int(self.workers_var.get()))
+        except (tk.TclError, ValueError):
+            return 1
+
     def save_current_config(self) -> None:
         """
         Persists the current GUI selections to config.json.
@@ -945,6 +1705,15 @@ class SpeakNotesApp:
             "mode": self.mode_var.get(),
             "rate": int(self.rate_var.get()),
             "volume": float(self.volume_var.get()),
+            "bulk_workers": self._get_workers(),
+            "bulk_combine": bool(self.combine_var.get()),
+            "bulk_gap_seconds": self._get_gap_seconds(),
+            "output_format": self.format_var.get(),
+            "max_jobs": self.job_queue.max_workers,
+            "job_timeout_seconds": self.job_timeout,
+            "history_timings": self.history_timings,
+            "bulk_min_chars": self.bulk_min_chars,
+            "bulk_max_chars": self.bulk_max_chars,
         })
 
     def load_draft(self) -> None:
@@ -994,7 +1763,20 @@ class SpeakNotesApp:
             self.save_draft()
         except Exception:
             pass
-    
+
+        self.job_queue.shutdown(cancel_running=True)
+        self.root.withdraw()
+        self._finish_close(time.perf_counter() + CLOSE_GRACE_SECONDS)
+
+    def _finish_close(self, deadline: float) -> None:
+        """
+        Destroys the window once cancelled jobs have run their cleanup (a bulk
+        export records its finished parts on the way out). The event loop keeps
+        running meanwhile, since those jobs report back through root.after.
+        """
+        if self.job_queue.alive() and time.perf_counter() < deadline:
+            self.root.after(50, lambda: self._finish_close(deadline))
+            return
         self.root.destroy()
     
     
@@ -1002,8 +1784,27 @@ class SpeakNotesApp:
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description="SpeakNotes desktop app")
+    parser.add_argument("--startup-profile", action="store_true",
+                        help="Print how long imports, app init and the first paint took.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run each job under cProfile and tracemalloc and write a .profile.txt report next to its output.")
+    args = parser.parse_args()
+
+    timer = StartupTimer(started_at=_PROCESS_STARTED)
+    timer.mark("imports")
+
     root = tk.Tk()
+    timer.mark("tk_init")
     app = SpeakNotesApp(root)
+    app.profile_jobs = args.profile
+    timer.mark("app_init")
+
+    if args.startup_profile:
+        root.update()  # force the window to map and draw now
+        timer.mark("first_paint")
+        timer.print_report()
+
     root.mainloop()
 
 
@@ -1,27 +1,31 @@
 from __future__ import annotations
 
+import time
+
+_PROCESS_STARTED = time.perf_counter()
+
+import argparse
+import sys
 from datetime import datetime
 from pathlib import Path
 
 from speaknotes.presets import PRESETS
-from speaknotes.tts import TTSSettings, list_voices, synthesize_to_file, speak_now
+from speaknotes.tts import TTSSettings, synthesize_to_file, speak_now
 from speaknotes.io_utils import get_user_text
+from speaknotes.text_utils import safe_filename
 from speaknotes.history_utils import append_history, create_entry
+from speaknotes.render_cache import RenderCache
+from speaknotes.engine_worker import get_engine_worker
+from speaknotes.voice_cache import get_voices
+from speaknotes.startup import StartupTimer
 
 
 
 
-def safe_filename(base: str) -> str:
+def main(output_format: str = "aiff") -> Path | None:
     """
-    Converts a string into a short, filesystem-safe filename.
+    Interactive prompts; returns the exported file, or None if nothing was exported.
     """
-    base = base.strip().lower()
-    base = "".join(ch for ch in base if ch.isalnum() or ch in (" ", "-", "_"))
-    base = base.replace(" ", "-")
-    return base[:40] or "note"
-
-
-def main() -> None:
     print("\nSpeakNotes — quick TTS tool\n")
 
     # --- GET USER TEXT (THIS MUST ALWAYS RUN FIRST) ---
@@ -29,7 +33,7 @@ def main() -> None:
 
     if not user_text:
         print("No text provided. Exiting.")
-        return
+        return None
 
     print(f"[DEBUG] Text length: {len(user_text)} characters")
 
@@ -44,7 +48,7 @@ def main() -> None:
     # --- VOICE SELECTION ---
     pick_voice = input("\nDo you want to pick a specific voice? (y/n) [n]: ").strip().lower()
     if pick_voice == "y":
-        voices = list_voices()
+        voices = get_voices(worker=get_engine_worker())
         for idx, (_, name) in enumerate(voices):
             print(f"{idx}: {name}")
 
@@ -64,7 +68,7 @@ def main() -> None:
     # --- PREVIEW ---
     if mode in ("preview", "both"):
         print("\n🔊 Previewing speech...")
-        speak_now(text=user_text, settings=settings)
+        speak_now(text=user_text, settings=settings, worker=get_engine_worker())
 
     # --- EXPORT ---
     if mode in ("export", "both"):
@@ -75,13 +79,72 @@ def main() -> None:
         out_path = Path("outputs") / filename
 
         print("\n💾 Exporting audio file...")
-        synthesize_to_file(text=user_text, output_path=out_path, settings=settings)
+        cache = RenderCache()
+        synthesize_to_file(text=user_text, output_path=out_path, settings=settings, cache=cache, worker=get_engine_worker())
+        if output_format != "aiff":
+            from speaknotes.encode import encode_file
+            print(f"🗜  Encoding to .{output_format}...")
+            out_path = encode_file(out_path, output_format)
         print(f"\n✅ Audio saved: {out_path}\n")
+        if cache.hits:
+            print("♻️  Reused a cached render (no re-synthesis needed).")
         append_history(create_entry(out_path, settings, mode, user_text))
         print("🧠 History updated!")
+        return out_path
+    return None
+
 
 
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="SpeakNotes — quick TTS tool")
+    parser.add_argument("--batch", type=Path, metavar="JOBS.jsonl",
+                        help="Run a JSON Lines job file non-interactively and print a JSON summary.")
+    parser.add_argument("--serve", action="store_true", help="Run the local HTTP synthesis server instead of the prompts.")
+    parser.add_argument("--host", default="127.0.0.1", help="Server address; loopback only (default: 127.0.0.1).")
+    parser.add_argument("--port", type=int, default=8765, help="Server port (default: 8765).")
+    parser.add_argument("--workers", type=int, default=2, help="Concurrent jobs in batch mode or renders in server mode (default: 2).")
+    parser.add_argument("--out-dir", type=Path, default=Path("outputs"), help="Output folder in batch and server mode.")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-synthesize in batch and server mode.")
+    parser.add_argument("--format", dest="output_format", default="aiff", choices=["aiff", "wav", "m4a", "mp3", "flac"],
+                        help="Output format; compressed formats need afconvert, ffmpeg, lame or flac (default: aiff).")
+    parser.add_argument("--startup-profile", action="store_true", help="Print how long startup took.")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run under cProfile and tracemalloc and write a .profile.txt report next to the output.")
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    main()
+    timer = StartupTimer(started_at=_PROCESS_STARTED)
+    timer.mark("imports")
+    args = parse_args()
+    timer.mark("args")
+    if args.startup_profile:
+        timer.print_report()
+    if args.serve:
+        from speaknotes.server import serve
+        serve(host=args.host, port=args.port, workers=args.workers, out_dir=args.out_dir / "server", use_cache=not args.no_cache)
+        sys.exit(0)
+
+    profiler = None
+    if args.profile:
+        from speaknotes.profiling import Profiler, report_path_for
+        profiler = Profiler()
+        profiler.start()
+
+    exit_code = 0
+    output: Path | None = None
+    try:
+        if args.batch:
+            from speaknotes.batch import run_batch_file
+            exit_code = run_batch_file(args.batch, workers=args.workers, out_dir=args.out_dir, use_cache=not args.no_cache,
+                                       output_format=args.output_format)
+            output = args.out_dir / f"batch-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        else:
+            output = main(output_format=args.output_format)
+    finally:
+        if profiler is not None:
+            profiler.stop()
+            target = output or Path("outputs") / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-session"
+            report = profiler.write_report(report_path_for(target), title="batch" if args.batch else "main")
+            print(f"[SpeakNotes] Profile report: {report}", file=sys.stderr)
+    sys.exit(exit_code)
@@ -0,0 +1,214 @@
+from __future__ import annotations
+
+import asyncio
+import sys
+import weakref
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, AsyncIterator, Iterable, Optional, Union
+
+from .cancel import CancelToken, JobTimeout, timeout_for_text
+from .macos_say import say_cache_key, say_command
+from .text_utils import iter_chunks
+from .tts import TTSSettings, synthesize_to_file
+
+if TYPE_CHECKING:
+    from .engine_worker import EngineWorker
+    from .render_cache import RenderCache
+
+DEFAULT_CONCURRENCY = 2
+DEFAULT_PREFETCH = 2  # chunks rendered ahead of the consumer in stream()
+
+
+@dataclass(frozen=True)
+class StreamChunk:
+    """
+    One rendered chunk from AsyncSynthesizer.stream().
+    """
+    index: int  # 1-based
+    text: str
+    path: Path
+
+
+class AsyncSynthesizer:
+    """
+    Asyncio facade over the blocking synthesis functions, for use inside services.
+
+    On macOS, 'say' runs as an asyncio subprocess; elsewhere pyttsx3 runs in the
+    default executor through an EngineWorker. At most max_concurrency renders run
+    at once; further callers wait their turn. Cancelling the awaiting task kills
+    the 'say' process (or the engine worker) and removes the partial file.
+    The limit applies per event loop.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = DEFAULT_CONCURRENCY,
+        backend: Optional[str] = None,
+        cache: RenderCache | None = None,
+        worker: EngineWorker | None = None,
+    ) -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.backend = backend or ("say" if sys.platform == "darwin" else "pyttsx3")
+        self.cache = cache
+        self.worker = worker
+        # One semaphore per event loop: a semaphore binds to the loop that first waits on it,
+        # and the shared synthesizer may be used from several asyncio.run() calls.
+        self._semaphores: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = weakref.WeakKeyDictionary()
+
+    @property
+    def semaphore(self) -> asyncio.Semaphore:
+        """
+        The concurrency limit for the running event loop.
+        """
+        loop = asyncio.get_running_loop()
+        semaphore = self._semaphores.get(loop)
+        if semaphore is None:
+            semaphore = self._semaphores[loop] = asyncio.Semaphore(self.max_concurrency)
+        return semaphore
+
+    async def synthesize(
+        self,
+        text: str,
+        output_path: Path,
+        settings: TTSSettings = TTSSettings(),
+        voice_name: str | None = None,
+        timeout: float | None = None,
+    ) -> Path:
+        """
+        Renders text to output_path and returns it. voice_name selects the
+        'say' voice; settings.voice_id is used by the pyttsx3 backend.
+        Raises JobTimeout if the render runs past timeout (default: timeout_for_text).
+        """
+        timeout = timeout or timeout_for_text(text)
+        async with self.semaphore:
+            if self.backend == "say":
+                await self._say_to_file(text, output_path, voice_name, settings.rate, timeout)
+            else:
+                await self._engine_to_file(text, output_path, settings, timeout)
+        return output_path
+
+    async def _say_to_file(self, text: str, output_path: Path, voice_name: str | None, rate_wpm: int, timeout: float) -> None:
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        key = None
+        if self.cache is not None:
+            key = say_cache_key(text, output_path, voice_name, rate_wpm)
+            if await asyncio.to_thread(self.cache.fetch, key, output_path):
+                return
+
+        process = await asyncio.create_subprocess_exec(*say_command(text, output_path, voice_name, rate_wpm))
+        try:
+            try:
+                returncode = await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                raise JobTimeout(f"say did not finish within {timeout:g}s") from None
+            if returncode != 0:
+                raise RuntimeError(f"say exited with status {returncode}")
+        except BaseException:
+            # Cancelled, timed out or failed: don't leave the process or a half-written file behind.
+            if process.returncode is None:
+                process.kill()
+                await asyncio.shield(process.wait())
+            output_path.unlink(missing_ok=True)
+            raise
+
+        if self.cache is not None and key is not None:
+            await asyncio.to_thread(self.cache.store, key, output_path)
+
+    async def _engine_to_file(self, text: str, output_path: Path, settings: TTSSettings, timeout: float) -> None:
+        if self.worker is None:
+            from .engine_worker import get_engine_worker
+
+            self.worker = get_engine_worker()
+        token = CancelToken()
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(
+            None,
+            lambda: synthesize_to_file(text, output_path, settings, cache=self.cache, worker=self.worker, token=token, timeout=timeout),
+        )
+        try:
+            await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # Killing the engine unblocks the executor thread, which then removes the partial file.
+            token.cancel("Cancelled by caller")
+            try:
+                await future
+            except Exception:
+                pass
+            raise
+
+    async def stream(
+        self,
+        text: Union[str, Iterable[str]],
+        output_dir: Path,
+        settings: TTSSettings = TTSSettings(),
+        voice_name: str | None = None,
+        prefetch: int = DEFAULT_PREFETCH,
+        min_chars: int = 40,
+        max_chars: int = 1000,
+    ) -> AsyncIterator[StreamChunk]:
+        """
+        Splits text into chunks (see iter_chunks) and yields each one, in order,
+        as soon as it is rendered to output_dir.
+
+        At most prefetch finished chunks wait for the consumer: a slow consumer
+        pauses rendering instead of letting files pile up. Leaving the loop
+        early cancels the render in progress.
+        """
+        output_dir.mkdir(parents=True, exist_ok=True)
+        ready: asyncio.Queue[Optional[StreamChunk]] = asyncio.Queue(maxsize=max(1, prefetch))
+
+        async def produce() -> None:
+            for index, chunk in enumerate(iter_chunks(text, min_chars=min_chars, max_chars=max_chars), start=1):
+                path = await self.synthesize(chunk, output_dir / f"chunk-{index:04d}.aiff", settings, voice_name)
+                await ready.put(StreamChunk(index, chunk, path))
+            await ready.put(None)
+
+        producer = asyncio.create_task(produce())
+        try:
+            while True:
+                getter = asyncio.ensure_future(ready.get())
+                await asyncio.wait([getter, producer], return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    producer.result()  # the producer failed: re-raise its error here
+                    continue
+                item = getter.result()
+                if item is None:
+                    break
+                yield item
+        finally:
+            if not producer.done():
+                producer.cancel()
+                try:
+                    await producer
+                except (asyncio.CancelledError, Exception):
+                    pass
+
+
+_default: Optional[AsyncSynthesizer] = None
+
+
+def get_synthesizer() -> AsyncSynthesizer:
+    """
+    Returns the shared AsyncSynthesizer used by the module-level helpers.
+    """
+    global _default
+    if _default is None:
+        _default = AsyncSynthesizer()
+    return _default
+
+
+async def synthesize(text: str, output_path: Path, settings: TTSSettings = TTSSettings(), **kwargs) -> Path:
+    """
+    await synthesize(...) — see AsyncSynthesizer.synthesize.
+    """
+    return await get_synthesizer().synthesize(text, output_path, settings, **kwargs)
+
+
+async def stream(text: Union[str, Iterable[str]], output_dir: Path, settings: TTSSettings = TTSSettings(), **kwargs) -> AsyncIterator[StreamChunk]:
+    """
+    async for chunk in stream(...) — see AsyncSynthesizer.stream.
+    """
+    async for chunk in get_synthesizer().stream(text, output_dir, settings, **kwargs):
+        yield chunk
@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import contextlib
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+from .history_utils import append_history_many, create_entry
+from .io_utils import read_text_file
+from .cancel import CancelToken
+from .encode import Encoder
+from .presets import PRESETS
+from .profiling import profile_worker
+from .render_cache import RenderCache
+from .text_utils import safe_filename
+from .tts import TTSSettings
+
+
+class JobFileError(ValueError):
+    """
+    Raised when a batch job file cannot be parsed.
+    """
+
+
+def load_jobs(job_file: Path) -> list[dict[str, Any]]:
+    """
+    Reads a JSON Lines job file. Each line is one job object with either
+    "text" or "path", plus optional "id", "preset", "voice", "rate", "volume",
+    "format" (aiff, wav, m4a, mp3, flac), "timeout" (seconds) and "output"
+    (file name inside the output folder).
+    """
+    jobs: list[dict[str, Any]] = []
+    for line_no, line in enumerate(job_file.read_text(encoding="utf-8").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            job = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise JobFileError(f"{job_file}:{line_no}: invalid JSON ({e.msg})") from e
+        if not isinstance(job, dict):
+            raise JobFileError(f"{job_file}:{line_no}: each line must be a JSON object")
+        if not job.get("text") and not job.get("path"):
+            raise JobFileError(f"{job_file}:{line_no}: job needs a 'text' or 'path'")
+        job.setdefault("id", job.get("request_id") or f"job-{len(jobs) + 1}")
+        jobs.append(job)
+    return jobs
+
+
+class BatchRunner:
+    """
+    Runs batch jobs headlessly with bounded concurrency and collects a summary.
+    History is written once, in job order, after all jobs have finished.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path = Path("outputs"),
+        workers: int = 2,
+        cache: Optional[RenderCache] = None,
+        base_dir: Optional[Path] = None,
+        output_format: str = "aiff",
+    ) -> None:
+        self.out_dir = out_dir
+        self.workers = max(1, workers)
+        self.cache = cache
+        self.base_dir = base_dir or Path.cwd()
+        self.output_format = output_format
+        # Encoding runs beside synthesis so a render slot frees up as soon as the engine is done.
+        self.encoder = Encoder(max_workers=self.workers)
+        self._voices: Optional[dict[str, str]] = None
+        self._voices_lock = threading.Lock()
+
+    # ---- Job preparation ----
+
+    def _voice_ids(self) -> dict[str, str]:
+        """
+        Maps voice names (and ids) to pyttsx3 voice ids, enumerated once per batch.
+        """
+        with self._voices_lock:
+            if self._voices is None:
+                from .engine_worker import get_engine_worker
+                from .voice_cache import get_voices
+                voices = get_voices(worker=get_engine_worker())
+                self._voices = {name: vid for vid, name in voices}
+                self._voices.update({vid: vid for vid, _ in voices})
+            return self._voices
+
+    def _settings_for(self, job: dict[str, Any]) -> TTSSettings:
+        preset_key = str(job.get("preset", "study")).lower()
+        if preset_key not in PRESETS:
+            raise ValueError(f"Unknown preset: {preset_key}")
+        preset = PRESETS[preset_key]
+
+        voice = job.get("voice") or None
+        if voice == "Default (system)":
+            voice = None
+        if voice and sys.platform != "darwin":
+            if voice not in self._voice_ids():
+                raise ValueError(f"Unknown voice: {voice}")
+            voice = self._voice_ids()[voice]
+
+        return TTSSettings(
+            rate=int(job.get("rate", preset.rate)),
+            volume=float(job.get("volume", preset.volume)),
+            voice_id=voice,
+        )
+
+    def _text_for(self, job: dict[str, Any]) -> tuple[str, str, str]:
+        """
+        Returns (text, source, source_path) for a job.
+        """
+        if job.get("text"):
+            return str(job["text"]).strip(), "batch", ""
+        path = Path(job["path"])
+        if not path.is_absolute():
+            path = self.base_dir / path
+        return read_text_file(path), "txt", str(path)
+
+    def _output_for(self, job: dict[str, Any], text: str) -> Path:
+        name = job.get("output")
+        if name:
+            out = Path(name)
+            if not out.suffix:
+                out = out.with_suffix(".aiff")
+            return out if out.is_absolute() else self.out_dir / out
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        return self.out_dir / f"{timestamp}-{safe_filename(str(job['id']))}-{safe_filename(text[:60])}.aiff"
+
+    # ---- Execution ----
+
+    def _render(self, text: str, out_path: Path, settings: TTSSettings, token: Optional[CancelToken] = None) -> None:
+        if sys.platform == "darwin":
+            from .macos_say import say_to_file
+            say_to_file(text=text, output_path=out_path, voice_name=settings.voice_id, rate_wpm=settings.rate, cache=self.cache, token=token)
+        else:
+            from .engine_worker import get_engine_worker
+            from .tts import synthesize_to_file
+            synthesize_to_file(text=text, output_path=out_path, settings=settings, cache=self.cache, worker=get_engine_worker(), token=token)
+
+    def run_job(self, job: dict[str, Any]) -> dict[str, Any]:
+        """
+        Runs one job and returns its result record (never raises).
+        """
+        started = time.perf_counter()
+        result: dict[str, Any] = {"id": job["id"], "status": "ok", "output": None, "chars": 0, "seconds": 0.0}
+        token = CancelToken(timeout=float(job["timeout"])) if job.get("timeout") else None
+        try:
+            text, source, source_path = self._text_for(job)
+            if not text:
+                raise ValueError("Job text is empty")
+            settings = self._settings_for(job)
+            out_path = self._output_for(job, text)
+            fmt = str(job.get("format") or self.output_format).lower()
+            if not job.get("format") and out_path.suffix.lower() != ".aiff":
+                fmt = out_path.suffix.lower().lstrip(".")  # an explicit "output": "x.mp3" picks the format
+            render_path = out_path.with_suffix(".aiff") if fmt != "aiff" else out_path
+
+            self._render(text, render_path, settings, token)
+            if not render_path.exists():
+                raise RuntimeError(f"Export failed, file was not created: {render_path}")
+
+            result["chars"] = len(text)
+            result["_encoding"] = (self.encoder.submit(render_path, fmt), settings, text, source, source_path)
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+        finally:
+            if token is not None:
+                token.close()
+        result["seconds"] = round(time.perf_counter() - started, 3)
+        return result
+
+    def _finish(self, result: dict[str, Any]) -> Optional[dict[str, Any]]:
+        """
+        Waits for a job's encoding step and returns its history entry (None if the job failed).
+        """
+        if "_encoding" not in result:
+            return None
+        future, settings, text, source, source_path = result.pop("_encoding")
+        try:
+            final_path = future.result()
+        except Exception as e:
+            result["status"] = "failed"
+            result["error"] = f"{type(e).__name__}: {e}"
+            return None
+        result["output"] = str(final_path)
+        result["format"] = final_path.suffix.lstrip(".")
+        result["size_bytes"] = final_path.stat().st_size
+        return create_entry(final_path, settings, "batch", text, source, source_path)
+
+    def run(self, jobs: list[dict[str, Any]]) -> dict[str, Any]:
+        """
+        Runs all jobs and returns a machine-readable summary.
+        """
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="speaknotes-batch") as pool:
+            results = list(pool.map(profile_worker(self.run_job), jobs))
+
+        entries = [entry for entry in map(self._finish, results) if entry is not None]
+        self.encoder.shutdown()
+        append_history_many(entries)
+
+        failed = [r for r in results if r["status"] != "ok"]
+        return {
+            "total": len(results),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "workers": self.workers,
+            "seconds": round(time.perf_counter() - started, 3),
+            "cache": self.cache.stats() if self.cache is not None else None,
+            "jobs": results,
+        }
+
+
+def run_batch_file(
+    job_file: Path,
+    workers: int = 2,
+    out_dir: Path = Path("outputs"),
+    use_cache: bool = True,
+    output_format: str = "aiff",
+) -> int:
+    """
+    CLI entry point: runs a job file, prints the JSON summary to stdout and
+    returns the exit code (0 = all ok, 1 = some jobs failed, 2 = bad job file).
+    """
+    try:
+        jobs = load_jobs(job_file)
+    except (OSError, JobFileError) as e:
+        print(json.dumps({"error": str(e)}), file=sys.stdout)
+        return 2
+
+    runner = BatchRunner(
+        out_dir=out_dir,
+        workers=workers,
+        cache=RenderCache() if use_cache else None,
+        base_dir=job_file.resolve().parent,
+        output_format=output_format,
+    )
+    # Engine chatter goes to stderr so stdout stays pure JSON.
+    with contextlib.redirect_stdout(sys.stderr):
+        summary = runner.run(jobs)
+    print(json.dumps(summary, indent=2, ensure_ascii=False))
+    return 0 if summary["failed"] == 0 else 1
@@ -0,0 +1,269 @@
+from __future__ import annotations
+
+import hashlib
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from .cancel import CancelToken, JobCancelled
+from .profiling import profile_worker
+from .render_cache import link_or_copy, normalize_text
+
+
+# render_fn(text, output_path) must produce output_path or raise.
+RenderFn = Callable[[str, Path], None]
+# make_path(part_index, text) — output file for a part (export_stream only).
+PathFn = Callable[[int, str], Path]
+# on_progress(done_count, total, part_index) — called from worker threads; total is 0 if unknown.
+ProgressFn = Callable[[int, int, int], None]
+# on_part_done(part_index, text, output_path, duplicate_of) — called in part order;
+# duplicate_of is the earlier part whose audio was reused, or None if the part was rendered.
+PartDoneFn = Callable[[int, str, Path, Optional[int]], None]
+# skip_part(part_index, text) — output of a part finished earlier, or None to render it.
+SkipFn = Callable[[int, str], Optional[Path]]
+
+
+class BulkExportError(RuntimeError):
+    """
+    Raised when one part of a bulk export fails. Keeps the failing part number.
+    """
+
+    def __init__(self, part_index: int, cause: BaseException) -> None:
+        super().__init__(f"Part {part_index} failed: {cause}")
+        self.part_index = part_index
+        self.cause = cause
+
+
+def _chunk_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+def export_parts(
+    parts: list[str],
+    out_paths: list[Path],
+    render_fn: RenderFn,
+    workers: int = 1,
+    on_progress: Optional[ProgressFn] = None,
+    on_part_done: Optional[PartDoneFn] = None,
+    token: Optional[CancelToken] = None,
+    skip_part: Optional[SkipFn] = None,
+    dedupe: bool = True,
+) -> list[Path]:
+    """
+    Renders every part with up to 'workers' engine invocations in parallel.
+
+    Part numbering is fixed by out_paths, and on_part_done is always called in
+    part order (part 2 is only reported once part 1 is done), so history entries
+    stay ordered no matter which worker finishes first.
+    On the first failure, queued parts are cancelled and BulkExportError is raised.
+    """
+    if len(parts) != len(out_paths):
+        raise ValueError("parts and out_paths must have the same length")
+
+    return export_stream(
+        parts,
+        lambda part_index, _text: out_paths[part_index - 1],
+        render_fn,
+        workers=workers,
+        total=len(parts),
+        on_progress=on_progress,
+        on_part_done=on_part_done,
+        token=token,
+        skip_part=skip_part,
+        dedupe=dedupe,
+    )
+
+
+def export_stream(
+    chunks: Iterable[str],
+    make_path: PathFn,
+    render_fn: RenderFn,
+    workers: int = 1,
+    total: Optional[int] = None,
+    on_progress: Optional[ProgressFn] = None,
+    on_part_done: Optional[PartDoneFn] = None,
+    token: Optional[CancelToken] = None,
+    skip_part: Optional[SkipFn] = None,
+    dedupe: bool = True,
+) -> list[Path]:
+    """
+    Like export_parts, but pulls parts lazily from any iterable (e.g. a chunker
+    reading a file), so memory stays bounded however long the input is.
+
+    Only about two parts per worker are read ahead at any time. make_path
+    names each part's output file when it is pulled. Pass total if it is
+    known; otherwise on_progress receives 0 as the total.
+
+    If the token is cancelled, no new parts are started, parts already done are
+    still reported (in order) and JobCancelled is raised. render_fn should use
+    the same token so in-flight renders stop too.
+
+    skip_part lets a resumed export reuse parts finished by an earlier run:
+    they are not rendered and on_part_done is not called again for them, but
+    they are still returned in order with the new parts.
+
+    With dedupe, a chunk whose normalized text matches an earlier part is not
+    rendered again: once the first occurrence is done, its file is hard-linked
+    (or copied) to the repeat's path, and on_part_done gets the original part
+    number as duplicate_of. If that file is already gone by then, the repeat
+    is rendered like any other part.
+
+    Errors from make_path, skip_part or on_part_done are raised as
+    BulkExportError for the part they happened on, after the parts finished
+    before it have been reported.
+    """
+    workers = max(1, int(workers))
+    window = workers * 2
+    done_count = 0
+    next_to_report = 1
+    finished: dict[int, tuple[str, Path, bool, Optional[int]]] = {}  # part -> (text, path, report, duplicate_of)
+    # Deduplication: first part per normalized chunk, its output once known, and repeats waiting on it.
+    first_part: dict[str, int] = {}
+    first_output: dict[int, Path] = {}
+    repeats: dict[int, list[tuple[int, str, Path]]] = {}
+    waiting = 0
+    written: list[Path] = []
+    lock = threading.Lock()
+
+    def render_one(part_index: int, text: str, out_path: Path) -> Path:
+        nonlocal done_count
+        try:
+            render_fn(text, out_path)
+            if not out_path.exists():
+                raise RuntimeError(f"Export failed, file was not created: {out_path}")
+        except JobCancelled:
+            raise
+        except Exception as e:
+            raise BulkExportError(part_index, e) from e
+
+        with lock:
+            done_count += 1
+            count = done_count
+        if on_progress:
+            on_progress(count, total or 0, part_index)
+        return out_path
+
+    def call(part_index: int, fn: Callable, *args):
+        # Callback errors name the part they happened on, like render errors.
+        try:
+            return fn(*args)
+        except (BulkExportError, JobCancelled):
+            raise
+        except Exception as e:
+            raise BulkExportError(part_index, e) from e
+
+    def report_ready() -> None:
+        nonlocal next_to_report
+        while next_to_report in finished:
+            text, out_path, notify, duplicate_of = finished.pop(next_to_report)
+            written.append(out_path)
+            if notify and on_part_done:
+                call(next_to_report, on_part_done, next_to_report, text, out_path, duplicate_of)
+            next_to_report += 1
+
+    def submit(part_index: int, text: str, out_path: Path) -> None:
+        future = executor.submit(render_part, part_index, text, out_path)
+        in_flight[future] = (part_index, text)
+
+    def copy_repeat(original: int, part_index: int, text: str, out_path: Path) -> None:
+        nonlocal done_count
+        try:
+            call(part_index, link_or_copy, first_output[original], out_path)
+        except BulkExportError as e:
+            if not isinstance(e.cause, FileNotFoundError):
+                raise
+            # on_part_done may move or delete a part once it is reported (e.g. when
+            # encoding it), so a repeat arriving later is rendered on its own.
+            submit(part_index, text, out_path)
+            return
+        with lock:
+            done_count += 1
+            count = done_count
+        if on_progress:
+            on_progress(count, total or 0, part_index)
+        finished[part_index] = (text, out_path, True, original)
+
+    def first_done(part_index: int, out_path: Path) -> None:
+        nonlocal waiting
+        first_output[part_index] = out_path
+        for repeat in repeats.pop(part_index, []):
+            waiting -= 1
+            copy_repeat(part_index, *repeat)
+
+    def fail(error: BaseException) -> None:
+        # Let in-flight parts finish so nothing is left half-written, report
+        # every part done before the failure, then re-raise it.
+        for other in in_flight:
+            other.cancel()
+        wait(list(in_flight))
+        for other, (other_index, other_text) in in_flight.items():
+            if not other.cancelled() and other.exception() is None:
+                finished[other_index] = (other_text, other.result(), True, None)
+        in_flight.clear()
+        try:
+            report_ready()
+        except BulkExportError:
+            pass  # the first failure is the one worth surfacing
+        raise error
+
+    render_part = profile_worker(render_one)  # profiled with the job, if it is
+    numbered = enumerate(chunks, start=1)
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="speaknotes-bulk")
+    in_flight: dict[Future, tuple[int, str]] = {}
+    try:
+        exhausted = False
+        while True:
+            try:
+                while not exhausted and len(in_flight) + waiting < window:
+                    if token is not None and token.cancelled:
+                        exhausted = True
+                        break
+                    item = next(numbered, None)
+                    if item is None:
+                        exhausted = True
+                        break
+                    part_index, text = item
+                    key = _chunk_key(text) if dedupe else None
+                    original = first_part.get(key) if key else None
+                    if original is None and key:
+                        first_part[key] = part_index
+                    existing = call(part_index, skip_part, part_index, text) if skip_part else None
+                    if existing is not None:
+                        with lock:
+                            done_count += 1  # counts toward progress so "done/total" stays meaningful
+                        finished[part_index] = (text, existing, False, None)
+                        if key and original is None:
+                            first_done(part_index, existing)
+                        continue
+                    out_path = call(part_index, make_path, part_index, text)
+                    if original is None:
+                        submit(part_index, text, out_path)
+                    elif original in first_output:
+                        copy_repeat(original, part_index, text, out_path)
+                    else:
+                        repeats.setdefault(original, []).append((part_index, text, out_path))
+                        waiting += 1
+                report_ready()
+                if not in_flight:
+                    break
+
+                # Wake on the first part to finish so its slot is refilled straight away.
+                completed, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                for future in sorted(completed, key=lambda f: in_flight[f][0]):
+                    error = future.exception()
+                    if error is not None:
+                        raise error
+                    part_index, text = in_flight.pop(future)
+                    finished[part_index] = (text, future.result(), True, None)
+                    if dedupe:
+                        first_done(part_index, future.result())
+                report_ready()
+            except BaseException as e:
+                fail(e)
+        if token is not None:
+            token.check()
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+    return written
@@ -0,0 +1,169 @@
+from __future__ import annotations
+
+import subprocess
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Optional, Sequence
+
+
+POLL_INTERVAL = 0.1
+
+# Engine calls get this long plus a little per character before they count as hung.
+BASE_TIMEOUT = 60.0
+SECONDS_PER_CHAR = 0.2
+
+
+class JobCancelled(RuntimeError):
+    """
+    Raised inside a job when its CancelToken was cancelled.
+    """
+
+
+class JobTimeout(JobCancelled):
+    """
+    Raised when a job or a single engine call ran past its time limit.
+    """
+
+
+def timeout_for_text(text: str) -> float:
+    """
+    Returns a generous time limit for synthesizing text: long enough for slow
+    voices, short enough that a wedged engine doesn't hang a job forever.
+    """
+    return BASE_TIMEOUT + len(text) * SECONDS_PER_CHAR
+
+
+class CancelToken:
+    """
+    Cancellation handle shared between a job and whoever may cancel it.
+
+    Code doing blocking work registers a callback (e.g. killing its child
+    process) with on_cancel and checks the token between steps. An optional
+    timeout cancels the token automatically once it expires.
+    """
+
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self._event = threading.Event()
+        self._lock = threading.Lock()
+        self._callbacks: list[Callable[[], None]] = []
+        self.reason: Optional[str] = None
+        self.timed_out = False
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self._timer: Optional[threading.Timer] = None
+        if timeout:
+            self._timer = threading.Timer(timeout, self._expire, args=(timeout,))
+            self._timer.daemon = True
+            self._timer.start()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def cancel(self, reason: str = "Cancelled") -> None:
+        """
+        Cancels the token and runs the registered callbacks (once).
+        """
+        with self._lock:
+            if self._event.is_set():
+                return
+            self.reason = reason
+            self._event.set()
+            callbacks, self._callbacks = self._callbacks, []
+        if self._timer is not None:
+            self._timer.cancel()
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception:
+                pass
+
+    def close(self) -> None:
+        """
+        Stops the timeout timer once the work is over (the token stays usable).
+        """
+        if self._timer is not None:
+            self._timer.cancel()
+
+    def _expire(self, timeout: float) -> None:
+        self.timed_out = True
+        self.cancel(f"Timed out after {timeout:g}s")
+
+    def on_cancel(self, callback: Callable[[], None]) -> Callable[[], None]:
+        """
+        Registers callback to run on cancellation (right away if already cancelled).
+        Returns a function that unregisters it.
+        """
+        with self._lock:
+            if not self._event.is_set():
+                self._callbacks.append(callback)
+                return lambda: self._discard(callback)
+        callback()
+        return lambda: None
+
+    def _discard(self, callback: Callable[[], None]) -> None:
+        with self._lock:
+            if callback in self._callbacks:
+                self._callbacks.remove(callback)
+
+    def check(self) -> None:
+        """
+        Raises JobCancelled (or JobTimeout) if the token was cancelled.
+        """
+        if self._event.is_set():
+            raise (JobTimeout if self.timed_out else JobCancelled)(self.reason or "Cancelled")
+
+    def remaining(self) -> Optional[float]:
+        """
+        Seconds left before the token's own timeout, or None if it has none.
+        """
+        if self.deadline is None:
+            return None
+        return max(0.0, self.deadline - time.monotonic())
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        return self._event.wait(timeout)
+
+
+def run_process(
+    cmd: Sequence[str],
+    token: Optional[CancelToken] = None,
+    timeout: Optional[float] = None,
+    partial_output: Optional[Path] = None,
+) -> None:
+    """
+    Runs a command like subprocess.run(check=True), but kills it when the token
+    is cancelled or the timeout passes. A partially written partial_output is
+    removed in that case, so no half-finished file is left behind.
+    """
+    process = subprocess.Popen(list(cmd))
+    unregister = token.on_cancel(process.kill) if token is not None else (lambda: None)
+    deadline = time.monotonic() + timeout if timeout else None
+    try:
+        while True:
+            try:
+                returncode = process.wait(timeout=POLL_INTERVAL)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if deadline is not None and time.monotonic() >= deadline:
+                process.kill()
+                process.wait()
+                raise JobTimeout(f"{cmd[0]} did not finish within {timeout:g}s")
+            if token is not None and token.cancelled:
+                process.kill()
+                process.wait()
+                token.check()
+        if token is not None:
+            token.check()  # killed by the cancel callback between polls
+        if returncode != 0:
+            raise subprocess.CalledProcessError(returncode, list(cmd))
+    except BaseException:
+        if process.poll() is None:
+            process.kill()
+            process.wait()
+        if partial_output is not None:
+            partial_output.unlink(missing_ok=True)
+        raise
+    finally:
+        unregister()
@@ -0,0 +1,162 @@
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import sys
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Optional
+
+from .stitch import chapters_path, stitch_parts
+
+
+# Uncompressed formats are written with the stdlib and are always available.
+PCM_FORMATS = ("aiff", "wav")
+
+# Compressed formats: candidate commands in order of preference ({src}/{dst} are filled in).
+ENCODERS: dict[str, list[list[str]]] = {
+    "m4a": [
+        ["afconvert", "-f", "m4af", "-d", "aac", "{src}", "{dst}"],
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", "{src}", "-c:a", "aac", "-b:a", "96k", "{dst}"],
+    ],
+    "mp3": [
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", "{src}", "-c:a", "libmp3lame", "-q:a", "4", "{dst}"],
+        ["lame", "--quiet", "-V", "4", "{src}", "{dst}"],
+    ],
+    "flac": [
+        ["flac", "--silent", "--force", "-o", "{dst}", "{src}"],
+        ["ffmpeg", "-y", "-loglevel", "error", "-i", "{src}", "-c:a", "flac", "{dst}"],
+    ],
+}
+
+# on_done(final_path, error) — called from a pool thread.
+DoneFn = Callable[[Optional[Path], Optional[BaseException]], None]
+
+
+class EncodeError(RuntimeError):
+    """
+    Raised when a format is unknown, has no encoder installed, or the encoder fails.
+    """
+
+
+def _encoder_for(fmt: str) -> Optional[list[str]]:
+    for command in ENCODERS.get(fmt, []):
+        if command[0] == "afconvert" and sys.platform != "darwin":
+            continue
+        if shutil.which(command[0]):
+            return command
+    return None
+
+
+def available_formats() -> list[str]:
+    """
+    Returns the output formats usable on this machine (PCM formats first).
+    """
+    return list(PCM_FORMATS) + [fmt for fmt in ENCODERS if _encoder_for(fmt)]
+
+
+def encoded_path(src: Path, fmt: str) -> Path:
+    """
+    Returns the file encode_file(src, fmt) produces (src itself if it already has that format).
+    """
+    fmt = fmt.lower().lstrip(".")
+    current = src.suffix.lower().lstrip(".")
+    if {"aif": "aiff"}.get(current, current) == fmt:
+        return src
+    return src.with_suffix(f".{fmt}")
+
+
+def encode_file(src: Path, fmt: str, remove_source: bool = True) -> Path:
+    """
+    Converts a rendered file to fmt next to it and returns the new path.
+    Returns src unchanged if it already has that format. The source is removed
+    after a successful conversion unless remove_source is False. A chapters
+    sidecar (from stitch_parts) follows the audio to the new file.
+    """
+    fmt = fmt.lower().lstrip(".")
+    dst = encoded_path(src, fmt)
+    if dst == src:
+        return src
+
+    tmp = dst.with_name(f".{dst.stem}.encode-tmp{dst.suffix}")
+    try:
+        if fmt in PCM_FORMATS:
+            stitch_parts([src], tmp, gap_seconds=0, chapters=False)
+        else:
+            command = _encoder_for(fmt)
+            if command is None:
+                raise EncodeError(f"No encoder installed for .{fmt}")
+            args = [arg.format(src=src, dst=tmp) for arg in command]
+            completed = subprocess.run(args, capture_output=True, text=True)
+            if completed.returncode != 0 or not tmp.exists():
+                raise EncodeError(f"{command[0]} failed: {completed.stderr.strip() or completed.returncode}")
+        tmp.replace(dst)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    _carry_chapters(src, dst, remove_source)
+    if remove_source:
+        src.unlink(missing_ok=True)
+    return dst
+
+
+def _carry_chapters(src: Path, dst: Path, remove_source: bool) -> None:
+    """
+    Writes src's chapters sidecar for dst (same markers, new file name) and
+    removes the old sidecar along with src.
+    """
+    sidecar = chapters_path(src)
+    if not sidecar.exists():
+        return
+    try:
+        data = json.loads(sidecar.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return
+    data["file"] = dst.name
+    chapters_path(dst).write_text(json.dumps(data, indent=2), encoding="utf-8")
+    if remove_source:
+        sidecar.unlink(missing_ok=True)
+
+
+class Encoder:
+    """
+    Runs encode_file on a small background pool so the engine can start the
+    next render while the previous one is still being compressed.
+    """
+
+    def __init__(self, max_workers: int = 2) -> None:
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="speaknotes-encode")
+        self._lock = threading.Lock()
+        self._pending: set[Future] = set()
+
+    def submit(self, src: Path, fmt: str, on_done: Optional[DoneFn] = None, remove_source: bool = True) -> "Future[Path]":
+        """
+        Queues src for encoding and returns a Future for the final path.
+        on_done is called with (path, None) or (None, error) once it finishes.
+        """
+        future = self._pool.submit(encode_file, src, fmt, remove_source)
+        with self._lock:
+            self._pending.add(future)
+
+        def finished(f: Future) -> None:
+            with self._lock:
+                self._pending.discard(f)
+            if on_done:
+                error = f.exception()
+                on_done(None if error else f.result(), error)
+
+        future.add_done_callback(finished)
+        return future
+
+    def pending(self) -> int:
+        """
+        Returns how many files are queued or being encoded.
+        """
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
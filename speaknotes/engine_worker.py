@@ -0,0 +1,275 @@
+from __future__ import annotations
+
+import atexit
+import itertools
+import multiprocessing as mp
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional
+
+from .cancel import CancelToken
+
+
+DEFAULT_REQUEST_TIMEOUT = 300.0  # seconds before a silent engine is considered wedged
+STARTUP_TIMEOUT = 30.0
+POLL_INTERVAL = 0.25
+
+
+class EngineWorkerError(RuntimeError):
+    """
+    Raised when the engine worker fails a request, dies, or stops responding.
+    """
+
+
+def _apply_settings(engine: Any, applied: dict[str, Any], defaults: dict[str, Any], settings: dict[str, Any]) -> None:
+    """
+    Pushes only the properties that changed since the last request into the engine.
+    A missing value falls back to the engine's startup default.
+    """
+    for prop, key in (("rate", "rate"), ("volume", "volume"), ("voice", "voice_id")):
+        value = settings.get(key)
+        if value is None:
+            value = defaults.get(prop)
+        if value is None or applied.get(prop) == value:
+            continue
+        engine.setProperty(prop, value)
+        applied[prop] = value
+
+
+def _worker_main(requests: Any, responses: Any) -> None:
+    """
+    Entry point of the engine process: one warm pyttsx3 engine serving a request queue.
+    """
+    try:
+        import pyttsx3
+        engine = pyttsx3.init()
+    except Exception as e:
+        responses.put((0, False, f"Could not start TTS engine: {e}"))
+        return
+
+    defaults = {prop: engine.getProperty(prop) for prop in ("rate", "volume", "voice")}
+    applied = dict(defaults)
+    responses.put((0, True, "ready"))
+
+    while True:
+        request = requests.get()
+        if request is None:
+            break
+
+        req_id, op, payload = request
+        try:
+            if op == "voices":
+                result: Any = [(v.id, getattr(v, "name", "Unknown")) for v in engine.getProperty("voices")]
+            elif op == "speak":
+                _apply_settings(engine, applied, defaults, payload["settings"])
+                engine.say(payload["text"])
+                engine.runAndWait()
+                result = None
+            elif op == "save":
+                _apply_settings(engine, applied, defaults, payload["settings"])
+                engine.save_to_file(payload["text"], payload["path"])
+                engine.runAndWait()
+                result = payload["path"]
+            elif op == "ping":
+                result = "pong"
+            else:
+                raise ValueError(f"Unknown engine operation: {op}")
+            responses.put((req_id, True, result))
+        except Exception as e:
+            responses.put((req_id, False, str(e)))
+
+    try:
+        engine.stop()
+    except Exception:
+        pass
+
+
+class EngineWorker:
+    """
+    Keeps one pyttsx3 engine warm in a dedicated process and serves requests in order.
+    If the process dies or a request exceeds its timeout, the process is killed and a
+    fresh one is started for the next request.
+    """
+
+    def __init__(self, request_timeout: float = DEFAULT_REQUEST_TIMEOUT) -> None:
+        self.request_timeout = request_timeout
+        self.restarts = 0
+        self._ctx = mp.get_context("spawn")
+        self._process: Optional[mp.process.BaseProcess] = None
+        self._requests: Any = None
+        self._responses: Any = None
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    # ---- Process lifecycle ----
+
+    def is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts the engine process (no-op if it is already running).
+        """
+        with self._lock:
+            self._ensure_started()
+
+    def _ensure_started(self) -> None:
+        if self.is_alive():
+            return
+
+        self._requests = self._ctx.Queue()
+        self._responses = self._ctx.Queue()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(self._requests, self._responses),
+            name="speaknotes-engine",
+            daemon=True,
+        )
+        self._process.start()
+
+        try:
+            _, ok, message = self._responses.get(timeout=STARTUP_TIMEOUT)
+        except queue.Empty:
+            self._kill()
+            raise EngineWorkerError("TTS engine did not start in time.")
+        if not ok:
+            self._kill()
+            raise EngineWorkerError(message)
+
+    def _kill(self) -> None:
+        process = self._process
+        self._process = None
+        if process is None:
+            return
+        if process.is_alive():
+            process.kill()
+        process.join(timeout=5)
+
+    def restart(self) -> None:
+        """
+        Kills the current engine process and starts a new one.
+        """
+        with self._lock:
+            self._kill()
+            self.restarts += 1
+            self._ensure_started()
+
+    def interrupt(self) -> None:
+        """
+        Kills the engine process mid-request (e.g. to stop speech right away).
+        The pending call fails with EngineWorkerError and the next call starts a fresh engine.
+        Does not take the request lock, so it can be called while a request is running.
+        """
+        process = self._process
+        if process is not None and process.is_alive():
+            process.kill()
+
+    def stop(self) -> None:
+        """
+        Asks the engine process to exit, killing it if it does not.
+        """
+        with self._lock:
+            process = self._process
+            if process is None:
+                return
+            if process.is_alive():
+                self._requests.put(None)
+                process.join(timeout=5)
+            self._kill()
+
+    # ---- Requests ----
+
+    def call(
+        self,
+        op: str,
+        payload: Optional[dict[str, Any]] = None,
+        timeout: Optional[float] = None,
+        token: Optional[CancelToken] = None,
+    ) -> Any:
+        """
+        Sends one request to the engine and waits for its result.
+        Raises EngineWorkerError on failure; a wedged or dead engine is replaced.
+        If the token is cancelled, a request still waiting for the engine is
+        dropped, and a running one is stopped by killing the engine (JobCancelled).
+        """
+        timeout = self.request_timeout if timeout is None else timeout
+
+        # Wait for our turn without blocking cancellation of a queued request.
+        while not self._lock.acquire(timeout=POLL_INTERVAL):
+            if token is not None:
+                token.check()
+        try:
+            if token is not None:
+                token.check()
+            self._ensure_started()
+            req_id = next(self._ids)
+            self._requests.put((req_id, op, payload or {}))
+
+            deadline = time.monotonic() + timeout
+            while True:
+                try:
+                    resp_id, ok, result = self._responses.get(timeout=POLL_INTERVAL)
+                except queue.Empty:
+                    if token is not None and token.cancelled:
+                        self._kill()
+                        self.restarts += 1
+                        token.check()
+                    if not self.is_alive():
+                        self._kill()
+                        self.restarts += 1
+                        raise EngineWorkerError("TTS engine process exited unexpectedly and will be restarted.")
+                    if time.monotonic() >= deadline:
+                        self._kill()
+                        self.restarts += 1
+                        raise EngineWorkerError(f"TTS engine did not answer within {timeout:.0f}s and was restarted.")
+                    continue
+                if resp_id == req_id:
+                    break
+        finally:
+            self._lock.release()
+
+        if not ok:
+            raise EngineWorkerError(result)
+        return result
+
+    def list_voices(self) -> list[tuple[str, str]]:
+        return [tuple(v) for v in self.call("voices")]
+
+    def speak(
+        self,
+        text: str,
+        settings: dict[str, Any],
+        timeout: Optional[float] = None,
+        token: Optional[CancelToken] = None,
+    ) -> None:
+        self.call("speak", {"text": text, "settings": settings}, timeout=timeout, token=token)
+
+    def save_to_file(
+        self,
+        text: str,
+        output_path: Path,
+        settings: dict[str, Any],
+        timeout: Optional[float] = None,
+        token: Optional[CancelToken] = None,
+    ) -> Path:
+        self.call("save", {"text": text, "path": str(output_path), "settings": settings}, timeout=timeout, token=token)
+        return output_path
+
+
+_shared_worker: Optional[EngineWorker] = None
+_shared_lock = threading.Lock()
+
+
+def get_engine_worker() -> EngineWorker:
+    """
+    Returns the process-wide engine worker, creating it on first use.
+    The process itself is only spawned when the first request arrives.
+    """
+    global _shared_worker
+    with _shared_lock:
+        if _shared_worker is None:
+            _shared_worker = EngineWorker()
+            atexit.register(_shared_worker.stop)
+        return _shared_worker
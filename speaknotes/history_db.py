@@ -0,0 +1,171 @@
+from __future__ import annotations
+
+import json
+import sqlite3
+from contextlib import closing
+from pathlib import Path
+from typing import Any, Optional
+
+from .history_utils import search_text
+
+
+HISTORY_DB = Path("history.sqlite3")
+
+# Columns stored natively; any other entry keys are kept in the 'extra' JSON column.
+COLUMNS = ("date", "file", "rate", "volume", "voice", "mode", "source", "source_path", "text_preview")
+INDEXED = ("date", "voice", "mode", "source", "source_path", "file")
+SORTABLE = ("date", "mode", "source", "source_path", "file", "voice", "rate", "volume", "text_preview")
+FILTERABLE = ("voice", "mode", "source", "source_path", "file")
+
+
+class HistoryDB:
+    """
+    SQLite-backed history store with indexed filters, substring search and
+    paginated queries. Each call opens its own connection,
+    so it is safe to use from the GUI thread and worker threads alike.
+    """
+
+    def __init__(self, path: Path = HISTORY_DB) -> None:
+        self.path = Path(path)
+        self._init_schema()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _init_schema(self) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS entries (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    date TEXT, file TEXT, rate NUMERIC, volume NUMERIC, voice TEXT,
+                    mode TEXT, source TEXT, source_path TEXT, text_preview TEXT,
+                    extra TEXT, search_text TEXT
+                )
+                """
+            )
+            for column in INDEXED:
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_entries_{column} ON entries({column})")
+
+            # Searches match the precomputed search_text (see history_utils.search_text), so
+            # they agree with the JSON Lines backend. Stores from before that used FTS5.
+            for trigger in ("entries_ai", "entries_ad"):
+                conn.execute(f"DROP TRIGGER IF EXISTS {trigger}")
+            conn.execute("DROP TABLE IF EXISTS entries_fts")
+            if "search_text" not in {row["name"] for row in conn.execute("PRAGMA table_info(entries)")}:
+                conn.execute("ALTER TABLE entries ADD COLUMN search_text TEXT")
+                conn.executemany(
+                    "UPDATE entries SET search_text = ? WHERE id = ?",
+                    [(search_text(self._to_entry(row)), row["id"]) for row in conn.execute("SELECT * FROM entries")],
+                )
+
+    # ---- Writes ----
+
+    @staticmethod
+    def _to_row(entry: dict[str, Any]) -> tuple[Any, ...]:
+        extra = {k: v for k, v in entry.items() if k not in COLUMNS}
+        values = tuple(entry.get(column, "") for column in COLUMNS)
+        return values + (json.dumps(extra, ensure_ascii=False) if extra else None, search_text(entry))
+
+    def _insert(self, conn: sqlite3.Connection, entries: list[dict[str, Any]]) -> None:
+        placeholders = ", ".join("?" for _ in range(len(COLUMNS) + 2))
+        conn.executemany(
+            f"INSERT INTO entries ({', '.join(COLUMNS)}, extra, search_text) VALUES ({placeholders})",
+            [self._to_row(e) for e in entries],
+        )
+
+    def append_many(self, entries: list[dict[str, Any]]) -> None:
+        with closing(self._connect()) as conn, conn:
+            self._insert(conn, entries)
+
+    def delete_by_files(self, file_paths: list[str]) -> int:
+        with closing(self._connect()) as conn, conn:
+            cur = conn.executemany("DELETE FROM entries WHERE file = ?", [(p,) for p in file_paths])
+            return cur.rowcount
+
+    def replace_all(self, entries: list[dict[str, Any]]) -> None:
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM entries")
+            self._insert(conn, entries)
+
+    # ---- Reads ----
+
+    @staticmethod
+    def _to_entry(row: sqlite3.Row) -> dict[str, Any]:
+        entry = {column: row[column] for column in COLUMNS}
+        if row["extra"]:
+            try:
+                entry.update(json.loads(row["extra"]))
+            except json.JSONDecodeError:
+                pass
+        return entry
+
+    def _where(self, filters: Optional[dict[str, Any]], search: str) -> tuple[str, list[Any]]:
+        clauses: list[str] = []
+        params: list[Any] = []
+
+        for key, value in (filters or {}).items():
+            if value in (None, ""):
+                continue
+            if key in FILTERABLE:
+                clauses.append(f"{key} = ?")
+                params.append(value)
+            elif key == "date_from":
+                clauses.append("date >= ?")
+                params.append(value)
+            elif key == "date_to":
+                clauses.append("date <= ?")
+                params.append(value)
+            else:
+                raise ValueError(f"Unknown history filter: {key}")
+
+        search = search.strip()
+        if search:
+            clauses.append("instr(search_text, ?) > 0")
+            params.append(search.lower())
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def query(
+        self,
+        filters: Optional[dict[str, Any]] = None,
+        search: str = "",
+        sort: str = "date",
+        descending: bool = True,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> list[dict[str, Any]]:
+        """
+        Returns one page of entries matching filters/search, ordered by 'sort'.
+        """
+        if sort not in SORTABLE:
+            raise ValueError(f"Cannot sort history by: {sort}")
+        where, params = self._where(filters, search)
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT * FROM entries {where} ORDER BY {sort} {direction}, id {direction}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params += [int(limit), int(offset)]
+        with closing(self._connect()) as conn:
+            return [self._to_entry(row) for row in conn.execute(sql, params)]
+
+    def is_empty(self) -> bool:
+        with closing(self._connect()) as conn:
+            return conn.execute("SELECT 1 FROM entries LIMIT 1").fetchone() is None
+
+    def count(self, filters: Optional[dict[str, Any]] = None, search: str = "") -> int:
+        where, params = self._where(filters, search)
+        with closing(self._connect()) as conn:
+            return int(conn.execute(f"SELECT COUNT(*) FROM entries {where}", params).fetchone()[0])
+
+    def all(self) -> list[dict[str, Any]]:
+        """
+        Returns every entry in insertion order (oldest first), like load_history().
+        """
+        with closing(self._connect()) as conn:
+            return [self._to_entry(row) for row in conn.execute("SELECT * FROM entries ORDER BY id")]
@@ -1,31 +1,550 @@
 from __future__ import annotations
 import json
+import os
+import sys
+import threading
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
-from typing import Any
+from typing import Any, Callable, Iterator, Optional
 
+from .config_utils import load_config
 
-HISTORY_FILE = Path("history.json")
+
+HISTORY_FILE = Path("history.json")        # legacy format: one JSON array, rewritten on every export
+HISTORY_LOG = Path("history.jsonl")        # current format: append-only JSON Lines
+COMPACT_THRESHOLD = 200                    # delete markers tolerated before the log is rewritten
+NUMERIC_COLUMNS = ("rate", "volume")       # sorted by value, not as text
+QUERY_MEMO_SIZE = 8                        # recent filtered results kept for paging and narrowing searches
+# Fields a search matches (case-insensitive substring), the same for both backends.
+SEARCH_COLUMNS = ("date", "file", "rate", "volume", "voice", "mode", "source", "source_path", "text_preview")
+HISTORY_BACKENDS = ("jsonl", "sqlite")
+
+_backend: Optional[str] = None
+_db: Any = None
+
+
+def get_history_backend() -> str:
+    """
+    Returns the active history backend ('jsonl' by default, or 'sqlite' via
+    "history_backend" in config.json or set_history_backend()).
+    """
+    global _backend
+    if _backend is None:
+        choice = str(load_config().get("history_backend", "jsonl")).lower()
+        _backend = choice if choice in HISTORY_BACKENDS else "jsonl"
+    return _backend
+
+
+def set_history_backend(name: str) -> None:
+    """
+    Selects the history backend for this process.
+    """
+    global _backend, _db
+    if name not in HISTORY_BACKENDS:
+        raise ValueError(f"Unknown history backend: {name}")
+    _backend = name
+    _db = None
+
+
+def _get_db() -> Any:
+    """
+    Opens the SQLite store on first use, seeding it from the JSON Lines log
+    (or legacy history.json) when it is created.
+    """
+    global _db
+    if _db is None:
+        from .history_db import HISTORY_DB, HistoryDB
+        is_new = not HISTORY_DB.exists()
+        db = HistoryDB(HISTORY_DB)
+        if is_new and db.is_empty():
+            if not HISTORY_LOG.exists():
+                import_legacy_history()
+            entries, _ = _replay(_read_records(HISTORY_LOG))
+            if entries:
+                db.append_many(entries)
+        _db = db
+    return _db
+
+
+@contextmanager
+def _locked(log_path: Path) -> Iterator[None]:
+    """
+    Holds an exclusive lock on '<log>.lock' so the GUI and main.py never interleave writes.
+    """
+    lock_path = log_path.with_name(log_path.name + ".lock")
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(lock_path, "a+b") as lock_file:
+        if sys.platform.startswith("win"):
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _append_lines(log_path: Path, records: list[dict[str, Any]]) -> None:
+    """
+    Appends records as JSON lines and fsyncs. Caller must hold the lock.
+    A torn last line left by a crash is terminated first so it can't swallow new records.
+    """
+    payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+    fd = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        size = os.fstat(fd).st_size
+        if size:
+            with open(log_path, "rb") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    payload = b"\n" + payload
+        os.write(fd, payload)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _write_atomic(log_path: Path, entries: list[dict[str, Any]]) -> None:
+    """
+    Replaces the log with exactly these entries (temp file + fsync + rename).
+    Caller must hold the lock.
+    """
+    tmp_path = log_path.with_name(log_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        for entry in entries:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, log_path)
+
+
+def _parse_line(line: bytes) -> dict[str, Any] | None:
+    """
+    Decodes one log line; returns None for blank, corrupt or half-written lines
+    (including a line torn in the middle of a multi-byte character).
+    """
+    line = line.strip()
+    if not line:
+        return None
+    try:
+        record = json.loads(line)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def _read_records(log_path: Path) -> list[dict[str, Any]]:
+    """
+    Reads every valid record from the log. Corrupt or half-written lines are skipped.
+    """
+    records: list[dict[str, Any]] = []
+    try:
+        with open(log_path, "rb") as f:
+            for line in f:
+                record = _parse_line(line)
+                if record is not None:
+                    records.append(record)
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def _replay(records: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], int]:
+    """
+    Applies delete markers to the records in order.
+    Returns (live entries, number of delete markers seen).
+    """
+    entries: list[dict[str, Any] | None] = []
+    by_file: dict[str, list[int]] = {}
+    markers = 0
+    for record in records:
+        if record.get("op") == "delete":
+            markers += 1
+            for index in by_file.pop(record.get("file", ""), []):
+                entries[index] = None
+        else:
+            by_file.setdefault(record.get("file", ""), []).append(len(entries))
+            entries.append(record)
+    return [e for e in entries if e is not None], markers
+
+
+class _LogReader:
+    """
+    Keeps the replayed contents of the JSON Lines log in memory and brings them
+    up to date by reading only the bytes appended since the last look.
+
+    Appends (new entries and delete markers) are read from the saved offset.
+    A different inode or a shorter file means the log was rewritten (compaction,
+    rewrite_history), and it is then replayed from the start.
+
+    Each entry is kept with its lowercased search text, built once when the
+    entry is read, so searching never re-stringifies the log.
+    """
+
+    def __init__(self, log_path: Path) -> None:
+        self.log_path = log_path
+        self.version = 0  # bumped whenever the live entries may have changed
+        self._lock = threading.Lock()
+        self._reset(None)
+
+    def _reset(self, inode: Optional[int]) -> None:
+        self._inode = inode
+        self._offset = 0
+        self._mtime_ns = 0
+        self._entries: list[tuple[dict[str, Any], str] | None] = []  # (entry, search text)
+        self._by_file: dict[str, list[int]] = {}
+        self._live = 0
+        self.markers = 0
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        # Same rules as _replay, applied one record at a time.
+        if record.get("op") == "delete":
+            self.markers += 1
+            for index in self._by_file.pop(record.get("file", ""), []):
+                self._entries[index] = None
+                self._live -= 1
+        else:
+            self._by_file.setdefault(record.get("file", ""), []).append(len(self._entries))
+            self._entries.append((record, search_text(record)))
+            self._live += 1
+
+    def sync(self) -> None:
+        """
+        Reads whatever changed since the last call (a stat when nothing did).
+        """
+        with self._lock:
+            try:
+                st = os.stat(self.log_path)
+            except FileNotFoundError:
+                if self._inode is not None or self._entries:
+                    self._reset(None)
+                    self.version += 1
+                return
+            if st.st_ino != self._inode or st.st_size < self._offset:
+                self._reset(st.st_ino)
+                self.version += 1
+            elif st.st_size == self._offset and st.st_mtime_ns == self._mtime_ns:
+                return
+
+            with open(self.log_path, "rb") as f:
+                f.seek(self._offset)
+                data = f.read()
+            end = data.rfind(b"\n") + 1  # a line still being written is picked up next time
+            for line in data[:end].splitlines():
+                record = _parse_line(line)
+                if record is not None:
+                    self._apply(record)
+            self._offset += end
+            self._mtime_ns = st.st_mtime_ns
+            if end:
+                self.version += 1
+
+    def entries(self) -> list[dict[str, Any]]:
+        """
+        Returns the live entries (shared with the reader; callers must not modify them).
+        """
+        return [entry for entry, _ in self.rows()]
+
+    def rows(self) -> list[tuple[dict[str, Any], str]]:
+        """
+        Returns (entry, search text) pairs for the live entries, oldest first.
+        """
+        self.sync()
+        with self._lock:
+            return [row for row in self._entries if row is not None]
+
+
+_log_reader: Optional[_LogReader] = None
+_query_memo: dict[tuple, list[tuple[dict[str, Any], str]]] = {}
+_memo_lock = threading.Lock()  # the history window searches on a worker thread while the Tk thread pages
+
+
+def _reader() -> _LogReader:
+    global _log_reader
+    log_path = Path(os.path.abspath(HISTORY_LOG))  # HISTORY_LOG is relative to the working directory
+    if _log_reader is None or _log_reader.log_path != log_path:
+        _log_reader = _LogReader(log_path)
+    return _log_reader
+
+
+def history_version() -> Any:
+    """
+    Returns a value that changes whenever history changes, from a stat alone:
+    nothing is read or parsed, so it is safe to poll from the UI thread.
+    The new entries themselves are loaded by the next query or count.
+    """
+    if get_history_backend() == "sqlite":
+        from .history_db import HISTORY_DB
+        paths = (HISTORY_DB, HISTORY_DB.with_name(HISTORY_DB.name + "-wal"))
+    else:
+        paths = (HISTORY_LOG,)
+    version = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            version.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+
+def import_legacy_history(json_path: Path | None = None, log_path: Path | None = None) -> int:
+    """
+    One-time import of a legacy history.json array into the JSON Lines log.
+    Does nothing if the log already exists. The legacy file is left untouched.
+    Returns the number of imported entries.
+    """
+    json_path = HISTORY_FILE if json_path is None else json_path
+    log_path = HISTORY_LOG if log_path is None else log_path
+
+    with _locked(log_path):
+        if log_path.exists() or not json_path.exists():
+            return 0
+        try:
+            data = json.loads(json_path.read_text(encoding="utf-8"))
+        except Exception:
+            return 0
+        entries = [e for e in data if isinstance(e, dict)] if isinstance(data, list) else []
+        _write_atomic(log_path, entries)
+        return len(entries)
 
 
 def load_history() -> list[Any]:
     """
-    Loads the current TTS history from the JSON file.
+    Loads the current TTS history from the log (importing history.json on first use).
     If the file doesn't exist or is invalid, returns an empty list.
     """
-    try:
-        return json.loads(HISTORY_FILE.read_text(encoding="utf-8"))
-    except Exception:
-        return []
+    if get_history_backend() == "sqlite":
+        return _get_db().all()
+    if not HISTORY_LOG.exists():
+        import_legacy_history()
+    return [dict(e) for e in _reader().entries()]
 
 
 def append_history(entry: dict[str, Any]) -> None:
     """
-    Appends a new history entry to the JSON file.
+    Appends a new history entry to the log in O(1), under a cross-process lock.
+    """
+    append_history_many([entry])
+
+
+def append_history_many(entries: list[dict[str, Any]]) -> None:
+    """
+    Appends several history entries with a single locked write.
+    """
+    if not entries:
+        return
+    if get_history_backend() == "sqlite":
+        _get_db().append_many(entries)
+        return
+    if not HISTORY_LOG.exists():
+        import_legacy_history()
+    with _locked(HISTORY_LOG):
+        _append_lines(HISTORY_LOG, entries)
+
+
+def delete_history_entries(file_paths: list[str]) -> None:
+    """
+    Removes every entry whose 'file' matches one of file_paths by appending delete markers.
+    The log is compacted once enough markers have piled up.
+    """
+    if not file_paths:
+        return
+    if get_history_backend() == "sqlite":
+        _get_db().delete_by_files(file_paths)
+        return
+    if not HISTORY_LOG.exists():
+        import_legacy_history()
+    with _locked(HISTORY_LOG):
+        _append_lines(HISTORY_LOG, [{"op": "delete", "file": p} for p in file_paths])
+    maybe_compact_history()
+
+
+def rewrite_history(entries: list[dict[str, Any]]) -> None:
+    """
+    Atomically replaces the whole history with the given entries.
+    """
+    if get_history_backend() == "sqlite":
+        _get_db().replace_all(entries)
+        return
+    with _locked(HISTORY_LOG):
+        _write_atomic(HISTORY_LOG, entries)
+
+
+def compact_history() -> int:
+    """
+    Rewrites the log without delete markers, removed entries or corrupt lines.
+    Returns the number of live entries kept.
+    """
+    with _locked(HISTORY_LOG):
+        entries, _ = _replay(_read_records(HISTORY_LOG))
+        _write_atomic(HISTORY_LOG, entries)
+        return len(entries)
+
+
+def maybe_compact_history(threshold: int = COMPACT_THRESHOLD) -> bool:
+    """
+    Compacts the log if it holds more than 'threshold' delete markers.
+    Returns True if a compaction ran.
+    """
+    reader = _reader()
+    reader.sync()
+    if reader.markers <= threshold:
+        return False
+    compact_history()
+    return True
+
+
+def search_text(entry: dict[str, Any]) -> str:
+    """
+    The lowercased text a search is matched against. HistoryDB stores it per
+    row, so a search finds the same entries with either backend.
+    """
+    return "\n".join(str(entry.get(column, "")) for column in SEARCH_COLUMNS).lower()
+
+
+def _check_query(filters: dict[str, Any], sort: str) -> None:
+    """
+    Rejects the filters and sort columns that HistoryDB rejects, so both backends agree.
+    """
+    from .history_db import FILTERABLE, SORTABLE
+
+    for key, value in filters.items():
+        if value not in (None, "") and key not in FILTERABLE + ("date_from", "date_to"):
+            raise ValueError(f"Unknown history filter: {key}")
+    if sort not in SORTABLE:
+        raise ValueError(f"Cannot sort history by: {sort}")
+
+
+def _sort_key(sort: str) -> Callable[[tuple[dict[str, Any], str]], Any]:
+    """
+    Sort key for (entry, search text) rows. The numeric columns sort by value
+    (90 before 180), numbers before text, like the NUMERIC columns in SQLite.
+    """
+    if sort not in NUMERIC_COLUMNS:
+        return lambda row: str(row[0].get(sort, ""))
+
+    def numeric(row: tuple[dict[str, Any], str]) -> tuple[int, float, str]:
+        value = row[0].get(sort, "")
+        try:
+            return (0, float(value), "")
+        except (TypeError, ValueError):
+            return (1, 0.0, str(value))
+
+    return numeric
+
+
+def _matches(entry: dict[str, Any], filters: dict[str, Any], search: str, text: str | None = None) -> bool:
     """
-    history = load_history()
-    history.append(entry)
-    HISTORY_FILE.write_text(json.dumps(history, indent=2), encoding="utf-8")
+    In-memory equivalent of the SQLite filters, used by the JSON Lines backend.
+    text is the entry's precomputed search_text, if known.
+    """
+    for key, value in filters.items():
+        if value in (None, ""):
+            continue
+        if key == "date_from":
+            if str(entry.get("date", "")) < value:
+                return False
+        elif key == "date_to":
+            if str(entry.get("date", "")) > value:
+                return False
+        elif entry.get(key, "") != value:
+            return False
+    if search:
+        if text is None:
+            text = search_text(entry)
+        if search.lower() not in text:
+            return False
+    return True
+
+
+def query_history(
+    filters: Optional[dict[str, Any]] = None,
+    search: str = "",
+    sort: str = "date",
+    descending: bool = True,
+    limit: Optional[int] = None,
+    offset: int = 0,
+) -> list[dict[str, Any]]:
+    """
+    Returns one page of history entries matching filters and a search string.
+    filters may hold exact 'voice'/'mode'/'source'/'source_path'/'file' values
+    plus 'date_from'/'date_to' bounds. With the SQLite backend this only reads
+    the requested page; the JSON Lines backend filters in memory.
+    """
+    search = search.strip()
+    if get_history_backend() == "sqlite":
+        return _get_db().query(filters, search, sort, descending, limit, offset)
+
+    end = None if limit is None else offset + limit
+    return [dict(e) for e, _ in _matching(filters, search, sort, descending)[offset:end]]
+
+
+def _matching(
+    filters: Optional[dict[str, Any]],
+    search: str,
+    sort: str = "date",
+    descending: bool = True,
+) -> list[tuple[dict[str, Any], str]]:
+    """
+    Filtered, sorted JSON Lines (entry, search text) pairs. Recent results are
+    reused until the log changes, so paging through one (e.g. the scrolling
+    history table) costs a stat per page instead of a full filter and sort.
+
+    A search that extends an earlier one (typing "rep" after "re") only
+    rechecks the earlier matches, which are already filtered and sorted.
+    """
+    if not HISTORY_LOG.exists():
+        import_legacy_history()
+    _check_query(filters or {}, sort)
+    reader = _reader()
+    reader.sync()
+    search = search.lower()
+    base_key = (id(reader), reader.version, json.dumps(filters or {}, sort_keys=True, default=str), sort, descending)
+    with _memo_lock:
+        cached = _query_memo.pop(base_key + (search,), None)
+        if cached is not None:
+            _query_memo[base_key + (search,)] = cached  # most recently used last
+            return cached
+        narrower = [
+            rows for key, rows in _query_memo.items()
+            if key[:-1] == base_key and key[-1] in search
+        ]
+
+    if narrower:
+        matched = [row for row in min(narrower, key=len) if search in row[1]]
+    else:
+        matched = [row for row in reader.rows() if _matches(row[0], filters or {}, search, row[1])]
+        if descending:
+            matched.reverse()  # ties stay newest first, like the SQLite 'id DESC' tiebreak
+        matched.sort(key=_sort_key(sort), reverse=descending)
+
+    with _memo_lock:
+        for key in [k for k in _query_memo if k[:2] != base_key[:2]]:
+            del _query_memo[key]  # results from an older log version
+        _query_memo[base_key + (search,)] = matched
+        while len(_query_memo) > QUERY_MEMO_SIZE:
+            del _query_memo[next(iter(_query_memo))]
+    return matched
+
+
+def count_history(filters: Optional[dict[str, Any]] = None, search: str = "") -> int:
+    """
+    Returns how many history entries match filters and a search string.
+    """
+    search = search.strip()
+    if get_history_backend() == "sqlite":
+        return _get_db().count(filters, search)
+    return len(_matching(filters, search))
 
 def create_entry(file: Path, settings: Any, mode: str, text: str, source: str = "manual", source_path: str = "") -> dict[str, Any]:
     """
@@ -34,6 +553,10 @@ def create_entry(file: Path, settings: Any, mode: str, text: str, source: str =
     'source_path' stores the originating file path/name when applicable.
     """
     preview_snippet = text[:60].replace("\n", " ")
+    try:
+        size_bytes = file.stat().st_size
+    except OSError:
+        size_bytes = None
     return {
         "date": datetime.now().isoformat(timespec="seconds"),
         "file": str(file.resolve()),
@@ -44,5 +567,6 @@ def create_entry(file: Path, settings: Any, mode: str, text: str, source: str =
         "source": source,
         "source_path": source_path,
         "text_preview": preview_snippet,
+        "format": file.suffix.lower().lstrip("."),
+        "size_bytes": size_bytes,
     }
-
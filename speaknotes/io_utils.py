@@ -1,6 +1,12 @@
 from __future__ import annotations
 
+import codecs
+import mmap
 from pathlib import Path
+from typing import Iterator
+
+
+BLOCK_SIZE = 1 << 20  # bytes decoded per step when streaming a file
 
 
 def read_text_file(file_path: Path) -> str:
@@ -11,6 +17,44 @@ def read_text_file(file_path: Path) -> str:
     return file_path.read_text(encoding="utf-8").strip()
 
 
+def iter_text_file(file_path: Path, block_size: int = BLOCK_SIZE) -> Iterator[str]:
+    """
+    Yields a UTF-8 text file as decoded pieces of about block_size bytes.
+    The file is memory-mapped and decoded incrementally, so only one block
+    (plus a split multi-byte character) is held as a string at a time.
+    Raises FileNotFoundError if the file doesn't exist.
+    """
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    with file_path.open("rb") as f:
+        try:
+            view = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return  # empty file: nothing to map
+        with view:
+            for start in range(0, len(view), block_size):
+                piece = decoder.decode(view[start:start + block_size])
+                if piece:
+                    yield piece
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def read_text_head(file_path: Path, max_chars: int) -> tuple[str, bool]:
+    """
+    Returns (text, truncated): at most the first max_chars characters of a
+    UTF-8 text file, and whether there was more after them.
+    """
+    parts: list[str] = []
+    size = 0
+    for piece in iter_text_file(file_path, block_size=min(BLOCK_SIZE, max(4096, max_chars * 4))):
+        parts.append(piece)
+        size += len(piece)
+        if size > max_chars:
+            return "".join(parts)[:max_chars], True
+    return "".join(parts), False
+
+
 def get_user_text() -> str:
     """
     Prompts the user to either paste text or load it from a .txt file.
@@ -0,0 +1,244 @@
+from __future__ import annotations
+
+import heapq
+import itertools
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from .cancel import CancelToken, JobCancelled, JobTimeout
+
+
+# Lower runs first: a preview should never wait behind a long bulk export.
+PRIORITIES = {"preview": 0, "both": 1, "export": 1, "bulk": 2}
+
+# on_change(job) — called from worker threads whenever a job changes status.
+ChangeFn = Callable[["Job"], None]
+
+
+@dataclass(eq=False)
+class Job:
+    """
+    One unit of work in the queue, with its status and timing.
+    fn receives the job's CancelToken and should pass it to anything that blocks.
+    """
+    id: int
+    kind: str
+    label: str
+    fn: Callable[[CancelToken], Any]
+    priority: int
+    group: Optional[str] = None  # jobs sharing a group never run at the same time (e.g. audio playback)
+    timeout: Optional[float] = None  # seconds the job may run before it is cancelled
+    status: str = "queued"       # queued, running, done, failed, cancelled, timed out
+    token: Optional[CancelToken] = None  # created when the job starts
+    submitted_at: float = field(default_factory=time.perf_counter)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("done", "failed", "cancelled", "timed out")
+
+    def waited(self) -> float:
+        """
+        Seconds spent in the queue before starting (so far, if still queued).
+        """
+        end = self.started_at or self.finished_at or time.perf_counter()
+        return end - self.submitted_at
+
+    def ran(self) -> Optional[float]:
+        """
+        Seconds spent running (so far, if still running); None if it never started.
+        """
+        if self.started_at is None:
+            return None
+        return (self.finished_at or time.perf_counter()) - self.started_at
+
+
+class JobQueue:
+    """
+    Priority queue of jobs executed by a bounded set of worker threads.
+
+    Jobs run in priority order (see PRIORITIES), first-come first-served within
+    a priority. A queued job whose group is already running is passed over
+    until that group is free, so two previews never talk over each other while
+    exports keep flowing.
+    """
+
+    def __init__(self, max_workers: int = 2, on_change: Optional[ChangeFn] = None) -> None:
+        self.max_workers = max(1, max_workers)
+        self.on_change = on_change
+        self._heap: list[tuple[int, int, Job]] = []
+        self._jobs: list[Job] = []
+        self._busy_groups: set[str] = set()
+        self._ids = itertools.count(1)
+        self._cond = threading.Condition()
+        self._threads: list[threading.Thread] = []
+        self._closed = False
+
+    # ---- Public API ----
+
+    def submit(
+        self,
+        kind: str,
+        label: str,
+        fn: Callable[[CancelToken], Any],
+        priority: Optional[int] = None,
+        group: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> Job:
+        """
+        Queues fn and returns its Job. priority defaults to PRIORITIES[kind].
+        With a timeout, the job's token is cancelled once it has run that long.
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Job queue is shut down")
+            job = Job(
+                id=next(self._ids),
+                kind=kind,
+                label=label,
+                fn=fn,
+                priority=PRIORITIES.get(kind, 1) if priority is None else priority,
+                group=group,
+                timeout=timeout,
+            )
+            heapq.heappush(self._heap, (job.priority, job.id, job))
+            self._jobs.append(job)
+            if len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._worker, name=f"speaknotes-job-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._cond.notify()
+        self._changed(job)
+        return job
+
+    def cancel(self, job_id: int) -> bool:
+        """
+        Cancels a job. A queued job is dropped; a running one has its token
+        cancelled, which kills its engine or child process. Returns False if
+        the job is unknown or already finished.
+        """
+        with self._cond:
+            job = self.get(job_id)
+            if job is None or job.finished:
+                return False
+            if job.status == "running":
+                token = job.token
+            else:
+                job.status = "cancelled"
+                job.finished_at = time.perf_counter()
+                token = None
+        if token is not None:
+            token.cancel("Cancelled by user")
+            return True
+        self._changed(job)
+        return True
+
+    def get(self, job_id: int) -> Optional[Job]:
+        for job in self._jobs:
+            if job.id == job_id:
+                return job
+        return None
+
+    def jobs(self) -> list[Job]:
+        """
+        Returns all jobs in submission order.
+        """
+        with self._cond:
+            return list(self._jobs)
+
+    def clear_finished(self) -> list[Job]:
+        """
+        Forgets finished jobs and returns them.
+        """
+        with self._cond:
+            removed = [job for job in self._jobs if job.finished]
+            self._jobs = [job for job in self._jobs if not job.finished]
+        return removed
+
+    def shutdown(self, cancel_running: bool = False) -> None:
+        """
+        Cancels queued jobs (and running ones too if cancel_running) and stops
+        the workers once running jobs finish.
+        """
+        with self._cond:
+            self._closed = True
+            doomed = [job for job in self._jobs if job.status == "queued" or (cancel_running and job.status == "running")]
+            self._cond.notify_all()
+        for job in doomed:
+            self.cancel(job.id)
+
+    def alive(self) -> bool:
+        """
+        Returns True while a worker thread is still running, e.g. a cancelled
+        job finishing its cleanup after shutdown().
+        """
+        with self._cond:
+            threads = list(self._threads)
+        return any(thread.is_alive() for thread in threads)
+
+    # ---- Internals ----
+
+    def _changed(self, job: Job) -> None:
+        if self.on_change:
+            self.on_change(job)
+
+    def _next_job(self) -> Optional[Job]:
+        """
+        Pops the best runnable job (caller holds the lock); None if there is none.
+        """
+        skipped: list[tuple[int, int, Job]] = []
+        found = None
+        while self._heap:
+            entry = heapq.heappop(self._heap)
+            job = entry[2]
+            if job.status != "queued":
+                continue  # cancelled while waiting
+            if job.group is not None and job.group in self._busy_groups:
+                skipped.append(entry)
+                continue
+            found = job
+            break
+        for entry in skipped:
+            heapq.heappush(self._heap, entry)
+        return found
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                job = self._next_job()
+                while job is None:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                    job = self._next_job()
+                job.status = "running"
+                job.started_at = time.perf_counter()
+                job.token = CancelToken(timeout=job.timeout)
+                if job.group is not None:
+                    self._busy_groups.add(job.group)
+            self._changed(job)
+
+            try:
+                job.fn(job.token)
+                job.status = "done"
+            except JobTimeout as e:
+                job.status = "timed out"
+                job.error = str(e)
+            except JobCancelled as e:
+                job.status = "timed out" if job.token.timed_out else "cancelled"
+                job.error = job.token.reason or str(e)
+            except BaseException as e:
+                job.status = "failed"
+                job.error = str(e) or type(e).__name__
+            finally:
+                job.token.close()
+                job.finished_at = time.perf_counter()
+                with self._cond:
+                    if job.group is not None:
+                        self._busy_groups.discard(job.group)
+                    self._cond.notify_all()
+            self._changed(job)
@@ -1,16 +1,35 @@
 from __future__ import annotations
 
-import subprocess
+import platform
 from pathlib import Path
 
+from .cancel import CancelToken, run_process, timeout_for_text
+from .render_cache import RenderCache, make_cache_key
+from .trace import Trace, stage
 
-def say_to_file(text: str, output_path: Path, voice_name: str | None = None, rate_wpm: int | None = None) -> None:
+BACKEND_NAME = "say"
+
+
+def backend_version() -> str:
     """
-    Uses macOS 'say' to export speech audio to a file.
+    Returns the macOS version, since 'say' ships with the OS (used to key the render cache).
     """
-    output_path.parent.mkdir(parents=True, exist_ok=True)
+    return platform.mac_ver()[0] or "unknown"
+
+
+def say_command(
+    text: str,
+    output_path: Path | None = None,
+    voice_name: str | None = None,
+    rate_wpm: int | None = None,
+) -> list[str]:
+    """
+    Builds the 'say' command line (speaking aloud when output_path is None).
+    """
+    cmd = ["say"]
 
-    cmd = ["say", "-o", str(output_path)]
+    if output_path is not None:
+        cmd += ["-o", str(output_path)]
 
     if voice_name and voice_name != "Default (system)":
         cmd += ["-v", voice_name]
@@ -19,21 +38,72 @@ def say_to_file(text: str, output_path: Path, voice_name: str | None = None, rat
         cmd += ["-r", str(rate_wpm)]
 
     cmd.append(text)
+    return cmd
 
-    subprocess.run(cmd, check=True)
 
-def say_now(text: str, voice_name: str | None = None, rate_wpm: int | None = None) -> None:
+def say_cache_key(text: str, output_path: Path, voice_name: str | None = None, rate_wpm: int | None = None) -> str:
     """
-    Uses macOS 'say' to speak text immediately.
+    Render cache key for a 'say' export.
     """
-    cmd = ["say"]
+    return make_cache_key(
+        text,
+        BACKEND_NAME,
+        backend_version(),
+        rate=rate_wpm,
+        voice_id=voice_name if voice_name and voice_name != "Default (system)" else None,
+        suffix=output_path.suffix,
+    )
 
-    if voice_name and voice_name != "Default (system)":
-        cmd += ["-v", voice_name]
 
-    if rate_wpm:
-        cmd += ["-r", str(rate_wpm)]
+def say_to_file(
+    text: str,
+    output_path: Path,
+    voice_name: str | None = None,
+    rate_wpm: int | None = None,
+    cache: RenderCache | None = None,
+    token: CancelToken | None = None,
+    timeout: float | None = None,
+    trace: Trace | None = None,
+) -> None:
+    """
+    Uses macOS 'say' to export speech audio to a file.
+    If a cache is given, identical renders are reused instead of re-synthesized.
+    'say' is killed if the token is cancelled or it runs past the timeout
+    (default: timeout_for_text), and the partial file is removed.
+    With a trace, the cache lookup, synthesis and cache store are timed as stages.
+    """
+    output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    cmd.append(text)
+    key = None
+    if cache is not None:
+        with stage(trace, "cache"):
+            key = say_cache_key(text, output_path, voice_name, rate_wpm)
+            hit = cache.fetch(key, output_path)
+        if hit:
+            return
+
+    cmd = say_command(text, output_path, voice_name, rate_wpm)
+
+    with stage(trace, "synthesis"):
+        run_process(cmd, token=token, timeout=timeout or timeout_for_text(text), partial_output=output_path)
+
+    if cache is not None and key is not None:
+        with stage(trace, "cache_store"):
+            cache.store(key, output_path)
+
+def say_now(
+    text: str,
+    voice_name: str | None = None,
+    rate_wpm: int | None = None,
+    token: CancelToken | None = None,
+    timeout: float | None = None,
+    trace: Trace | None = None,
+) -> None:
+    """
+    Uses macOS 'say' to speak text immediately.
+    Speech stops as soon as the token is cancelled or the timeout passes.
+    """
+    cmd = say_command(text, None, voice_name, rate_wpm)
 
-    subprocess.run(cmd, check=True)
+    with stage(trace, "speech"):
+        run_process(cmd, token=token, timeout=timeout or timeout_for_text(text))
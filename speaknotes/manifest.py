@@ -0,0 +1,150 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Optional
+
+
+# Anchored to the app root, so a resumed export finds its manifest whatever the working directory.
+MANIFEST_DIR = Path(__file__).resolve().parent.parent / ".cache" / "bulk"
+
+
+def text_hash(text: str) -> str:
+    """
+    Short content hash used to recognise a chunk (or a whole source text).
+    """
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+
+
+def file_hash(file_path: Path, block_size: int = 1 << 20) -> str:
+    """
+    Content hash of a file, read in blocks so large sources never sit in memory.
+    """
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()[:32]
+
+
+def manifest_key(source_hash: str, settings: dict[str, Any]) -> str:
+    """
+    Identifies one bulk export: same source and same settings give the same manifest.
+    """
+    payload = json.dumps({"source": source_hash, "settings": settings}, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:20]
+
+
+class BulkManifest:
+    """
+    Append-only record of a bulk export's progress, so an interrupted export
+    can resume instead of starting over.
+
+    The first line holds the source hash and settings; each later line records
+    one finished part (its chunk hash, output file and size) once it has been
+    logged to history. A part counts as complete on resume only if its chunk
+    hash matches and the file is still there with the recorded size.
+    """
+
+    def __init__(self, path: Path, source_hash: str, settings: dict[str, Any], source_path: str = "") -> None:
+        self.path = path
+        self.source_hash = source_hash
+        self.settings = settings
+        self.source_path = source_path
+        self.parts: dict[int, dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def open(
+        cls,
+        source_hash: str,
+        settings: dict[str, Any],
+        source_path: str = "",
+        manifest_dir: Path = MANIFEST_DIR,
+    ) -> "BulkManifest":
+        """
+        Loads the manifest for this source and settings, or starts an empty one.
+        Nothing is written until the first part is recorded.
+        """
+        path = manifest_dir / f"{manifest_key(source_hash, settings)}.jsonl"
+        manifest = cls(path, source_hash, settings, source_path)
+        manifest._load()
+        return manifest
+
+    def _load(self) -> None:
+        try:
+            lines = self.path.read_bytes().splitlines()
+        except FileNotFoundError:
+            return
+        for line in lines:
+            try:
+                record = json.loads(line)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                continue  # torn last line from a crash (possibly mid-character)
+            if isinstance(record, dict) and "part" in record:
+                self.parts[int(record["part"])] = record
+
+    def _append(self, records: list[dict[str, Any]]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        payload = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, payload)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    # ---- Progress ----
+
+    def completed_count(self) -> int:
+        return len(self.parts)
+
+    def completed(self, part_index: int, chunk: str) -> Optional[Path]:
+        """
+        Returns the output file of a verified-complete part, or None if it must be rendered.
+        """
+        record = self.parts.get(part_index)
+        if record is None or record.get("chunk") != text_hash(chunk):
+            return None
+        path = Path(record["file"])
+        try:
+            if path.stat().st_size != record.get("size"):
+                return None
+        except OSError:
+            return None
+        return path
+
+    def record(self, part_index: int, chunk: str, out_path: Path) -> None:
+        """
+        Marks a part as complete (call after its history entry is written).
+        """
+        record = {
+            "part": part_index,
+            "chunk": text_hash(chunk),
+            "file": str(out_path.resolve()),
+            "size": out_path.stat().st_size,
+            "done_at": datetime.now().isoformat(timespec="seconds"),
+        }
+        with self._lock:
+            records = [record]
+            if not self.path.exists():
+                records.insert(0, {
+                    "source_hash": self.source_hash,
+                    "source_path": self.source_path,
+                    "settings": self.settings,
+                    "created": record["done_at"],
+                })
+            self._append(records)
+            self.parts[part_index] = record
+
+    def discard(self) -> None:
+        """
+        Deletes the manifest (after the export finished, or to start over).
+        """
+        with self._lock:
+            self.path.unlink(missing_ok=True)
+            self.parts.clear()
@@ -0,0 +1,156 @@
+from __future__ import annotations
+
+import cProfile
+import io
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Optional, TypeVar
+
+
+TOP_FUNCTIONS = 30
+TOP_ALLOCATIONS = 15
+
+# cProfile and tracemalloc are process-wide tools: profile one job at a time.
+_active = threading.Lock()
+# The profiler of the job running on this thread, for profile_worker().
+_current = threading.local()
+
+T = TypeVar("T")
+
+
+class ProfilerBusy(RuntimeError):
+    """
+    Raised by Profiler.start() while another job is being profiled.
+    """
+
+
+def profile_worker(fn: Callable[..., T]) -> Callable[..., T]:
+    """
+    Call on a job's thread before handing fn to a worker pool: if the job is
+    being profiled, fn is profiled on the worker too. Otherwise returns fn.
+    """
+    profiler: Optional[Profiler] = getattr(_current, "profiler", None)
+    return profiler.wrap(fn) if profiler is not None else fn
+
+
+def report_path_for(output_path: Path) -> Path:
+    """
+    Returns the profile report that belongs next to an output file.
+    """
+    return output_path.with_name(output_path.name + ".profile.txt")
+
+
+class Profiler:
+    """
+    Runs one job under cProfile and tracemalloc and writes a plain-text report:
+    top functions by cumulative time, peak traced memory and top allocation sites.
+
+    The starting thread is profiled, and so is work the job hands to its own
+    worker threads through profile_worker() (e.g. the bulk export pool), so
+    time spent in workers is not lost as time spent waiting on them. Other
+    threads are left alone, and nothing stays profiled after stop().
+    """
+
+    def __init__(self, top_functions: int = TOP_FUNCTIONS, top_allocations: int = TOP_ALLOCATIONS) -> None:
+        self.top_functions = top_functions
+        self.top_allocations = top_allocations
+        self._profiles: list[cProfile.Profile] = []
+        self._threads: set[int] = set()
+        self._lock = threading.Lock()
+        self._running = False
+        self._started_tracing = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self.peak_bytes = 0
+        self.started_at = 0.0
+        self.seconds = 0.0
+
+    def __enter__(self) -> "Profiler":
+        self.start()
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        if not _active.acquire(blocking=False):
+            raise ProfilerBusy("Another job is already being profiled")
+        self._started_tracing = not tracemalloc.is_tracing()
+        if self._started_tracing:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        self.started_at = time.perf_counter()
+        profile = cProfile.Profile()
+        self._profiles.append(profile)
+        self._threads.add(threading.get_ident())
+        self._running = True
+        _current.profiler = self
+        profile.enable()
+
+    def wrap(self, fn: Callable[..., T]) -> Callable[..., T]:
+        """
+        Returns fn, profiled on whichever thread calls it while this profiler runs.
+        """
+        def run(*args: Any, **kwargs: Any) -> T:
+            if not self._running:
+                return fn(*args, **kwargs)
+            profile = cProfile.Profile()
+            try:
+                profile.enable()
+            except ValueError:
+                return fn(*args, **kwargs)  # this Python only allows one active profiler at a time
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                profile.disable()
+                with self._lock:
+                    self._profiles.append(profile)
+                    self._threads.add(threading.get_ident())
+
+        return run
+
+    def stop(self) -> None:
+        self._profiles[0].disable()
+        self.seconds = time.perf_counter() - self.started_at
+        self._running = False
+        _current.profiler = None
+        _, self.peak_bytes = tracemalloc.get_traced_memory()
+        self._snapshot = tracemalloc.take_snapshot()
+        if self._started_tracing:
+            tracemalloc.stop()
+        _active.release()
+
+    def report(self, title: str = "") -> str:
+        """
+        Returns the report text (call after stop()).
+        """
+        import pstats  # only needed for the report; slow to import
+
+        out = io.StringIO()
+        out.write(f"SpeakNotes profile{': ' + title if title else ''}\n")
+        out.write(f"Created: {datetime.now().isoformat(timespec='seconds')}\n")
+        out.write(f"Wall time: {self.seconds:.3f}s across {len(self._threads)} thread(s)\n")
+        out.write(f"Peak traced memory: {self.peak_bytes / (1024 * 1024):.2f} MB\n\n")
+
+        out.write(f"== Top {self.top_functions} functions by cumulative time ==\n")
+        with self._lock:
+            profiles = list(self._profiles)
+        stats = pstats.Stats(profiles[0], stream=out)
+        for profile in profiles[1:]:
+            stats.add(profile)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(self.top_functions)
+
+        out.write(f"== Top {self.top_allocations} allocation sites (still allocated at the end) ==\n")
+        if self._snapshot is not None:
+            snapshot = self._snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),))
+            for stat in snapshot.statistics("lineno")[: self.top_allocations]:
+                frame = stat.traceback[0]
+                out.write(f"{stat.size / 1024:10.1f} KiB  {stat.count:7d} blocks  {frame.filename}:{frame.lineno}\n")
+        return out.getvalue()
+
+    def write_report(self, path: Path, title: str = "") -> Path:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.report(title), encoding="utf-8")
+        return path
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Any
+
+
+# Anchored to the app root, not the working directory, so the GUI, CLI, batch runs and server share one cache.
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache" / "renders"
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024  # 512 MB of rendered audio
+
+
+def normalize_text(text: str) -> str:
+    """
+    Normalizes text so that cosmetic differences (line endings, trailing spaces,
+    Unicode composition) do not produce different cache keys.
+    """
+    text = unicodedata.normalize("NFC", text)
+    text = text.replace("\r\n", "\n").replace("\r", "\n")
+    lines = [line.rstrip() for line in text.split("\n")]
+    return "\n".join(lines).strip()
+
+
+def make_cache_key(
+    text: str,
+    backend: str,
+    backend_version: str,
+    rate: Any = None,
+    volume: Any = None,
+    voice_id: Any = None,
+    suffix: str = ".aiff",
+) -> str:
+    """
+    Builds a stable hash for one render request.
+    Any change in text, settings, backend or output format gives a new key.
+    """
+    payload = {
+        "text": normalize_text(text),
+        "backend": backend,
+        "backend_version": backend_version,
+        "rate": rate,
+        "volume": volume,
+        "voice_id": voice_id,
+        "suffix": suffix.lower(),
+    }
+    blob = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()
+
+
+def link_or_copy(src: Path, dst: Path, allow_link: bool = True) -> None:
+    """
+    Materialises src at dst, using a hard link when possible and a copy otherwise.
+    An existing dst is replaced atomically.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.{threading.get_ident()}.tmp")
+    if tmp.exists():
+        tmp.unlink()
+    try:
+        if not allow_link:
+            raise OSError("linking disabled")
+        os.link(src, tmp)
+    except OSError:
+        shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
+
+
+class RenderCache:
+    """
+    Content-addressed, size-bounded cache of rendered audio files.
+    Entries are evicted least-recently-used first once max_bytes is exceeded.
+    """
+
+    def __init__(self, cache_dir: Path = CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES) -> None:
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _entry_path(self, key: str, suffix: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}{suffix}"
+
+    def fetch(self, key: str, output_path: Path) -> bool:
+        """
+        Copies or hard-links a cached render to output_path.
+        Returns True on a hit, False on a miss (any stale output_path is removed so
+        the engine never writes through a hard link into the cache).
+        """
+        entry = self._entry_path(key, output_path.suffix)
+        if not entry.exists():
+            output_path.unlink(missing_ok=True)
+            with self._lock:
+                self.misses += 1
+            return False
+
+        link_or_copy(entry, output_path)
+        try:
+            os.utime(entry)  # refresh recency for LRU
+        except OSError:
+            pass
+
+        with self._lock:
+            self.hits += 1
+        return True
+
+    def store(self, key: str, rendered_path: Path) -> None:
+        """
+        Adds a freshly rendered file to the cache, then evicts old entries if needed.
+        """
+        if not rendered_path.exists():
+            return
+        # Copy (never link) into the cache so later writes to the output can't corrupt it.
+        link_or_copy(rendered_path, self._entry_path(key, rendered_path.suffix), allow_link=False)
+        self.evict()
+
+    def evict(self) -> int:
+        """
+        Removes least-recently-used entries until the cache fits in max_bytes.
+        Returns the number of removed entries.
+        """
+        with self._lock:
+            entries = []
+            total = 0
+            for path in self.cache_dir.glob("*/*"):
+                if path.name.startswith("."):
+                    continue
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+            removed = 0
+            entries.sort()
+            for _mtime, size, path in entries:
+                if total <= self.max_bytes:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            return removed
+
+    def clear(self) -> None:
+        """
+        Deletes every cached render and resets the counters.
+        """
+        with self._lock:
+            shutil.rmtree(self.cache_dir, ignore_errors=True)
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the hit/miss counters for this cache instance.
+        """
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
@@ -0,0 +1,372 @@
+from __future__ import annotations
+
+import hashlib
+import ipaddress
+import json
+import os
+import sys
+import threading
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from .history_utils import append_history, count_history, create_entry, query_history
+from .presets import PRESETS
+from .render_cache import RenderCache, normalize_text
+from .stitch import iter_wav_frames, read_params, wav_header
+from .text_utils import iter_chunks
+from .tts import TTSSettings
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_WORKERS = 2
+MAX_PENDING = 64          # distinct renders queued or running before new ones get 503
+MAX_BODY_BYTES = 1 << 20  # largest accepted request body
+STREAM_PREFETCH = 2       # chunks rendered ahead of the one being sent
+STREAM_MIN_CHARS = 40
+STREAM_MAX_CHARS = 400
+
+
+class ServerBusy(RuntimeError):
+    """
+    Raised when the render queue is full; answered with 503.
+    """
+
+
+class RequestError(ValueError):
+    """
+    Raised for a malformed request; answered with 400.
+    """
+
+
+class Coalescer:
+    """
+    Runs renders on a bounded pool, sharing one render between identical
+    requests that arrive while it is still in flight.
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_WORKERS, max_pending: int = MAX_PENDING) -> None:
+        self.max_pending = max_pending
+        self._pool = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="speaknotes-server")
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        self.renders = 0
+        self.coalesced = 0
+
+    def submit(self, key: str, fn: Callable[[], Path]) -> tuple[Future, bool]:
+        """
+        Returns (future, joined): joined is True if an identical render was
+        already running and its future is shared instead of starting another.
+        """
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, True
+            if len(self._in_flight) >= self.max_pending:
+                raise ServerBusy(f"{len(self._in_flight)} renders pending; try again later")
+            future = self._pool.submit(fn)
+            self._in_flight[key] = future
+            self.renders += 1
+        future.add_done_callback(lambda f: self._forget(key, f))
+        return future, False
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
+
+    def shutdown(self) -> None:
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+
+class SpeakNotesService:
+    """
+    The server's state: settings parsing, the render pool and where audio goes.
+    Kept apart from the HTTP handler so it can be driven directly.
+    """
+
+    def __init__(
+        self,
+        out_dir: Path = Path("outputs") / "server",
+        workers: int = DEFAULT_WORKERS,
+        use_cache: bool = True,
+        record_history: bool = True,
+    ) -> None:
+        self.out_dir = out_dir
+        self.cache = RenderCache() if use_cache else None
+        self.record_history = record_history
+        self.coalescer = Coalescer(max_workers=workers)
+        self.suffix = ".aiff" if sys.platform == "darwin" else ".wav"
+        self._logged: weakref.WeakSet[Future] = weakref.WeakSet()  # renders that will write a history entry
+        self._log_lock = threading.Lock()
+
+    # ---- Requests ----
+
+    def settings_for(self, request: dict[str, Any]) -> TTSSettings:
+        """
+        Builds settings from a preset plus optional rate/volume/voice overrides.
+        """
+        preset_key = str(request.get("preset", "study")).lower()
+        if preset_key not in PRESETS:
+            raise RequestError(f"Unknown preset: {preset_key}")
+        preset = PRESETS[preset_key]
+        voice = request.get("voice") or None
+        try:
+            return TTSSettings(
+                rate=int(request.get("rate", preset.rate)),
+                volume=float(request.get("volume", preset.volume)),
+                voice_id=None if voice == "Default (system)" else voice,
+            )
+        except (TypeError, ValueError) as e:
+            raise RequestError(f"Invalid settings: {e}") from e
+
+    def render_key(self, text: str, settings: TTSSettings) -> str:
+        payload = json.dumps({"text": normalize_text(text), "settings": settings.as_dict()}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def _render(self, text: str, out_path: Path, settings: TTSSettings) -> Path:
+        if sys.platform == "darwin":
+            from .macos_say import say_to_file
+            say_to_file(text=text, output_path=out_path, voice_name=settings.voice_id, rate_wpm=settings.rate, cache=self.cache)
+        else:
+            from .engine_worker import get_engine_worker
+            from .tts import synthesize_to_file
+            synthesize_to_file(text=text, output_path=out_path, settings=settings, cache=self.cache, worker=get_engine_worker())
+        return out_path
+
+    def synthesize(self, text: str, settings: TTSSettings, log: bool = True) -> tuple[Future, bool]:
+        """
+        Queues a render (or joins an identical one in flight) and returns (future, joined).
+        Output files are named by render key, so a repeat simply replaces the file.
+        A render gets one history entry if any request sharing it asked for one
+        (log=True), whether that request started it or joined it.
+        """
+        key = self.render_key(text, settings)
+        out_path = self.out_dir / f"{key[:24]}{self.suffix}"
+
+        def run() -> Path:
+            # Render beside the target and swap it in, so a reader of the previous file never sees a partial one.
+            tmp = out_path.with_name(f".{out_path.stem}.{threading.get_ident()}{self.suffix}")
+            try:
+                self._render(text, tmp, settings)
+                os.replace(tmp, out_path)
+            finally:
+                tmp.unlink(missing_ok=True)
+            return out_path
+
+        future, joined = self.coalescer.submit(key, run)
+        if log and self.record_history:
+            with self._log_lock:
+                first = future not in self._logged
+                self._logged.add(future)
+            if first:
+                future.add_done_callback(lambda f: self._log(f, text, settings))
+        return future, joined
+
+    def _log(self, future: Future, text: str, settings: TTSSettings) -> None:
+        if not future.cancelled() and future.exception() is None:
+            append_history(create_entry(future.result(), settings, "server", text, "server"))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "status": "ok",
+            "pending": self.coalescer.pending(),
+            "renders": self.coalescer.renders,
+            "coalesced": self.coalescer.coalesced,
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "SpeakNotes"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def service(self) -> SpeakNotesService:
+        return self.server.service  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if not self.server.quiet:  # type: ignore[attr-defined]
+            super().log_message(format, *args)
+
+    # ---- Responses ----
+
+    def _send_json(self, payload: Any, status: int = 200) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _send_error(self, status: int, message: str) -> None:
+        self._send_json({"error": message}, status)
+
+    def _send_chunk(self, data: bytes) -> None:
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+
+    # ---- Routes ----
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            if url.path == "/health":
+                self._send_json(self.service.stats())
+            elif url.path == "/presets":
+                self._send_json({name: s.as_dict() for name, s in PRESETS.items()})
+            elif url.path == "/voices":
+                from .engine_worker import get_engine_worker
+                from .voice_cache import get_voices
+                self._send_json([{"id": vid, "name": name} for vid, name in get_voices(worker=get_engine_worker())])
+            elif url.path == "/history":
+                search = query.get("search", "")
+                limit = min(int(query.get("limit", 50)), 500)
+                offset = int(query.get("offset", 0))
+                self._send_json({
+                    "total": count_history(search=search),
+                    "entries": query_history(search=search, limit=limit, offset=offset),
+                })
+            else:
+                self._send_error(404, f"Not found: {url.path}")
+        except ValueError as e:
+            self._send_error(400, str(e))
+        except Exception as e:
+            self._send_error(500, str(e) or type(e).__name__)
+
+    def do_POST(self) -> None:
+        url = urlparse(self.path)
+        if url.path != "/synthesize":
+            self._send_error(404, f"Not found: {url.path}")
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            if length > MAX_BODY_BYTES:
+                raise RequestError(f"Request body over {MAX_BODY_BYTES} bytes")
+            try:
+                request = json.loads(self.rfile.read(length) or b"{}")
+            except json.JSONDecodeError as e:
+                raise RequestError(f"Invalid JSON: {e}") from e
+            text = str(request.get("text", "")).strip()
+            if not text:
+                raise RequestError("'text' is required")
+            settings = self.service.settings_for(request)
+
+            if request.get("stream"):
+                self._stream(text, settings)
+                return
+
+            future, joined = self.service.synthesize(text, settings)
+            out_path = future.result()
+            body = out_path.read_bytes()
+            self.send_response(200)
+            self.send_header("Content-Type", "audio/aiff" if out_path.suffix == ".aiff" else "audio/wav")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("X-SpeakNotes-Coalesced", "1" if joined else "0")
+            self.end_headers()
+            self.wfile.write(body)
+        except RequestError as e:
+            self._send_error(400, str(e))
+        except ServerBusy as e:
+            self._send_error(503, str(e))
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+        except Exception as e:
+            self._send_error(500, str(e) or type(e).__name__)
+
+    def _stream(self, text: str, settings: TTSSettings) -> None:
+        """
+        Sends a WAV stream: the header as soon as the first chunk is rendered,
+        then each chunk's PCM frames while the next chunks render.
+        """
+        chunks = iter_chunks(text, min_chars=STREAM_MIN_CHARS, max_chars=STREAM_MAX_CHARS)
+        ahead: list[Future] = []
+
+        def fill() -> None:
+            while len(ahead) <= STREAM_PREFETCH:
+                chunk = next(chunks, None)
+                if chunk is None:
+                    return
+                ahead.append(self.service.synthesize(chunk, settings, log=False)[0])
+
+        fill()
+        # Errors before the first byte still get a proper status code.
+        first = ahead[0].result()
+        params = read_params(first)
+        self.send_response(200)
+        self.send_header("Content-Type", "audio/wav")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._send_chunk(wav_header(*params[:3]))
+        try:
+            while ahead:
+                path = ahead.pop(0).result()
+                fill()
+                if read_params(path)[:3] != params[:3]:
+                    raise RequestError(f"{path.name} has a different audio format than the first chunk")
+                for block in iter_wav_frames(path):
+                    self._send_chunk(block)
+            self.wfile.write(b"0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # client went away; renders already queued finish and stay cached
+        except Exception as e:
+            # Headers are gone: all we can do is end the stream without the terminating chunk.
+            self.log_error("stream aborted: %s", e)
+            self.close_connection = True
+
+
+def _check_local(host: str) -> None:
+    if host == "localhost":
+        return
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+    raise ValueError(f"The server only listens on localhost, not {host!r}")
+
+
+def make_server(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    service: Optional[SpeakNotesService] = None,
+    quiet: bool = False,
+) -> ThreadingHTTPServer:
+    """
+    Creates (but does not start) the HTTP server. Only loopback addresses are accepted.
+    """
+    _check_local(host)
+    httpd = ThreadingHTTPServer((host, port), _Handler)
+    httpd.daemon_threads = True
+    httpd.service = service or SpeakNotesService()  # type: ignore[attr-defined]
+    httpd.quiet = quiet  # type: ignore[attr-defined]
+    return httpd
+
+
+def serve(
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    workers: int = DEFAULT_WORKERS,
+    out_dir: Path = Path("outputs") / "server",
+    use_cache: bool = True,
+) -> None:
+    """
+    Runs the server until interrupted.
+    """
+    service = SpeakNotesService(out_dir=out_dir, workers=workers, use_cache=use_cache)
+    httpd = make_server(host, port, service)
+    print(f"[SpeakNotes] Serving on http://{host}:{httpd.server_address[1]} with {workers} worker(s)")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        httpd.server_close()
+        service.coalescer.shutdown()
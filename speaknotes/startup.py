@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import sys
+import time
+from typing import TextIO
+
+
+class StartupTimer:
+    """
+    Records named checkpoints during startup and prints a breakdown
+    (used by the --startup-profile flag of gui.py and main.py).
+    """
+
+    def __init__(self, started_at: float | None = None) -> None:
+        self.started_at = time.perf_counter() if started_at is None else started_at
+        self.marks: list[tuple[str, float]] = []
+
+    def mark(self, name: str) -> None:
+        self.marks.append((name, time.perf_counter()))
+
+    def report(self) -> dict[str, float]:
+        """
+        Returns {checkpoint: milliseconds since the previous checkpoint} plus a total.
+        """
+        result: dict[str, float] = {}
+        previous = self.started_at
+        for name, t in self.marks:
+            result[name] = round((t - previous) * 1000, 1)
+            previous = t
+        result["total"] = round((previous - self.started_at) * 1000, 1)
+        return result
+
+    def print_report(self, stream: TextIO = sys.stderr) -> None:
+        print("[SpeakNotes] Startup profile (ms):", file=stream)
+        for name, ms in self.report().items():
+            print(f"  {name:<12} {ms:>8.1f}", file=stream)
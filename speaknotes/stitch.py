@@ -0,0 +1,215 @@
+from __future__ import annotations
+
+import json
+import os
+import struct
+import warnings
+import wave
+from array import array
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+# aifc is deprecated since Python 3.11 and removed in 3.13; without it only WAV parts can be stitched.
+with warnings.catch_warnings():
+    warnings.simplefilter("ignore", DeprecationWarning)
+    try:
+        import aifc
+    except ImportError:
+        aifc = None
+
+
+AIFF_SUFFIXES = (".aiff", ".aif", ".aifc")
+FRAMES_PER_COPY = 64 * 1024  # frames moved per read/write; bounds memory per part
+
+
+class StitchError(ValueError):
+    """
+    Raised when parts cannot be combined (unsupported or mismatched formats).
+    """
+
+
+def _open(path: Path, mode: str) -> Any:
+    """
+    Opens an audio file with the stdlib module matching its suffix.
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".wav":
+        return wave.open(str(path), mode)
+    if suffix in AIFF_SUFFIXES:
+        if aifc is None:
+            raise StitchError("AIFF files need the 'aifc' module, which this Python version no longer ships")
+        return aifc.open(str(path), mode)
+    raise StitchError(f"Unsupported audio format: {path.suffix or path.name}")
+
+
+def _is_little_endian(path: Path) -> bool:
+    # wave stores little-endian PCM; aifc always hands out (and takes) big-endian frames.
+    return path.suffix.lower() == ".wav"
+
+
+def _convert(frames: bytes, sampwidth: int, swap: bool, flip_sign: bool) -> bytes:
+    """
+    Converts PCM between WAV and AIFF conventions: byte order for 16/24/32-bit
+    samples, signedness for 8-bit samples.
+    """
+    if flip_sign:
+        return bytes((b + 128) & 0xFF for b in frames)
+    if not swap:
+        return frames
+    if sampwidth in (2, 4):
+        samples = array("h" if sampwidth == 2 else "i", frames)
+        samples.byteswap()
+        return samples.tobytes()
+    if sampwidth == 3:
+        swapped = bytearray(len(frames))
+        swapped[0::3], swapped[1::3], swapped[2::3] = frames[2::3], frames[1::3], frames[0::3]
+        return bytes(swapped)
+    return frames
+
+
+def read_params(path: Path) -> tuple[int, int, int, int]:
+    """
+    Returns (nchannels, sampwidth, framerate, nframes) of a WAV or AIFF file.
+    """
+    with _open(path, "rb") as reader:
+        params = reader.getparams()
+    return params.nchannels, params.sampwidth, params.framerate, params.nframes
+
+
+def iter_wav_frames(path: Path) -> Iterator[bytes]:
+    """
+    Yields the PCM frames of a WAV or AIFF file in blocks, converted to WAV
+    conventions (little-endian; unsigned 8-bit), ready to follow a wav_header.
+    """
+    in_wav = _is_little_endian(path)
+    with _open(path, "rb") as reader:
+        sampwidth = reader.getsampwidth()
+        swap = not in_wav and sampwidth > 1
+        flip_sign = not in_wav and sampwidth == 1
+        while True:
+            block = reader.readframes(FRAMES_PER_COPY)
+            if not block:
+                break
+            yield _convert(block, sampwidth, swap, flip_sign)
+
+
+def wav_header(nchannels: int, sampwidth: int, framerate: int, nframes: Optional[int] = None) -> bytes:
+    """
+    Builds a 44-byte PCM WAV header. With nframes=None the sizes are set to the
+    maximum, the usual convention for a stream whose length is not known yet.
+    """
+    data_size = 0xFFFFFFFF - 36 if nframes is None else nframes * nchannels * sampwidth
+    block_align = nchannels * sampwidth
+    return (
+        b"RIFF" + struct.pack("<I", min(0xFFFFFFFF, 36 + data_size)) + b"WAVE"
+        + b"fmt " + struct.pack("<IHHIIHH", 16, 1, nchannels, framerate, framerate * block_align, block_align, sampwidth * 8)
+        + b"data" + struct.pack("<I", data_size)
+    )
+
+
+def chapters_path(output_path: Path) -> Path:
+    """
+    Returns the sidecar file that lists the part markers of a combined file.
+    """
+    return output_path.with_name(output_path.name + ".chapters.json")
+
+
+def stitch_parts(
+    part_paths: list[Path],
+    output_path: Path,
+    gap_seconds: float = 0.5,
+    labels: Optional[list[str]] = None,
+    chapters: bool = True,
+) -> list[dict[str, Any]]:
+    """
+    Concatenates already-rendered parts into one audio file without re-running the engine.
+
+    Audio is copied in blocks through the stdlib wave/aifc readers, so memory use
+    does not grow with the length of the book. gap_seconds of silence go between
+    parts. Each part start is recorded as a marker: in the file itself for AIFF
+    outputs, and in a JSON sidecar (see chapters_path) unless chapters is False.
+    Returns the markers.
+    """
+    if not part_paths:
+        raise StitchError("No parts to combine")
+    labels = labels or [f"Part {i}" for i in range(1, len(part_paths) + 1)]
+
+    # Check every part up front so a mismatch fails before anything is written.
+    params = None
+    part_frames: list[int] = []
+    for path in part_paths:
+        with _open(path, "rb") as reader:
+            current = reader.getparams()
+            if params is None:
+                params = current
+            elif current[:3] != params[:3]:
+                raise StitchError(
+                    f"{path.name} has a different format ({current.nchannels} ch, {current.sampwidth * 8}-bit, "
+                    f"{current.framerate} Hz) than the first part"
+                )
+            part_frames.append(current.nframes)
+
+    nchannels, sampwidth, framerate = params.nchannels, params.sampwidth, params.framerate
+    gap_frames = max(0, int(round(gap_seconds * framerate)))
+    total_frames = sum(part_frames) + gap_frames * (len(part_paths) - 1)
+
+    out_wav = _is_little_endian(output_path)
+    silence_sample = b"\x80" if (out_wav and sampwidth == 1) else b"\x00" * sampwidth
+    silence = silence_sample * nchannels * min(gap_frames, FRAMES_PER_COPY)
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = output_path.with_name(f".{output_path.stem}.stitch-tmp{output_path.suffix}")
+    markers: list[dict[str, Any]] = []
+    try:
+        writer = _open(tmp, "wb")
+        try:
+            writer.setnchannels(nchannels)
+            writer.setsampwidth(sampwidth)
+            writer.setframerate(framerate)
+            writer.setnframes(total_frames)
+
+            position = 0
+            for index, (path, frames) in enumerate(zip(part_paths, part_frames)):
+                if index and gap_frames:
+                    remaining = gap_frames
+                    while remaining > 0:
+                        step = min(remaining, FRAMES_PER_COPY)
+                        writer.writeframesraw(silence[:step * nchannels * sampwidth])
+                        remaining -= step
+                    position += gap_frames
+
+                markers.append({
+                    "part": index + 1,
+                    "label": labels[index],
+                    "file": str(path),
+                    "start_frame": position,
+                    "start_seconds": round(position / framerate, 3),
+                    "duration_seconds": round(frames / framerate, 3),
+                })
+                if chapters and not out_wav:
+                    writer.setmark(index + 1, position, labels[index].encode("utf-8", "replace")[:255])
+
+                in_wav = _is_little_endian(path)
+                swap = in_wav != out_wav and sampwidth > 1
+                flip_sign = in_wav != out_wav and sampwidth == 1
+                with _open(path, "rb") as reader:
+                    while True:
+                        block = reader.readframes(FRAMES_PER_COPY)
+                        if not block:
+                            break
+                        writer.writeframesraw(_convert(block, sampwidth, swap, flip_sign))
+                position += frames
+        finally:
+            writer.close()
+        os.replace(tmp, output_path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+    if chapters:
+        chapters_path(output_path).write_text(
+            json.dumps({"file": output_path.name, "framerate": framerate, "gap_seconds": gap_seconds, "markers": markers}, indent=2),
+            encoding="utf-8",
+        )
+    return markers
+
@@ -0,0 +1,242 @@
+from __future__ import annotations
+
+import queue
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+from .cancel import CancelToken, JobCancelled
+from .text_utils import iter_chunks
+
+
+POLL_INTERVAL = 0.05
+
+# Preview chunks stay short so the first one renders quickly; tiny sentences are still merged.
+PREVIEW_MIN_CHARS = 20
+PREVIEW_MAX_CHARS = 200
+
+# on_event(kind, info) — kinds: "first_audio", "chunk", "done". Called from the player thread.
+EventFn = Callable[[str, dict[str, Any]], None]
+
+
+class StreamingPreview:
+    """
+    Speaks text in short sentence-aligned chunks so audio starts after the
+    first chunk instead of after the whole document.
+
+    On macOS, chunk N+1 is rendered with 'say -o' while chunk N plays through
+    'afplay', so the engine and the speakers work in parallel. Elsewhere each
+    chunk is spoken by the pyttsx3 engine worker in turn.
+    Playback can be stopped or the current chunk skipped at any point.
+    """
+
+    def __init__(
+        self,
+        text: str,
+        voice_name: str | None = None,
+        rate_wpm: int | None = None,
+        settings: Any = None,
+        worker: Any = None,
+        prefetch: int = 2,
+        on_event: Optional[EventFn] = None,
+    ) -> None:
+        self.chunks = list(iter_chunks(text, min_chars=PREVIEW_MIN_CHARS, max_chars=PREVIEW_MAX_CHARS))
+        self.voice_name = voice_name
+        self.rate_wpm = rate_wpm
+        self.settings = settings
+        self.worker = worker
+        self.prefetch = max(1, prefetch)
+        self.on_event = on_event
+
+        self.started_at: float | None = None
+        self.first_audio_at: float | None = None
+        self.finished_at: float | None = None
+        self.chunks_played = 0
+        self.chunks_skipped = 0
+        self.error: BaseException | None = None
+
+        self._stop = threading.Event()
+        self._skip = threading.Event()
+        self._done = threading.Event()
+        self._token = CancelToken()  # cancelled by stop(): kills an in-flight render
+        self._chunk_token: CancelToken | None = None  # cancelled by skip() in engine mode
+        self._player: subprocess.Popen | None = None
+        self._thread: threading.Thread | None = None
+
+    # ---- Control ----
+
+    def start(self) -> "StreamingPreview":
+        """
+        Starts playback in the background and returns immediately.
+        """
+        self.started_at = time.perf_counter()
+        target = self._run_pipelined if sys.platform == "darwin" else self._run_engine
+        self._thread = threading.Thread(target=self._guarded, args=(target,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """
+        Stops playback right away; nothing else is spoken.
+        """
+        self._stop.set()
+        self._token.cancel("Preview stopped")
+        self._interrupt_current()
+
+    def skip(self) -> None:
+        """
+        Cuts the current chunk short and moves on to the next one.
+        """
+        self._skip.set()
+        self._interrupt_current()
+
+    def wait(self, timeout: float | None = None) -> bool:
+        """
+        Blocks until playback ends. Re-raises any engine error.
+        Returns False if the timeout expired first.
+        """
+        finished = self._done.wait(timeout)
+        if finished and self.error is not None:
+            raise self.error
+        return finished
+
+    @property
+    def stopped(self) -> bool:
+        return self._stop.is_set()
+
+    def metrics(self) -> dict[str, Any]:
+        """
+        Returns timing figures for this run (seconds, None if not reached yet).
+        """
+        def since_start(t: float | None) -> float | None:
+            if t is None or self.started_at is None:
+                return None
+            return round(t - self.started_at, 3)
+
+        return {
+            "chunks": len(self.chunks),
+            "chunks_played": self.chunks_played,
+            "chunks_skipped": self.chunks_skipped,
+            "time_to_first_audio": since_start(self.first_audio_at),
+            "total_time": since_start(self.finished_at),
+            "stopped": self.stopped,
+        }
+
+    # ---- Internals ----
+
+    def _emit(self, kind: str, **info: Any) -> None:
+        if self.on_event:
+            self.on_event(kind, info)
+
+    def _mark_playing(self, index: int) -> None:
+        if self.first_audio_at is None:
+            self.first_audio_at = time.perf_counter()
+            self._emit("first_audio", time_to_first_audio=self.metrics()["time_to_first_audio"])
+        self._emit("chunk", index=index + 1, total=len(self.chunks))
+
+    def _interrupt_current(self) -> None:
+        player = self._player
+        if player is not None and player.poll() is None:
+            player.kill()
+        chunk_token = self._chunk_token
+        if chunk_token is not None:
+            chunk_token.cancel("Skipped")
+
+    def _guarded(self, target: Callable[[], None]) -> None:
+        try:
+            target()
+        except BaseException as e:
+            if not self.stopped:
+                self.error = e
+        finally:
+            self.finished_at = time.perf_counter()
+            self._emit("done", **self.metrics())
+            self._done.set()
+
+    def _run_pipelined(self) -> None:
+        from .macos_say import say_to_file
+
+        ready: "queue.Queue[tuple[int, Path] | BaseException | None]" = queue.Queue(maxsize=self.prefetch)
+        abort = threading.Event()  # tells the producer the player has gone away
+
+        with tempfile.TemporaryDirectory(prefix="speaknotes-preview-") as tmp:
+            def offer(item: Any) -> None:
+                while not (self.stopped or abort.is_set()):
+                    try:
+                        ready.put(item, timeout=POLL_INTERVAL)
+                        return
+                    except queue.Full:
+                        continue
+
+            def produce() -> None:
+                try:
+                    for i, chunk in enumerate(self.chunks):
+                        if self.stopped or abort.is_set():
+                            break
+                        path = Path(tmp) / f"chunk-{i:05d}.aiff"
+                        say_to_file(text=chunk, output_path=path, voice_name=self.voice_name, rate_wpm=self.rate_wpm, token=self._token)
+                        offer((i, path))
+                except BaseException as e:
+                    offer(e)
+                    return
+                offer(None)
+
+            producer = threading.Thread(target=produce, daemon=True)
+            producer.start()
+
+            try:
+                while not self.stopped:
+                    try:
+                        item = ready.get(timeout=POLL_INTERVAL)
+                    except queue.Empty:
+                        continue
+                    if item is None:
+                        break
+                    if isinstance(item, BaseException):
+                        raise item
+
+                    index, path = item
+                    self._skip.clear()
+                    self._player = subprocess.Popen(["afplay", str(path)])
+                    self._mark_playing(index)
+                    while self._player.poll() is None:
+                        if self.stopped or self._skip.is_set():
+                            self._player.kill()
+                            break
+                        time.sleep(POLL_INTERVAL)
+                    self._player.wait()
+                    self._count(index)
+            finally:
+                abort.set()
+                producer.join()
+
+    def _run_engine(self) -> None:
+        from .tts import TTSSettings, speak_now
+
+        settings = self.settings or TTSSettings()
+        for index, chunk in enumerate(self.chunks):
+            if self.stopped:
+                break
+            self._skip.clear()
+            self._chunk_token = CancelToken()
+            self._mark_playing(index)
+            try:
+                speak_now(text=chunk, settings=settings, worker=self.worker, token=self._chunk_token)
+            except JobCancelled:
+                pass  # stopped or skipped
+            except Exception:
+                if not (self.stopped or self._skip.is_set()):
+                    raise
+            finally:
+                self._chunk_token = None
+            self._count(index)
+
+    def _count(self, index: int) -> None:
+        if self._skip.is_set() and not self.stopped:
+            self.chunks_skipped += 1
+        elif not self.stopped:
+            self.chunks_played += 1
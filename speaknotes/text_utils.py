@@ -1,5 +1,37 @@
 from __future__ import annotations
 
+import re
+from typing import Iterable, Iterator
+
+
+# Words that end with a period without ending the sentence (compared lowercased, without the final '.').
+ABBREVIATIONS = {
+    "mr", "mrs", "ms", "dr", "prof", "sr", "jr", "st", "mt", "vs", "e.g", "i.e",
+}
+# Abbreviations that are also ordinary words ("no", "mar") or common sentence endings:
+# they only continue the sentence when a number follows, e.g. "No. 5", "p. 12", "Dec. 3".
+NUMBERED_ABBREVIATIONS = {
+    "no", "nos", "vol", "vols", "p", "pp", "ch", "sec", "fig", "figs", "approx", "est",
+    "jan", "feb", "mar", "apr", "jun", "jul", "aug", "sep", "sept", "oct", "nov", "dec",
+}
+
+# Sentence end: terminal punctuation (+ closing quotes/brackets) followed by whitespace,
+# or a blank line (paragraph break).
+_BOUNDARY = re.compile(r"([.!?…]+)([\"'”’)\]]*)(\s+)|\n[ \t]*\n\s*")
+_BLANK_LINE = re.compile(r"\n[ \t]*\n")
+_LAST_WORD = re.compile(r"(\S+)$")
+_BOUNDARY_CHARS = ".!?…\"'”’)]"  # everything a _BOUNDARY match can consist of, besides whitespace
+
+
+def safe_filename(base: str) -> str:
+    """
+    Converts a string into a short, filesystem-safe filename.
+    """
+    base = base.strip().lower()
+    base = "".join(ch for ch in base if ch.isalnum() or ch in (" ", "-", "_"))
+    base = base.replace(" ", "-")
+    return base[:40] or "note"
+
 
 def split_into_paragraphs(text: str) -> list[str]:
     """
@@ -9,3 +41,188 @@ def split_into_paragraphs(text: str) -> list[str]:
     normalized = text.replace("\r\n", "\n").replace("\r", "\n")
     chunks = [chunk.strip() for chunk in normalized.split("\n\n") if chunk.strip()]
     return chunks
+
+
+def _is_sentence_end(text: str, start: int, match: re.Match) -> bool:
+    """
+    Decides whether a punctuation match really ends a sentence
+    (abbreviations, initials and lowercase continuations do not).
+    """
+    if match.group(1) is None or _BLANK_LINE.search(match.group(3)):
+        return True  # paragraph break
+    if match.group(1) != ".":
+        return True
+
+    word = _LAST_WORD.search(text, start, match.start(1))
+    token = word.group(1).lstrip("\"'(“‘[") if word else ""
+    next_char = text[match.end():match.end() + 1]
+    if token.lower() in ABBREVIATIONS:
+        return False
+    if token.lower() in NUMBERED_ABBREVIATIONS and next_char.isdigit():
+        return False
+    if len(token) == 1 and token.isupper():
+        return False  # an initial, e.g. "J. R. R. Tolkien"
+
+    if next_char and next_char.islower():
+        return False
+    return True
+
+
+def _iter_sentence_spans(pieces: Iterable[str], hard_limit: int | None = None) -> Iterator[tuple[str, bool]]:
+    """
+    Yields (sentence, ends_paragraph) from a stream of text pieces, keeping only
+    the unfinished tail in memory. If hard_limit is set, a run of text with no
+    sentence end is cut once it grows past hard_limit characters, at the same
+    place _split_long would cut the finished sentence, so the result does not
+    depend on how the text was split into pieces.
+    """
+    buffer = ""
+    scan_from = 0
+
+    def cut_oversized() -> Iterator[tuple[str, bool]]:
+        nonlocal buffer, scan_from
+        while hard_limit and len(buffer.strip()) > hard_limit:
+            buffer = buffer.lstrip()
+            cut = _cut_point(buffer, hard_limit)
+            head, buffer = buffer[:cut + 1].strip(), buffer[cut + 1:]
+            scan_from = 0
+            if head:
+                yield head, False
+
+    def drain(final: bool) -> Iterator[tuple[str, bool]]:
+        nonlocal buffer, scan_from
+        start = 0
+        for match in _BOUNDARY.finditer(buffer, scan_from):
+            if not final and match.end() >= len(buffer):
+                break  # need to see what follows before deciding
+            if not _is_sentence_end(buffer, start, match):
+                continue
+            sentence = buffer[start:match.end(2) if match.group(1) else match.start()].strip()
+            if sentence:
+                yield sentence, match.group(1) is None or bool(_BLANK_LINE.search(match.group(3)))
+            start = match.end()
+        buffer = buffer[start:]
+        # Resume scanning where a boundary could still be forming: at the start of the trailing
+        # run of punctuation/whitespace. No match can span its left edge, so the matches found
+        # are the same as when scanning the whole text at once.
+        scan_from = len(buffer)
+        while scan_from and (buffer[scan_from - 1] in _BOUNDARY_CHARS or buffer[scan_from - 1].isspace()):
+            scan_from -= 1
+        yield from cut_oversized()
+
+    for piece in pieces:
+        if not piece:
+            continue
+        buffer += piece.replace("\r\n", "\n").replace("\r", "\n")
+        scan_from = 0 if scan_from > len(buffer) else scan_from
+        yield from drain(final=False)
+
+    yield from drain(final=True)
+    tail = buffer.strip()
+    if tail:
+        yield tail, True
+
+
+def iter_sentences(text: str | Iterable[str]) -> Iterator[str]:
+    """
+    Yields sentences one at a time. Abbreviations ("Dr.", "e.g."), initials and
+    decimals ("3.14") do not end a sentence; blank lines always do.
+    Accepts a whole string or an iterable of text pieces (e.g. a file read in blocks).
+    """
+    pieces = [text] if isinstance(text, str) else text
+    for sentence, _ in _iter_sentence_spans(pieces):
+        yield sentence
+
+
+def split_into_sentences(text: str) -> list[str]:
+    """
+    Splits text into sentences (see iter_sentences).
+    Empty sentences are removed.
+    """
+    return list(iter_sentences(text))
+
+
+def _cut_point(sentence: str, max_chars: int) -> int:
+    """
+    Index of the last character to keep when cutting a sentence longer than
+    max_chars: after a clause break (, ; :) in its first max_chars characters
+    if one is far enough in, else at a space, else after max_chars characters.
+    """
+    window = sentence[:max_chars]
+    cut = max(window.rfind(", "), window.rfind("; "), window.rfind(": "))
+    if cut < max_chars // 3:
+        cut = window.rfind(" ")
+    if cut <= 0:
+        cut = max_chars - 1
+    return cut
+
+
+def _split_long(sentence: str, max_chars: int) -> Iterator[str]:
+    """
+    Splits a sentence longer than max_chars at a clause break (, ; :) or space.
+    """
+    while len(sentence) > max_chars:
+        cut = _cut_point(sentence, max_chars)
+        yield sentence[:cut + 1].strip()
+        sentence = sentence[cut + 1:].strip()
+    if sentence:
+        yield sentence
+
+
+def iter_chunks(text: str | Iterable[str], min_chars: int = 40, max_chars: int = 1000) -> Iterator[str]:
+    """
+    Groups sentences into engine-sized chunks of at most max_chars characters.
+
+    Paragraph breaks end a chunk once it holds at least min_chars, so ordinary
+    paragraphs stay separate while runs of tiny lines get merged. A giant
+    paragraph is split between sentences (or inside an over-long sentence at a
+    clause break). A short final fragment is merged into the previous chunk.
+    Accepts a whole string or an iterable of text pieces.
+    """
+    if max_chars < 1 or min_chars > max_chars:
+        raise ValueError("Need 0 <= min_chars <= max_chars and max_chars >= 1")
+
+    pieces = [text] if isinstance(text, str) else text
+    parts: list[str] = []
+    size = 0
+    pending: str | None = None  # held back one step so a short tail can still merge into it
+
+    def take() -> str:
+        nonlocal parts, size
+        chunk = "".join(parts).strip()
+        parts, size = [], 0
+        return chunk
+
+    def add(piece: str, separator: str) -> None:
+        nonlocal size
+        if parts:
+            parts.append(separator)
+            size += len(separator)
+        parts.append(piece)
+        size += len(piece)
+
+    separator = " "
+    for sentence, ends_paragraph in _iter_sentence_spans(pieces, hard_limit=max_chars):
+        for piece in _split_long(sentence, max_chars):
+            if parts and size + len(separator) + len(piece) > max_chars:
+                if pending is not None:
+                    yield pending
+                pending = take()
+            add(piece, separator)
+            separator = " "
+
+        if ends_paragraph:
+            separator = "\n\n"
+            if size >= min_chars:
+                if pending is not None:
+                    yield pending
+                pending = take()
+
+    tail = take()
+    if tail and pending is not None and len(tail) < min_chars and len(pending) + 2 + len(tail) <= max_chars:
+        pending = f"{pending}\n\n{tail}"
+        tail = ""
+    if pending:
+        yield pending
+    if tail:
+        yield tail
@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from typing import Callable, ContextManager, Iterator, Optional
+
+
+# on_stage(name, seconds) — called as each stage ends, from whichever thread ran it.
+StageFn = Callable[[str, float], None]
+
+
+class Trace:
+    """
+    Per-stage wall-clock timings for one job (text prep, engine init, synthesis,
+    encoding, history...). A stage that runs several times, e.g. once per bulk
+    part, accumulates. Safe to share between worker threads.
+    """
+
+    def __init__(self, on_stage: Optional[StageFn] = None) -> None:
+        self.on_stage = on_stage
+        self.stages: dict[str, float] = {}
+        self.started_at = time.perf_counter()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """
+        Times the enclosed block as stage name (also when it raises).
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - started)
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+        if self.on_stage:
+            self.on_stage(name, seconds)
+
+    def as_dict(self) -> dict[str, float]:
+        """
+        Returns {stage: milliseconds} in the order stages first ran, plus the
+        total time since the trace was created (stored in history as "timings").
+        """
+        with self._lock:
+            result = {name: round(seconds * 1000, 1) for name, seconds in self.stages.items()}
+        result["total"] = round((time.perf_counter() - self.started_at) * 1000, 1)
+        return result
+
+    def summary(self) -> str:
+        """
+        One-line breakdown for the status bar, e.g. "synthesis 1.84s · history 3ms".
+        """
+        with self._lock:
+            items = list(self.stages.items())
+        return " · ".join(f"{name} {_format_seconds(seconds)}" for name, seconds in items)
+
+
+def _format_seconds(seconds: float) -> str:
+    return f"{seconds:.2f}s" if seconds >= 1 else f"{seconds * 1000:.0f}ms"
+
+
+def stage(trace: Optional[Trace], name: str) -> ContextManager[None]:
+    """
+    trace.stage(name), or a no-op when there is no trace.
+    """
+    return trace.stage(name) if trace is not None else nullcontext()
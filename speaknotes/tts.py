@@ -2,9 +2,18 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 
-import pyttsx3
+from .cancel import timeout_for_text
+from .render_cache import RenderCache, make_cache_key
+from .trace import stage
+
+if TYPE_CHECKING:
+    from .cancel import CancelToken
+    from .engine_worker import EngineWorker
+    from .trace import Trace
+
+BACKEND_NAME = "pyttsx3"
 
 
 @dataclass(frozen=True)
@@ -16,11 +25,23 @@ class TTSSettings:
     volume: float = 1.0       # Range: 0.0 to 1.0
     voice_id: Optional[str] = None  # If None, the system default voice is used
 
+    def as_dict(self) -> dict[str, object]:
+        """
+        Plain-dict form, used to send settings to the engine worker process.
+        """
+        return {"rate": self.rate, "volume": self.volume, "voice_id": self.voice_id}
+
 
-def list_voices() -> list[tuple[str, str]]:
+def list_voices(worker: EngineWorker | None = None) -> list[tuple[str, str]]:
     """
     Returns a list of available voices as (voice_id, human_readable_name).
+    If a worker is given, its warm engine is used instead of starting a new one.
     """
+    if worker is not None:
+        return worker.list_voices()
+
+    import pyttsx3  # deferred: loading the driver is slow and only needed without a worker
+
     engine = pyttsx3.init()
     voices = engine.getProperty("voices")
 
@@ -30,49 +51,138 @@ def list_voices() -> list[tuple[str, str]]:
         result.append((v.id, name))
     return result
 
-def speak_now(text: str, settings: TTSSettings = TTSSettings()) -> None:
+
+def backend_version() -> str:
+    """
+    Returns the installed pyttsx3 version (used to key the render cache).
+    """
+    try:
+        from importlib.metadata import version
+        return version("pyttsx3")
+    except Exception:
+        return "unknown"
+
+
+def speak_now(
+    text: str,
+    settings: TTSSettings = TTSSettings(),
+    worker: EngineWorker | None = None,
+    token: CancelToken | None = None,
+    timeout: float | None = None,
+    trace: Trace | None = None,
+) -> None:
     """
     Speaks the given text immediately (no file output).
+    If a worker is given, its warm engine is used instead of starting a new one,
+    and speech can be cut off with the token or by the timeout (default:
+    timeout_for_text). The in-process fallback can only be cancelled before it starts.
     """
-    engine = pyttsx3.init()
+    if token is not None:
+        token.check()
+    if worker is not None:
+        if not worker.is_alive():
+            with stage(trace, "engine_init"):
+                worker.start()
+        with stage(trace, "speech"):
+            worker.speak(text, settings.as_dict(), timeout=timeout or timeout_for_text(text), token=token)
+        return
+
+    with stage(trace, "engine_init"):
+        import pyttsx3  # deferred: loading the driver is slow and only needed without a worker
+
+        engine = pyttsx3.init()
 
-    engine.setProperty("rate", settings.rate)
-    engine.setProperty("volume", settings.volume)
-    if settings.voice_id:
-        engine.setProperty("voice", settings.voice_id)
+        engine.setProperty("rate", settings.rate)
+        engine.setProperty("volume", settings.volume)
+        if settings.voice_id:
+            engine.setProperty("voice", settings.voice_id)
 
-    engine.say(text)
-    engine.runAndWait()
-    engine.stop()
+    with stage(trace, "speech"):
+        engine.say(text)
+        engine.runAndWait()
+        engine.stop()
 
 
 def synthesize_to_file(
     text: str,
     output_path: Path,
     settings: TTSSettings = TTSSettings(),
+    cache: RenderCache | None = None,
+    worker: EngineWorker | None = None,
+    token: CancelToken | None = None,
+    timeout: float | None = None,
+    trace: Trace | None = None,
 ) -> Path:
     """
     Converts the given text into speech and saves it to output_path.
+    If a cache is given, identical renders are reused instead of re-synthesized.
+    If a worker is given, its warm engine is used instead of starting a new one;
+    the render is then stopped when the token is cancelled or the timeout
+    (default: timeout_for_text) passes, and the partial file is removed.
+    With a trace, cache lookup, engine init, synthesis and cache store are timed as stages.
     Returns the final output path.
     """
+    if token is not None:
+        token.check()
     output_path.parent.mkdir(parents=True, exist_ok=True)
 
-    engine = pyttsx3.init()
-
-    # Apply settings
-    engine.setProperty("rate", settings.rate)
-    engine.setProperty("volume", settings.volume)
-    if settings.voice_id:
-        engine.setProperty("voice", settings.voice_id)
-
-    print(f"[SpeakNotes] Saving audio to: {output_path}")
-    engine.save_to_file(text, str(output_path))
-
-    print("[SpeakNotes] Running engine (this should finish)...")
-    engine.runAndWait()
-
-    # Make sure the engine is stopped/cleaned up
-    engine.stop()
-    print("[SpeakNotes] Done.")
+    key = None
+    if cache is not None:
+        with stage(trace, "cache"):
+            key = make_cache_key(
+                text,
+                BACKEND_NAME,
+                backend_version(),
+                rate=settings.rate,
+                volume=settings.volume,
+                voice_id=settings.voice_id,
+                suffix=output_path.suffix,
+            )
+            hit = cache.fetch(key, output_path)
+        if hit:
+            print(f"[SpeakNotes] Reused cached audio: {output_path}")
+            return output_path
+
+    if worker is not None:
+        print(f"[SpeakNotes] Saving audio to: {output_path} (engine worker)")
+        try:
+            if not worker.is_alive():
+                with stage(trace, "engine_init"):
+                    worker.start()
+            with stage(trace, "synthesis"):
+                worker.save_to_file(text, output_path, settings.as_dict(), timeout=timeout or timeout_for_text(text), token=token)
+        except BaseException:
+            output_path.unlink(missing_ok=True)
+            raise
+        if cache is not None and key is not None:
+            with stage(trace, "cache_store"):
+                cache.store(key, output_path)
+        return output_path
+
+    with stage(trace, "engine_init"):
+        import pyttsx3  # deferred: loading the driver is slow and only needed without a worker
+
+        engine = pyttsx3.init()
+
+        # Apply settings
+        engine.setProperty("rate", settings.rate)
+        engine.setProperty("volume", settings.volume)
+        if settings.voice_id:
+            engine.setProperty("voice", settings.voice_id)
+
+    with stage(trace, "synthesis"):
+        print(f"[SpeakNotes] Saving audio to: {output_path}")
+        engine.save_to_file(text, str(output_path))
+
+        print("[SpeakNotes] Running engine (this should finish)...")
+        engine.runAndWait()
+
+        # Make sure the engine is stopped/cleaned up
+        engine.stop()
+        print("[SpeakNotes] Done.")
+
+    if cache is not None and key is not None:
+        with stage(trace, "cache_store"):
+            cache.store(key, output_path)
 
     return output_path
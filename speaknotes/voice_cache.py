@@ -0,0 +1,107 @@
+from __future__ import annotations
+
+import json
+import os
+import platform
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+# Anchored to the app root like the render cache, so every entry point reads the same catalogue.
+VOICE_CACHE_FILE = Path(__file__).resolve().parent.parent / ".cache" / "voices.json"
+DEFAULT_TTL = 7 * 24 * 3600  # voices rarely change; re-enumerate weekly
+
+
+def backend_fingerprint() -> str:
+    """
+    Identifies the voice backend; a different OS or pyttsx3 version invalidates the cache.
+    """
+    try:
+        from importlib.metadata import version
+        engine_version = version("pyttsx3")
+    except Exception:
+        engine_version = "unknown"
+    return f"pyttsx3-{engine_version}|{platform.system()}-{platform.release()}"
+
+
+def read_voice_cache(
+    cache_file: Path = VOICE_CACHE_FILE,
+    ttl: float = DEFAULT_TTL,
+) -> tuple[Optional[list[tuple[str, str]]], bool]:
+    """
+    Returns (voices, is_fresh). voices is None if there is no usable cache for
+    this backend; is_fresh is False once the TTL has passed.
+    """
+    try:
+        data = json.loads(cache_file.read_text(encoding="utf-8"))
+    except Exception:
+        return None, False
+
+    if data.get("fingerprint") != backend_fingerprint():
+        return None, False
+
+    voices = [(str(vid), str(name)) for vid, name in data.get("voices", [])]
+    is_fresh = (time.time() - float(data.get("saved_at", 0))) < ttl
+    return voices, is_fresh
+
+
+def write_voice_cache(voices: list[tuple[str, str]], cache_file: Path = VOICE_CACHE_FILE) -> None:
+    """
+    Saves the voice list together with the backend fingerprint and a timestamp.
+    """
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    payload = {
+        "fingerprint": backend_fingerprint(),
+        "saved_at": time.time(),
+        "voices": [list(v) for v in voices],
+    }
+    tmp = cache_file.with_name(cache_file.name + ".tmp")
+    tmp.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+    os.replace(tmp, cache_file)
+
+
+def get_voices(
+    worker: Any = None,
+    refresh: bool = False,
+    cache_file: Path = VOICE_CACHE_FILE,
+    ttl: float = DEFAULT_TTL,
+) -> list[tuple[str, str]]:
+    """
+    Returns the voice list from the cache, enumerating (and caching) it only
+    when the cache is missing, stale, or refresh=True.
+    """
+    if not refresh:
+        voices, is_fresh = read_voice_cache(cache_file, ttl)
+        if voices is not None and is_fresh:
+            return voices
+
+    from .tts import list_voices
+    voices = list_voices(worker=worker)
+    write_voice_cache(voices, cache_file)
+    return voices
+
+
+def refresh_voices_async(
+    on_done: Callable[[list[tuple[str, str]]], None],
+    worker: Any = None,
+    cache_file: Path = VOICE_CACHE_FILE,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> threading.Thread:
+    """
+    Enumerates voices on a background thread, updates the cache and calls on_done
+    with the fresh list (from that thread — marshal to the UI thread yourself).
+    """
+    def run() -> None:
+        try:
+            voices = get_voices(worker=worker, refresh=True, cache_file=cache_file)
+        except Exception as e:
+            if on_error:
+                on_error(e)
+            return
+        on_done(voices)
+
+    thread = threading.Thread(target=run, name="speaknotes-voices", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from speaknotes import history_utils  # noqa: E402
+
+
+@pytest.fixture
+def history_dir(tmp_path, monkeypatch):
+    """
+    Runs a test in an empty directory with the JSON Lines history backend
+    and no reader or query state left over from other tests.
+    """
+    monkeypatch.chdir(tmp_path)
+    history_utils.set_history_backend("jsonl")
+    monkeypatch.setattr(history_utils, "_log_reader", None)
+    history_utils._query_memo.clear()
+    yield tmp_path
+    history_utils._query_memo.clear()
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import asyncio
+import os
+import stat
+import sys
+
+import pytest
+
+from speaknotes.aio import AsyncSynthesizer
+from speaknotes.cancel import JobTimeout
+from speaknotes.render_cache import RenderCache
+
+# Stands in for macOS 'say': writes the text to -o; "fail" exits 1, "hang" never
+# finishes (after writing its pid next to the output).
+FAKE_SAY = f"""#!{sys.executable}
+import os, sys, time
+args = sys.argv[1:]
+out = args[args.index("-o") + 1]
+text = args[-1]
+if text == "hang":
+    open(out + ".pid", "w").write(str(os.getpid()))
+    time.sleep(60)
+if text == "fail":
+    sys.exit(1)
+open(out, "w").write(text)
+"""
+
+
+@pytest.fixture
+def fake_say(tmp_path, monkeypatch):
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    say = bin_dir / "say"
+    say.write_text(FAKE_SAY, encoding="utf-8")
+    say.chmod(say.stat().st_mode | stat.S_IEXEC)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ.get('PATH', '')}")
+
+
+def test_say_backend_renders_and_caches(tmp_path, fake_say):
+    cache = RenderCache(tmp_path / "cache")
+    synth = AsyncSynthesizer(backend="say", cache=cache)
+
+    first = asyncio.run(synth.synthesize("hello", tmp_path / "a.aiff"))
+    second = asyncio.run(synth.synthesize("hello", tmp_path / "b.aiff"))  # a second loop gets its own limit
+
+    assert first.read_text() == "hello" and second.read_text() == "hello"
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_failures_and_timeouts_leave_no_file(tmp_path, fake_say):
+    synth = AsyncSynthesizer(backend="say")
+    with pytest.raises(RuntimeError, match="status 1"):
+        asyncio.run(synth.synthesize("fail", tmp_path / "a.aiff"))
+    with pytest.raises(JobTimeout):
+        asyncio.run(synth.synthesize("hang", tmp_path / "b.aiff", timeout=0.3))
+    assert not list(tmp_path.glob("*.aiff"))
+
+
+def test_cancelling_the_task_kills_say(tmp_path, fake_say):
+    synth = AsyncSynthesizer(backend="say")
+
+    pid_file = tmp_path / "a.aiff.pid"
+
+    async def main() -> None:
+        task = asyncio.create_task(synth.synthesize("hang", tmp_path / "a.aiff"))
+        for _ in range(500):  # until say is running
+            if pid_file.exists() and pid_file.read_text():
+                break
+            await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await asyncio.wait_for(task, 10)
+
+    asyncio.run(main())
+    assert not (tmp_path / "a.aiff").exists()
+    with pytest.raises(ProcessLookupError):
+        os.kill(int(pid_file.read_text()), 0)  # killed and reaped
+
+
+def test_concurrency_is_limited(tmp_path):
+    synth = AsyncSynthesizer(max_concurrency=2, backend="say")
+    active = peak = 0
+
+    async def fake_say_to_file(text, output_path, *_args) -> None:
+        nonlocal active, peak
+        active += 1
+        peak = max(peak, active)
+        await asyncio.sleep(0.01)
+        output_path.write_text(text)
+        active -= 1
+
+    synth._say_to_file = fake_say_to_file  # type: ignore[method-assign]
+
+    async def main() -> list:
+        return await asyncio.gather(*(synth.synthesize(str(i), tmp_path / f"{i}.aiff") for i in range(6)))
+
+    assert len(asyncio.run(main())) == 6
+    assert peak == 2
+
+
+def test_stream_yields_chunks_in_order(tmp_path):
+    synth = AsyncSynthesizer(backend="say")
+
+    async def fake_say_to_file(text, output_path, *_args) -> None:
+        output_path.write_text(text)
+
+    synth._say_to_file = fake_say_to_file  # type: ignore[method-assign]
+    text = "First sentence here. Second sentence here. Third sentence here."
+
+    async def main() -> list:
+        return [chunk async for chunk in synth.stream(text, tmp_path / "chunks", min_chars=5, max_chars=25)]
+
+    chunks = asyncio.run(main())
+    assert [c.index for c in chunks] == [1, 2, 3]
+    assert " ".join(c.text for c in chunks) == text
+    assert all(c.path.read_text() == c.text for c in chunks)
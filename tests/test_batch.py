@@ -0,0 +1,58 @@
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from speaknotes import history_utils
+from speaknotes.batch import BatchRunner, JobFileError, load_jobs, run_batch_file
+
+
+def fake_render(text, out_path, settings, token=None) -> None:
+    if text == "boom":
+        raise RuntimeError("engine crashed")
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    out_path.write_text(f"{text}|{settings.rate}", encoding="utf-8")
+
+
+def test_load_jobs_skips_comments_and_names_jobs(tmp_path):
+    job_file = tmp_path / "jobs.jsonl"
+    job_file.write_text('# notes\n{"text": "a"}\n\n{"path": "b.txt", "id": "mine"}\n', encoding="utf-8")
+    assert [job["id"] for job in load_jobs(job_file)] == ["job-1", "mine"]
+
+
+@pytest.mark.parametrize("line", ["{not json", "[1, 2]", '{"rate": 100}'])
+def test_load_jobs_rejects_bad_lines(tmp_path, line):
+    job_file = tmp_path / "jobs.jsonl"
+    job_file.write_text(line + "\n", encoding="utf-8")
+    with pytest.raises(JobFileError, match=":1:"):
+        load_jobs(job_file)
+
+
+def test_run_reports_each_job_and_writes_history_in_job_order(history_dir):
+    (history_dir / "chapter.txt").write_text("From a file", encoding="utf-8")
+    runner = BatchRunner(out_dir=history_dir / "out", workers=3, base_dir=history_dir)
+    runner._render = fake_render  # type: ignore[method-assign]
+
+    summary = runner.run([
+        {"id": "one", "text": "First", "rate": 150, "output": "one"},
+        {"id": "two", "text": "boom"},
+        {"id": "three", "path": "chapter.txt", "preset": "nope"},
+        {"id": "four", "path": "chapter.txt"},
+    ])
+
+    assert (summary["total"], summary["succeeded"], summary["failed"]) == (4, 2, 2)
+    by_id = {job["id"]: job for job in summary["jobs"]}
+    assert by_id["one"]["output"] == str(history_dir / "out" / "one.aiff")
+    assert "engine crashed" in by_id["two"]["error"]
+    assert "Unknown preset" in by_id["three"]["error"]
+    assert (history_dir / "out" / "one.aiff").read_text(encoding="utf-8") == "First|150"
+    entries = history_utils.load_history()
+    assert [(e["mode"], e["source"]) for e in entries] == [("batch", "batch"), ("batch", "txt")]
+
+
+def test_run_batch_file_prints_json_and_exit_code(tmp_path, capsys):
+    job_file = tmp_path / "jobs.jsonl"
+    job_file.write_text("{oops\n", encoding="utf-8")
+    assert run_batch_file(job_file) == 2
+    assert "error" in json.loads(capsys.readouterr().out)
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from speaknotes.bulk import BulkExportError, export_parts, export_stream
+from speaknotes.cancel import CancelToken, JobCancelled
+
+
+class FakeRenderer:
+    """
+    Writes the chunk text to the output file; later parts finish first.
+    """
+
+    def __init__(self, fail_on: str | None = None) -> None:
+        self.fail_on = fail_on
+        self.rendered: list[str] = []
+        self._lock = threading.Lock()
+
+    def __call__(self, text: str, out_path: Path) -> None:
+        time.sleep(0.02 if text.endswith("1") else 0.001)
+        if text == self.fail_on:
+            raise RuntimeError("engine crashed")
+        out_path.write_text(text, encoding="utf-8")
+        with self._lock:
+            self.rendered.append(text)
+
+
+def collect():
+    reported: list[tuple[int, str, Path, int | None]] = []
+    return reported, lambda *args: reported.append(args)
+
+
+def test_parts_are_reported_in_order(tmp_path):
+    parts = [f"part {i}" for i in range(1, 9)]
+    paths = [tmp_path / f"{i}.aiff" for i in range(1, 9)]
+    reported, on_part_done = collect()
+
+    written = export_parts(parts, paths, FakeRenderer(), workers=4, on_part_done=on_part_done)
+
+    assert written == paths
+    assert [r[0] for r in reported] == list(range(1, 9))
+    assert all(p.read_text(encoding="utf-8") == t for p, t in zip(paths, parts))
+
+
+def test_stream_names_parts_lazily_and_counts_progress(tmp_path):
+    progress: list[tuple[int, int, int]] = []
+    written = export_stream(
+        (f"chunk {i}" for i in range(1, 6)),
+        lambda i, _text: tmp_path / f"{i}.aiff",
+        FakeRenderer(),
+        workers=2,
+        on_progress=lambda done, total, part: progress.append((done, total, part)),
+    )
+    assert written == [tmp_path / f"{i}.aiff" for i in range(1, 6)]
+    assert sorted(done for done, _, _ in progress) == [1, 2, 3, 4, 5]
+    assert {total for _, total, _ in progress} == {0}  # unknown for a stream
+
+
+def test_skipped_parts_are_returned_but_not_rendered_or_reported(tmp_path):
+    done_before = tmp_path / "old-2.aiff"
+    done_before.write_text("part 2", encoding="utf-8")
+    parts = ["part 1", "part 2", "part 3"]
+    renderer = FakeRenderer()
+    reported, on_part_done = collect()
+
+    written = export_parts(
+        parts,
+        [tmp_path / f"{i}.aiff" for i in range(1, 4)],
+        renderer,
+        workers=2,
+        on_part_done=on_part_done,
+        skip_part=lambda i, _text: done_before if i == 2 else None,
+    )
+
+    assert written == [tmp_path / "1.aiff", done_before, tmp_path / "3.aiff"]
+    assert sorted(renderer.rendered) == ["part 1", "part 3"]
+    assert [r[0] for r in reported] == [1, 3]
+
+
+def test_repeat_of_a_skipped_part_reuses_its_file(tmp_path):
+    done_before = tmp_path / "old-1.aiff"
+    done_before.write_text("same", encoding="utf-8")
+    renderer = FakeRenderer()
+    reported, on_part_done = collect()
+
+    export_parts(
+        ["same", "same"],
+        [tmp_path / "1.aiff", tmp_path / "2.aiff"],
+        renderer,
+        on_part_done=on_part_done,
+        skip_part=lambda i, _text: done_before if i == 1 else None,
+    )
+
+    assert renderer.rendered == []
+    assert [(r[0], r[3]) for r in reported] == [(2, 1)]
+    assert (tmp_path / "2.aiff").read_text(encoding="utf-8") == "same"
+
+
+def test_a_slow_part_does_not_hold_back_the_other_workers(tmp_path):
+    fast_parts = 10
+    fast_done = threading.Event()
+    rendered: list[str] = []
+
+    def render(text: str, out_path: Path) -> None:
+        if text == "slow":
+            # Only finishes in time if the other worker keeps getting new parts meanwhile.
+            assert fast_done.wait(timeout=5)
+        else:
+            rendered.append(text)
+            if len(rendered) == fast_parts:
+                fast_done.set()
+        out_path.write_text(text, encoding="utf-8")
+
+    chunks = ["slow"] + [f"fast {i}" for i in range(fast_parts)]
+    written = export_stream(chunks, lambda i, _text: tmp_path / f"{i}.aiff", render, workers=2)
+
+    assert len(written) == fast_parts + 1
+
+
+def test_repeated_chunks_are_rendered_once(tmp_path):
+    parts = ["Intro 1", "Body", "Intro 1  \r\n", "Body", "body"]
+    renderer = FakeRenderer()
+    reported, on_part_done = collect()
+
+    written = export_parts(parts, [tmp_path / f"{i}.aiff" for i in range(1, 6)], renderer, workers=3, on_part_done=on_part_done)
+
+    assert sorted(renderer.rendered) == ["Body", "Intro 1", "body"]  # trailing whitespace is ignored, case is not
+    assert [(r[0], r[3]) for r in reported] == [(1, None), (2, None), (3, 1), (4, 2), (5, None)]
+    assert written[2].read_text(encoding="utf-8") == "Intro 1"
+    assert written[3].read_text(encoding="utf-8") == "Body"
+
+
+def test_dedupe_can_be_disabled(tmp_path):
+    renderer = FakeRenderer()
+    export_parts(["same", "same"], [tmp_path / "1.aiff", tmp_path / "2.aiff"], renderer, dedupe=False)
+    assert renderer.rendered == ["same", "same"]
+
+
+def test_repeat_is_rendered_if_the_original_was_removed_after_reporting(tmp_path):
+    renderer = FakeRenderer()
+    reported: list[tuple[int, int | None]] = []
+
+    def on_part_done(part_index, _text, out_path, duplicate_of) -> None:
+        reported.append((part_index, duplicate_of))
+        out_path.unlink()  # e.g. encoded with its source removed
+
+    export_parts(["same", "other", "same"], [tmp_path / f"{i}.aiff" for i in range(1, 4)], renderer, workers=1, on_part_done=on_part_done)
+
+    assert sorted(renderer.rendered) == ["other", "same", "same"]
+    assert reported == [(1, None), (2, None), (3, None)]
+
+
+def test_callback_errors_name_the_part_after_reporting_earlier_ones(tmp_path):
+    reported, on_part_done = collect()
+
+    def make_path(part_index: int, _text: str) -> Path:
+        if part_index == 3:
+            raise OSError("disk full")
+        return tmp_path / f"{part_index}.aiff"
+
+    with pytest.raises(BulkExportError) as info:
+        export_stream([f"part {i}" for i in range(1, 6)], make_path, FakeRenderer(), workers=2, on_part_done=on_part_done)
+
+    assert info.value.part_index == 3
+    assert isinstance(info.value.cause, OSError)
+    assert [r[0] for r in reported] == [1, 2]
+
+
+def test_on_part_done_errors_are_bulk_export_errors(tmp_path):
+    def on_part_done(part_index, *_rest) -> None:
+        if part_index == 2:
+            raise ValueError("history is full")
+
+    with pytest.raises(BulkExportError) as info:
+        export_parts(["a", "b", "c"], [tmp_path / f"{i}.aiff" for i in range(1, 4)], FakeRenderer(), workers=2, on_part_done=on_part_done)
+
+    assert info.value.part_index == 2
+
+
+def test_failure_reports_finished_parts_and_names_the_failing_one(tmp_path):
+    parts = ["part 1", "part 2", "bad", "part 4"]
+    reported, on_part_done = collect()
+
+    with pytest.raises(BulkExportError) as info:
+        export_parts(parts, [tmp_path / f"{i}.aiff" for i in range(1, 5)], FakeRenderer(fail_on="bad"), workers=1, on_part_done=on_part_done)
+
+    assert info.value.part_index == 3
+    assert [r[0] for r in reported] == [1, 2]
+
+
+def test_cancelled_token_stops_before_new_parts(tmp_path):
+    token = CancelToken()
+    reported: list[int] = []
+
+    def on_part_done(part_index, *_rest) -> None:
+        reported.append(part_index)
+        token.cancel("stop")
+
+    with pytest.raises(JobCancelled):
+        export_stream(
+            (f"chunk {i}" for i in range(1, 100)),
+            lambda i, _text: tmp_path / f"{i}.aiff",
+            FakeRenderer(),
+            workers=1,
+            on_part_done=on_part_done,
+            token=token,
+        )
+    assert reported[0] == 1
+    assert len(reported) < 5  # only parts already in flight finish
+
+
+def test_mismatched_lengths_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        export_parts(["a", "b"], [tmp_path / "1.aiff"], FakeRenderer())
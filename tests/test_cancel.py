@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from speaknotes.cancel import CancelToken, JobCancelled, JobTimeout, run_process, timeout_for_text
+
+SLEEP = [sys.executable, "-c", "import time; time.sleep(30)"]
+
+
+def test_callbacks_run_once_and_late_ones_run_immediately():
+    token = CancelToken()
+    calls: list[str] = []
+    token.on_cancel(lambda: calls.append("early"))
+    unregister = token.on_cancel(lambda: calls.append("removed"))
+    unregister()
+
+    token.cancel("stop")
+    token.cancel("again")
+    token.on_cancel(lambda: calls.append("late"))
+
+    assert calls == ["early", "late"]
+    assert token.reason == "stop"
+    with pytest.raises(JobCancelled, match="stop"):
+        token.check()
+
+
+def test_token_timeout_raises_job_timeout():
+    token = CancelToken(timeout=0.05)
+    assert token.wait(5)
+    assert token.timed_out
+    with pytest.raises(JobTimeout):
+        token.check()
+
+
+def test_longer_text_gets_a_longer_limit():
+    assert timeout_for_text("a" * 1000) > timeout_for_text("a") > 0
+
+
+def test_run_process_checks_the_exit_code():
+    run_process([sys.executable, "-c", "pass"])
+    with pytest.raises(subprocess.CalledProcessError):
+        run_process([sys.executable, "-c", "raise SystemExit(3)"])
+
+
+def test_cancelling_kills_the_process_and_removes_partial_output(tmp_path):
+    partial = tmp_path / "out.aiff"
+    partial.write_bytes(b"half")
+    token = CancelToken()
+    threading.Timer(0.2, token.cancel, args=("Stopped",)).start()
+
+    started = time.monotonic()
+    with pytest.raises(JobCancelled, match="Stopped"):
+        run_process(SLEEP, token=token, partial_output=partial)
+
+    assert time.monotonic() - started < 10
+    assert not partial.exists()
+
+
+def test_run_process_timeout():
+    with pytest.raises(JobTimeout):
+        run_process(SLEEP, timeout=0.2)
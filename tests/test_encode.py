@@ -0,0 +1,99 @@
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import wave
+from pathlib import Path
+
+import pytest
+
+from speaknotes import encode
+from speaknotes.encode import EncodeError, Encoder, encode_file, encoded_path
+from speaknotes.stitch import chapters_path
+
+# A stand-in encoder: copies {src} to {dst} with a marker, or fails for sources named "bad*".
+FAKE_ENCODER = [
+    sys.executable, "-c",
+    "import sys, shutil; src, dst = sys.argv[1:]; "
+    "sys.exit('bad input') if 'bad' in src else shutil.copyfile(src, dst)",
+    "{src}", "{dst}",
+]
+
+
+@pytest.fixture
+def fake_mp3(monkeypatch):
+    monkeypatch.setitem(encode.ENCODERS, "mp3", [FAKE_ENCODER])
+
+
+def write_wav(path: Path) -> Path:
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(8000)
+        writer.writeframes(b"\x01\x00" * 10)
+    return path
+
+
+def test_encoded_path():
+    assert encoded_path(Path("a.aiff"), "mp3") == Path("a.mp3")
+    assert encoded_path(Path("a.aif"), "AIFF") == Path("a.aif")
+    assert encoded_path(Path("a.wav"), ".wav") == Path("a.wav")
+
+
+def test_same_format_is_left_alone(tmp_path):
+    src = write_wav(tmp_path / "a.wav")
+    assert encode_file(src, "wav") == src
+    assert src.exists()
+
+
+def test_compressed_format_replaces_the_source_and_keeps_chapters(tmp_path, fake_mp3):
+    src = write_wav(tmp_path / "book.wav")
+    chapters_path(src).write_text(json.dumps({"file": src.name, "markers": [{"part": 1}]}), encoding="utf-8")
+
+    dst = encode_file(src, "mp3")
+
+    assert dst == tmp_path / "book.mp3" and dst.exists()
+    assert not src.exists() and not chapters_path(src).exists()
+    assert json.loads(chapters_path(dst).read_text(encoding="utf-8"))["file"] == "book.mp3"
+
+
+def test_source_can_be_kept(tmp_path, fake_mp3):
+    src = write_wav(tmp_path / "part.wav")
+    encode_file(src, "mp3", remove_source=False)
+    assert src.exists() and (tmp_path / "part.mp3").exists()
+
+
+def test_failed_or_missing_encoder_keeps_the_source(tmp_path, fake_mp3, monkeypatch):
+    src = write_wav(tmp_path / "bad.wav")
+    with pytest.raises(EncodeError, match="bad input"):
+        encode_file(src, "mp3")
+    assert src.exists()
+    assert [p.name for p in tmp_path.iterdir()] == ["bad.wav"]
+
+    monkeypatch.setitem(encode.ENCODERS, "mp3", [["no-such-encoder-binary", "{src}", "{dst}"]])
+    with pytest.raises(EncodeError, match="No encoder"):
+        encode_file(src, "mp3")
+    assert "mp3" not in encode.available_formats()
+
+
+def test_encoder_pool_reports_each_file(tmp_path, fake_mp3):
+    encoder = Encoder(max_workers=2)
+    results: list[tuple[Path | None, BaseException | None]] = []
+    lock = threading.Lock()
+
+    def on_done(path, error) -> None:
+        with lock:
+            results.append((path, error))
+
+    good = encoder.submit(write_wav(tmp_path / "good.wav"), "mp3", on_done=on_done)
+    bad = encoder.submit(write_wav(tmp_path / "bad.wav"), "mp3", on_done=on_done)
+    assert good.result(10) == tmp_path / "good.mp3"
+    with pytest.raises(EncodeError):
+        bad.result(10)
+    encoder.shutdown()
+
+    assert encoder.pending() == 0
+    assert (tmp_path / "good.mp3", None) in results
+    assert any(path is None and isinstance(error, EncodeError) for path, error in results)
+    assert len(results) == 2
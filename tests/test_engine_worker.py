@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from speaknotes.cancel import CancelToken, JobCancelled
+from speaknotes.engine_worker import EngineWorker, EngineWorkerError, _apply_settings
+
+# Stands in for pyttsx3 in the spawned engine process: "hang" never finishes, "fail" raises.
+FAKE_PYTTSX3 = '''
+import time
+from pathlib import Path
+
+
+class Voice:
+    def __init__(self, voice_id):
+        self.id = voice_id
+        self.name = f"Voice {voice_id}"
+
+
+class Engine:
+    def __init__(self):
+        self.props = {"rate": 200, "volume": 1.0, "voice": "v0"}
+        self.pending = None
+
+    def getProperty(self, name):
+        return [Voice("v0"), Voice("v1")] if name == "voices" else self.props[name]
+
+    def setProperty(self, name, value):
+        self.props[name] = value
+
+    def say(self, text):
+        self.pending = (text, None)
+
+    def save_to_file(self, text, path):
+        self.pending = (text, path)
+
+    def runAndWait(self):
+        text, path = self.pending
+        if text == "hang":
+            time.sleep(60)
+        if text == "fail":
+            raise RuntimeError("engine error")
+        if path:
+            Path(path).write_text(f"{text}|{self.props['rate']}|{self.props['voice']}")
+
+    def stop(self):
+        pass
+
+
+def init():
+    return Engine()
+'''
+
+
+@pytest.fixture
+def worker(tmp_path, monkeypatch):
+    fake = tmp_path / "fake_modules"
+    fake.mkdir()
+    (fake / "pyttsx3.py").write_text(FAKE_PYTTSX3, encoding="utf-8")
+    monkeypatch.syspath_prepend(str(fake))  # spawned processes inherit sys.path
+    engine = EngineWorker(request_timeout=30)
+    yield engine
+    engine.stop()
+
+
+class RecordingEngine:
+    def __init__(self) -> None:
+        self.calls: list[tuple[str, object]] = []
+
+    def setProperty(self, name: str, value: object) -> None:
+        self.calls.append((name, value))
+
+
+def test_only_changed_settings_are_pushed():
+    engine = RecordingEngine()
+    defaults = {"rate": 200, "volume": 1.0, "voice": "v0"}
+    applied = dict(defaults)
+
+    _apply_settings(engine, applied, defaults, {"rate": 150, "volume": 1.0})
+    _apply_settings(engine, applied, defaults, {"rate": 150, "voice_id": "v1"})
+    _apply_settings(engine, applied, defaults, {})  # back to the engine's defaults
+
+    assert engine.calls == [("rate", 150), ("voice", "v1"), ("rate", 200), ("voice", "v0")]
+
+
+def test_one_warm_engine_serves_every_request(worker, tmp_path):
+    assert worker.list_voices() == [("v0", "Voice v0"), ("v1", "Voice v1")]
+    pid = worker._process.pid
+
+    out = worker.save_to_file("hello", tmp_path / "a.aiff", {"rate": 150, "voice_id": "v1"})
+    worker.save_to_file("again", tmp_path / "b.aiff", {})
+
+    assert out.read_text() == "hello|150|v1"
+    assert (tmp_path / "b.aiff").read_text() == "again|200|v0"
+    assert worker._process.pid == pid
+    assert worker.restarts == 0
+
+
+def test_a_failed_request_keeps_the_engine(worker, tmp_path):
+    with pytest.raises(EngineWorkerError, match="engine error"):
+        worker.save_to_file("fail", tmp_path / "a.aiff", {})
+    assert worker.call("ping") == "pong"
+    assert worker.restarts == 0
+
+
+def test_a_wedged_engine_is_replaced(worker, tmp_path):
+    with pytest.raises(EngineWorkerError, match="did not answer"):
+        worker.save_to_file("hang", tmp_path / "a.aiff", {}, timeout=1)
+    assert worker.restarts == 1
+    assert worker.call("ping") == "pong"
+
+
+def test_cancelling_stops_a_running_request(worker, tmp_path):
+    worker.start()
+    token = CancelToken()
+    threading.Timer(0.3, token.cancel, args=("stop",)).start()
+    with pytest.raises(JobCancelled):
+        worker.save_to_file("hang", tmp_path / "a.aiff", {}, token=token)
+    assert worker.call("ping") == "pong"
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+
+from speaknotes import history_utils as h
+
+
+def entry(name: str, **fields) -> dict:
+    return {"date": "2026-01-01T10:00:00", "file": name, "text_preview": name, **fields}
+
+
+def test_append_and_load_keep_order(history_dir):
+    h.append_history(entry("a"))
+    h.append_history_many([entry("b"), entry("c")])
+    assert [e["file"] for e in h.load_history()] == ["a", "b", "c"]
+
+
+def test_delete_appends_marker_and_hides_entry(history_dir):
+    h.append_history_many([entry("a"), entry("b"), entry("a")])
+    h.delete_history_entries(["a"])
+    assert [e["file"] for e in h.load_history()] == ["b"]
+    assert json.loads(h.HISTORY_LOG.read_text(encoding="utf-8").splitlines()[-1]) == {"op": "delete", "file": "a"}
+
+
+def test_compact_drops_markers_and_removed_entries(history_dir):
+    h.append_history_many([entry("a"), entry("b")])
+    h.delete_history_entries(["a"])
+    assert h.compact_history() == 1
+    lines = h.HISTORY_LOG.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["file"] for line in lines] == ["b"]
+
+
+def test_compacts_only_past_threshold(history_dir):
+    h.append_history_many([entry(str(i)) for i in range(5)])
+    h.delete_history_entries(["0", "1", "2"])
+    assert not h.maybe_compact_history(threshold=3)
+    assert h.maybe_compact_history(threshold=2)
+    assert "op" not in h.HISTORY_LOG.read_text(encoding="utf-8")
+    assert [e["file"] for e in h.load_history()] == ["3", "4"]
+
+
+def test_torn_and_corrupt_lines_are_skipped(history_dir):
+    h.append_history(entry("a", text_preview="café"))
+    with open(h.HISTORY_LOG, "ab") as f:
+        f.write(b"not json\n")
+        f.write('{"file": "b", "text_preview": "é'.encode("utf-8")[:-1])  # torn mid-character
+    assert [e["file"] for e in h.load_history()] == ["a"]
+    assert h.compact_history() == 1
+
+    # The next append terminates the torn line instead of merging into it.
+    h.append_history(entry("c"))
+    assert [e["file"] for e in h.load_history()] == ["a", "c"]
+
+
+def test_legacy_history_is_imported_once(history_dir):
+    h.HISTORY_FILE.write_text(json.dumps([entry("old"), "garbage"]), encoding="utf-8")
+    assert [e["file"] for e in h.load_history()] == ["old"]
+    assert h.import_legacy_history() == 0  # the log exists now
+    h.append_history(entry("new"))
+    assert [e["file"] for e in h.load_history()] == ["old", "new"]
+    assert h.HISTORY_FILE.exists()
+
+
+def test_query_search_sort_and_count(history_dir):
+    h.append_history_many([
+        entry("a", rate=180, date="2026-01-01"),
+        entry("b", rate=90, date="2026-01-03", text_preview="Meeting notes"),
+        entry("c", rate=120, date="2026-01-02", text_preview="meeting agenda"),
+    ])
+    assert [e["file"] for e in h.query_history()] == ["b", "c", "a"]
+    assert [e["rate"] for e in h.query_history(sort="rate", descending=False)] == [90, 120, 180]
+    assert [e["file"] for e in h.query_history(search="MEETING")] == ["b", "c"]
+    assert [e["file"] for e in h.query_history(search="meeting n")] == ["b"]
+    assert h.count_history(search="meeting") == 2
+    assert [e["file"] for e in h.query_history(limit=1, offset=1)] == ["c"]
+    assert h.count_history(filters={"file": "a"}) == 1
+
+
+@pytest.mark.parametrize("search", ["ello", "wonder", "185", "derful", "CAFÉ", "0.8", "2026-02", "say", "notes.txt", "nothing"])
+def test_backends_find_the_same_entries(history_dir, search):
+    h.append_history_many([
+        entry("hello.aiff", rate=185, volume=1.0, voice="com.apple.Samantha", mode="export", source="manual"),
+        entry("b.aiff", text_preview="What a wonderful café", rate=175, volume=0.8, date="2026-02-01T09:00:00"),
+        entry("c.aiff", text_preview="Chapter 1", mode="bulk", source="txt", source_path="/tmp/notes.txt", format="say"),
+    ])
+    found = {}
+    for backend in h.HISTORY_BACKENDS:
+        h.set_history_backend(backend)
+        found[backend] = ([e["file"] for e in h.query_history(search=search)], h.count_history(search=search))
+    assert found["sqlite"] == found["jsonl"]
+
+
+def test_query_rejects_what_sqlite_rejects(history_dir):
+    h.append_history(entry("a"))
+    with pytest.raises(ValueError):
+        h.query_history(filters={"bogus": 1})
+    with pytest.raises(ValueError):
+        h.query_history(sort="nope")
+
+
+def test_query_results_are_copies(history_dir):
+    h.append_history(entry("a"))
+    h.query_history()[0]["file"] = "changed"
+    assert h.query_history()[0]["file"] == "a"
+
+
+def test_log_reader_reads_only_the_appended_tail(history_dir):
+    h.append_history_many([entry("a"), entry("b")])
+    reader = h._LogReader(h.HISTORY_LOG.resolve())
+    assert [e["file"] for e in reader.entries()] == ["a", "b"]
+    version = reader.version
+
+    reader.sync()
+    assert reader.version == version  # nothing changed
+
+    h.append_history(entry("c"))
+    with open(h.HISTORY_LOG, "ab") as f:
+        f.write(b'{"file": "half')  # still being written
+    assert [e["file"] for e in reader.entries()] == ["a", "b", "c"]
+    assert reader.version > version
+
+    with open(h.HISTORY_LOG, "ab") as f:
+        f.write(b'-done"}\n{"op": "delete", "file": "a"}\n')
+    assert [e["file"] for e in reader.entries()] == ["b", "c", "half-done"]
+    assert reader.markers == 1
+
+
+def test_log_reader_reloads_after_rewrite(history_dir):
+    h.append_history_many([entry("a"), entry("b"), entry("c")])
+    reader = h._LogReader(h.HISTORY_LOG.resolve())
+    assert len(reader.entries()) == 3
+
+    h.rewrite_history([entry("x")])  # new inode, shorter file
+    assert [e["file"] for e in reader.entries()] == ["x"]
+
+    os.remove(h.HISTORY_LOG)
+    assert reader.entries() == []
+
+
+def test_history_version_changes_without_reading(history_dir):
+    h.append_history(entry("a"))
+    version = h.history_version()
+    assert h._log_reader is None  # a stat only
+    assert h.history_version() == version
+    h.append_history(entry("b"))
+    assert h.history_version() != version
@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from speaknotes.cancel import CancelToken
+from speaknotes.jobs import JobQueue
+
+
+class Watcher:
+    """
+    on_change callback that lets a test wait for jobs to reach a status.
+    """
+
+    def __init__(self) -> None:
+        self._cond = threading.Condition()
+
+    def __call__(self, _job) -> None:
+        with self._cond:
+            self._cond.notify_all()
+
+    def wait(self, predicate, timeout: float = 5) -> None:
+        with self._cond:
+            assert self._cond.wait_for(predicate, timeout)
+
+
+def until_cancelled(token: CancelToken) -> None:
+    token.wait(5)
+    token.check()
+
+
+@pytest.fixture
+def watcher():
+    return Watcher()
+
+
+@pytest.fixture
+def queue(watcher):
+    jobs = JobQueue(max_workers=1, on_change=watcher)
+    yield jobs
+    jobs.shutdown(cancel_running=True)
+
+
+def test_jobs_run_by_priority_then_submission_order(queue, watcher):
+    release = threading.Event()
+    order: list[str] = []
+    blocker = queue.submit("bulk", "blocker", lambda _t: release.wait(5))
+    watcher.wait(lambda: blocker.status == "running")
+
+    jobs = [queue.submit(kind, label, lambda _t, label=label: order.append(label))
+            for kind, label in (("bulk", "bulk"), ("export", "export 1"), ("preview", "preview"), ("export", "export 2"))]
+    release.set()
+    watcher.wait(lambda: all(job.finished for job in jobs))
+
+    assert order == ["preview", "export 1", "export 2", "bulk"]
+    assert all(job.status == "done" for job in jobs)
+
+
+def test_a_busy_group_is_passed_over(watcher):
+    queue = JobQueue(max_workers=2, on_change=watcher)
+    release = threading.Event()
+    order: list[str] = []
+    first = queue.submit("preview", "speak 1", lambda _t: (order.append("speak 1"), release.wait(5)), group="audio")
+    watcher.wait(lambda: first.status == "running")
+    second = queue.submit("preview", "speak 2", lambda _t: order.append("speak 2"), group="audio")
+    export = queue.submit("export", "export", lambda _t: order.append("export"))
+    watcher.wait(lambda: export.finished)
+    assert second.status == "queued"
+
+    release.set()
+    watcher.wait(lambda: second.finished)
+    assert order == ["speak 1", "export", "speak 2"]
+    queue.shutdown()
+
+
+def test_cancel_drops_queued_and_stops_running_jobs(queue, watcher):
+    running = queue.submit("export", "running", until_cancelled)
+    watcher.wait(lambda: running.status == "running")
+    queued = queue.submit("export", "queued", lambda _t: None)
+
+    assert queue.cancel(queued.id)
+    assert queue.cancel(running.id)
+    watcher.wait(lambda: running.finished)
+
+    assert (queued.status, running.status) == ("cancelled", "cancelled")
+    assert running.error == "Cancelled by user"
+    assert not queue.cancel(running.id)
+
+
+def test_timeouts_and_failures_are_recorded(queue, watcher):
+    slow = queue.submit("export", "slow", until_cancelled, timeout=0.1)
+    broken = queue.submit("export", "broken", lambda _t: 1 / 0)
+    watcher.wait(lambda: slow.finished and broken.finished)
+
+    assert slow.status == "timed out"
+    assert broken.status == "failed" and "division" in broken.error
+    assert slow.ran() is not None and broken.waited() >= 0
+
+
+def test_shutdown_cancels_queued_jobs_and_stops_workers(watcher):
+    queue = JobQueue(max_workers=1, on_change=watcher)
+    release = threading.Event()
+    running = queue.submit("export", "running", lambda _t: release.wait(5))
+    watcher.wait(lambda: running.status == "running")
+    queued = queue.submit("export", "queued", lambda _t: None)
+
+    queue.shutdown()
+    assert queued.status == "cancelled"
+    with pytest.raises(RuntimeError):
+        queue.submit("export", "late", lambda _t: None)
+
+    release.set()
+    for thread in queue._threads:
+        thread.join(5)
+    assert not queue.alive()
+    assert running.status == "done"
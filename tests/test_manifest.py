@@ -0,0 +1,61 @@
+from __future__ import annotations
+
+from speaknotes.manifest import BulkManifest, text_hash
+
+SETTINGS = {"rate": 180, "voice": "Alex", "format": "aiff"}
+
+
+def open_manifest(tmp_path, settings=SETTINGS) -> BulkManifest:
+    return BulkManifest.open(text_hash("the whole book"), settings, manifest_dir=tmp_path / "bulk")
+
+
+def test_recorded_part_is_completed_after_reopening(tmp_path):
+    part = tmp_path / "part-1.aiff"
+    part.write_bytes(b"audio")
+    manifest = open_manifest(tmp_path)
+    assert manifest.completed_count() == 0
+    manifest.record(1, "chunk one", part)
+
+    reopened = open_manifest(tmp_path)
+    assert reopened.completed_count() == 1
+    assert reopened.completed(1, "chunk one") == part.resolve()
+    assert reopened.completed(2, "chunk two") is None
+
+
+def test_changed_chunk_or_file_must_be_rendered_again(tmp_path):
+    part = tmp_path / "part-1.aiff"
+    part.write_bytes(b"audio")
+    open_manifest(tmp_path).record(1, "chunk one", part)
+
+    assert open_manifest(tmp_path).completed(1, "edited chunk") is None
+    part.write_bytes(b"truncated")
+    assert open_manifest(tmp_path).completed(1, "chunk one") is None
+    part.unlink()
+    assert open_manifest(tmp_path).completed(1, "chunk one") is None
+
+
+def test_other_settings_use_another_manifest(tmp_path):
+    part = tmp_path / "part-1.aiff"
+    part.write_bytes(b"audio")
+    open_manifest(tmp_path).record(1, "chunk one", part)
+    assert open_manifest(tmp_path, {**SETTINGS, "rate": 200}).completed_count() == 0
+
+
+def test_torn_last_line_is_ignored(tmp_path):
+    part = tmp_path / "café-1.aiff"
+    part.write_bytes(b"audio")
+    manifest = open_manifest(tmp_path)
+    manifest.record(1, "chunk one", part)
+    with open(manifest.path, "ab") as f:
+        f.write('{"part": 2, "file": "é'.encode("utf-8")[:-1])
+    assert open_manifest(tmp_path).completed(1, "chunk one") == part.resolve()
+
+
+def test_discard_forgets_progress(tmp_path):
+    part = tmp_path / "part-1.aiff"
+    part.write_bytes(b"audio")
+    manifest = open_manifest(tmp_path)
+    manifest.record(1, "chunk one", part)
+    manifest.discard()
+    assert not manifest.path.exists()
+    assert open_manifest(tmp_path).completed_count() == 0
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from speaknotes.profiling import Profiler, profile_worker
+
+
+def job_work() -> None:
+    sum(range(1000))
+
+
+def other_work() -> None:
+    sum(range(1000))
+
+
+def test_only_the_jobs_own_workers_are_profiled():
+    with ThreadPoolExecutor(max_workers=1) as pool:
+        with Profiler() as profiler:
+            other = threading.Thread(target=other_work)  # started during the job, but not by it
+            other.start()
+            other.join()
+            pool.submit(profile_worker(job_work)).result()
+        after_stop = pool.submit(sys.getprofile).result()
+
+    report = profiler.report()
+    assert "job_work" in report
+    assert "other_work" not in report
+    assert "across 2 thread(s)" in report
+    assert after_stop is None
+
+
+def test_profile_worker_is_a_no_op_without_a_profiler():
+    assert profile_worker(job_work) is job_work
@@ -0,0 +1,68 @@
+from __future__ import annotations
+
+import os
+
+from speaknotes.render_cache import RenderCache, link_or_copy, make_cache_key, normalize_text
+
+
+def test_cosmetic_differences_share_a_key():
+    assert normalize_text("Café \r\nnotes  \n") == "Café\nnotes"
+    key = make_cache_key("Hello\r\n", "say", "1", rate=175)
+    assert key == make_cache_key("Hello  ", "say", "1", rate=175)
+    assert key != make_cache_key("Hello", "say", "1", rate=180)
+    assert key != make_cache_key("Hello", "say", "1", rate=175, suffix=".wav")
+    assert key != make_cache_key("Hello", "say", "2", rate=175)
+
+
+def test_miss_then_store_then_hit(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    out = tmp_path / "out.aiff"
+    out.write_bytes(b"stale")
+    assert not cache.fetch("k" * 64, out)
+    assert not out.exists()  # a stale output is removed on a miss
+
+    out.write_bytes(b"audio")
+    cache.store("k" * 64, out)
+    again = tmp_path / "again.aiff"
+    assert cache.fetch("k" * 64, again)
+    assert again.read_bytes() == b"audio"
+    assert cache.stats() == {"hits": 1, "misses": 1}
+
+
+def test_cache_entries_never_share_an_inode_with_outputs(tmp_path):
+    cache = RenderCache(tmp_path / "cache")
+    out = tmp_path / "out.aiff"
+    out.write_bytes(b"audio")
+    cache.store("a" * 64, out)
+    out.write_bytes(b"overwritten")  # e.g. the engine reusing the output path
+
+    fetched = tmp_path / "fetched.aiff"
+    assert cache.fetch("a" * 64, fetched)
+    assert fetched.read_bytes() == b"audio"
+
+
+def test_eviction_drops_least_recently_used_first(tmp_path):
+    cache = RenderCache(tmp_path / "cache", max_bytes=100)
+    for i, key in enumerate(("a" * 64, "b" * 64, "c" * 64)):
+        src = tmp_path / f"{i}.aiff"
+        src.write_bytes(b"12345")
+        cache.store(key, src)
+        entry = cache._entry_path(key, ".aiff")
+        os.utime(entry, (1000 + i, 1000 + i))
+
+    cache.max_bytes = 10
+    assert cache.evict() == 1
+    assert not cache._entry_path("a" * 64, ".aiff").exists()
+    assert cache._entry_path("c" * 64, ".aiff").exists()
+
+
+def test_link_or_copy_replaces_the_destination(tmp_path):
+    src = tmp_path / "src"
+    src.write_bytes(b"new")
+    dst = tmp_path / "sub" / "dst"
+    dst.parent.mkdir()
+    dst.write_bytes(b"old")
+    link_or_copy(src, dst, allow_link=False)
+    assert dst.read_bytes() == b"new"
+    assert os.stat(src).st_ino != os.stat(dst).st_ino
+    assert not list(dst.parent.glob(".*.tmp"))
@@ -0,0 +1,101 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+
+import pytest
+
+from speaknotes import history_utils
+from speaknotes.server import Coalescer, RequestError, ServerBusy, SpeakNotesService
+
+
+def callbacks_done(future) -> threading.Event:
+    """
+    Set once the callbacks registered on future before this one have run.
+    Register it while the future is still pending: callbacks run in order.
+    """
+    assert not future.done()
+    event = threading.Event()
+    future.add_done_callback(lambda _f: event.set())
+    return event
+
+
+def test_identical_requests_share_one_render():
+    coalescer = Coalescer(max_workers=2)
+    release = threading.Event()
+    calls: list[str] = []
+
+    def render() -> Path:
+        calls.append("render")
+        release.wait(5)
+        return Path("out.aiff")
+
+    first, joined_first = coalescer.submit("key", render)
+    second, joined_second = coalescer.submit("key", render)
+    release.set()
+
+    assert (joined_first, joined_second) == (False, True)
+    assert second is first
+    assert first.result(5) == Path("out.aiff")
+    assert calls == ["render"]
+    assert (coalescer.renders, coalescer.coalesced) == (1, 1)
+    coalescer.shutdown()
+
+
+def test_finished_render_is_not_joined():
+    coalescer = Coalescer(max_workers=1)
+    release = threading.Event()
+
+    def render() -> Path:
+        release.wait(5)
+        return Path("a")
+
+    first, _ = coalescer.submit("key", render)
+    forgotten = callbacks_done(first)  # the coalescer's own callback forgets the key
+    release.set()
+    assert forgotten.wait(5)
+    second, joined = coalescer.submit("key", lambda: Path("b"))
+    assert not joined
+    assert second.result(5) == Path("b")
+    coalescer.shutdown()
+
+
+def test_full_queue_is_refused():
+    coalescer = Coalescer(max_workers=1, max_pending=1)
+    release = threading.Event()
+    coalescer.submit("a", lambda: release.wait(5))
+    with pytest.raises(ServerBusy):
+        coalescer.submit("b", lambda: Path("b"))
+    release.set()
+    coalescer.shutdown()
+
+
+def test_joined_request_that_wants_history_is_logged(history_dir):
+    service = SpeakNotesService(out_dir=history_dir / "out", use_cache=False)
+    release = threading.Event()
+
+    def render(text: str, out_path: Path, settings) -> Path:
+        release.wait(5)
+        out_path.parent.mkdir(parents=True, exist_ok=True)
+        out_path.write_bytes(b"audio")
+        return out_path
+
+    service._render = render  # type: ignore[method-assign]
+    settings = service.settings_for({"preset": "study"})
+    streamed, _ = service.synthesize("hello", settings, log=False)
+    plain, joined = service.synthesize("hello", settings, log=True)
+    again, _ = service.synthesize("hello", settings, log=True)
+    logged = callbacks_done(streamed)
+    release.set()
+    assert logged.wait(5)
+
+    assert joined and plain is streamed is again
+    assert history_utils.count_history() == 1
+
+
+def test_bad_settings_are_request_errors(tmp_path):
+    service = SpeakNotesService(out_dir=tmp_path, use_cache=False)
+    with pytest.raises(RequestError):
+        service.settings_for({"preset": "nope"})
+    with pytest.raises(RequestError):
+        service.settings_for({"rate": "fast"})
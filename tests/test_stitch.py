@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+import json
+import wave
+from array import array
+
+import pytest
+
+from speaknotes.stitch import StitchError, aifc, chapters_path, iter_wav_frames, read_params, stitch_parts, wav_header
+
+
+def write_wav(path, samples: list[int], framerate: int = 8000, nchannels: int = 1) -> None:
+    with wave.open(str(path), "wb") as writer:
+        writer.setnchannels(nchannels)
+        writer.setsampwidth(2)
+        writer.setframerate(framerate)
+        writer.writeframes(array("h", samples).tobytes())
+
+
+def read_samples(path) -> list[int]:
+    return list(array("h", b"".join(iter_wav_frames(path))))
+
+
+def test_parts_are_joined_with_silent_gaps_and_markers(tmp_path):
+    write_wav(tmp_path / "1.wav", [1, 2, 3])
+    write_wav(tmp_path / "2.wav", [4, 5])
+    out = tmp_path / "book.wav"
+
+    markers = stitch_parts([tmp_path / "1.wav", tmp_path / "2.wav"], out, gap_seconds=0.00025, labels=["Intro", "End"])
+
+    assert read_samples(out) == [1, 2, 3, 0, 0, 4, 5]
+    assert [(m["label"], m["start_frame"]) for m in markers] == [("Intro", 0), ("End", 5)]
+    sidecar = json.loads(chapters_path(out).read_text(encoding="utf-8"))
+    assert sidecar["file"] == "book.wav"
+    assert len(sidecar["markers"]) == 2
+
+
+def test_mismatched_parts_fail_before_writing(tmp_path):
+    write_wav(tmp_path / "1.wav", [1], framerate=8000)
+    write_wav(tmp_path / "2.wav", [1], framerate=16000)
+    out = tmp_path / "book.wav"
+    with pytest.raises(StitchError, match="different format"):
+        stitch_parts([tmp_path / "1.wav", tmp_path / "2.wav"], out)
+    assert not out.exists()
+    assert not list(tmp_path.glob(".*tmp*"))
+
+
+def test_unsupported_and_empty_inputs_are_rejected(tmp_path):
+    with pytest.raises(StitchError):
+        stitch_parts([], tmp_path / "book.wav")
+    (tmp_path / "part.mp3").write_bytes(b"not pcm")
+    with pytest.raises(StitchError, match="Unsupported"):
+        stitch_parts([tmp_path / "part.mp3"], tmp_path / "book.wav")
+
+
+@pytest.mark.skipif(aifc is None, reason="this Python has no aifc module")
+def test_aiff_round_trip_keeps_samples(tmp_path):
+    samples = [0, 1, -1, 32767, -32768, 258]
+    write_wav(tmp_path / "part.wav", samples, nchannels=2)
+    stitch_parts([tmp_path / "part.wav"], tmp_path / "mid.aiff", gap_seconds=0)
+    stitch_parts([tmp_path / "mid.aiff"], tmp_path / "back.wav", gap_seconds=0, chapters=False)
+
+    assert read_params(tmp_path / "mid.aiff") == (2, 2, 8000, 3)
+    assert read_samples(tmp_path / "mid.aiff") == samples  # converted to WAV byte order
+    assert read_samples(tmp_path / "back.wav") == samples
+    assert not chapters_path(tmp_path / "back.wav").exists()
+
+
+def test_wav_header_describes_the_stream():
+    header = wav_header(1, 2, 8000, nframes=10)
+    assert len(header) == 44
+    assert header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+    assert int.from_bytes(header[40:44], "little") == 20
@@ -0,0 +1,39 @@
+from __future__ import annotations
+
+import random
+
+from speaknotes.text_utils import iter_chunks, split_into_sentences
+
+TEXT = (
+    "Dr. Smith met J. R. R. Tolkien in Mar. 1950. The answer was no. We left!\n\n"
+    "See No. 5 on p. 12, then vol. 3. It costs 3.14 dollars, e.g. less than a coffee.\n\n"
+    + ", ".join(["a long clause without any sentence end"] * 40)
+    + ". Short tail.\n"
+)
+
+
+def test_abbreviations_initials_and_sentence_ends():
+    assert split_into_sentences(TEXT.split("\n\n")[0]) == [
+        "Dr. Smith met J. R. R. Tolkien in Mar. 1950.",
+        "The answer was no.",
+        "We left!",
+    ]
+    assert split_into_sentences(TEXT.split("\n\n")[1]) == [
+        "See No. 5 on p. 12, then vol. 3.",
+        "It costs 3.14 dollars, e.g. less than a coffee.",
+    ]
+
+
+def test_chunks_respect_limits():
+    chunks = list(iter_chunks(TEXT, min_chars=40, max_chars=200))
+    assert all(len(chunk) <= 200 for chunk in chunks)
+    assert " ".join(" ".join(chunks).split()) == " ".join(TEXT.split())
+
+
+def test_streamed_pieces_chunk_like_the_whole_string():
+    expected = list(iter_chunks(TEXT, min_chars=40, max_chars=120))
+    rng = random.Random(7)
+    for _ in range(50):
+        cuts = sorted(rng.sample(range(1, len(TEXT)), rng.randint(1, 60)))
+        pieces = [TEXT[a:b] for a, b in zip([0] + cuts, cuts + [len(TEXT)])]
+        assert list(iter_chunks(pieces, min_chars=40, max_chars=120)) == expected
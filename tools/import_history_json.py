@@ -0,0 +1,17 @@
+from pathlib import Path
+import os
+import sys
+
+APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+os.chdir(APP_ROOT)
+
+from speaknotes.history_utils import HISTORY_FILE, HISTORY_LOG, import_legacy_history
+
+# One-time conversion of history.json (JSON array) into history.jsonl (JSON Lines).
+# load_history() does this automatically; this script just makes it explicit.
+if HISTORY_LOG.exists():
+    print(f"{HISTORY_LOG} already exists, nothing to import.")
+else:
+    imported = import_legacy_history()
+    print(f"Imported {imported} entries from {HISTORY_FILE} into {HISTORY_LOG}.")
@@ -1,10 +1,14 @@
 from pathlib import Path
-import json
+import os
+import sys
 
 APP_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(APP_ROOT))
+os.chdir(APP_ROOT)
 
-history_path = APP_ROOT / "history.json"
-data = json.loads(history_path.read_text(encoding="utf-8"))
+from speaknotes.history_utils import load_history, rewrite_history
+
+data = load_history()
 
 changed = 0
 for e in data:
@@ -18,5 +22,5 @@ for e in data:
             e["file"] = str(candidate)
             changed += 1
 
-history_path.write_text(json.dumps(data, indent=2), encoding="utf-8")
+rewrite_history(data)
 print(f"Updated {changed} history entries.")